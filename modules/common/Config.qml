@@ -2023,8 +2023,9 @@ Singleton {
                     property real safetyMarginMb: 0.5
                     property bool onlyIfNeeded: true
                     property int audioBitrateKbps: 96
-                    property string preset: "slow"
+                    property string preset: "slow" // x264 preset, or "auto" to pick from the compress-discord.py --benchmark profile
                     property int maxDimension: 1280
+                    property bool parallelEncode: true // Split long recordings at keyframes and encode pieces across cores
                 }
             }
 
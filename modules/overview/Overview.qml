@@ -413,16 +413,28 @@ Scope {
         overviewScope.openWithPrefix(Config.options?.search?.prefix?.emojis ?? ":");
     }
 
+    function toggleOverview() {
+        // In Waffle mode, open Start Menu instead
+        if (Config.options?.panelFamily === "waffle") {
+            GlobalStates.searchOpen = !GlobalStates.searchOpen;
+        } else {
+            GlobalStates.overviewOpen = !GlobalStates.overviewOpen;
+        }
+    }
+
+    // Super taps from the input daemon, without a launcher process per tap
+    Connections {
+        target: InputEvents
+        function onSuperTap() {
+            overviewScope.toggleOverview();
+        }
+    }
+
     IpcHandler {
         target: "overview"
 
         function toggle(): void {
-            // In Waffle mode, open Start Menu instead
-            if (Config.options?.panelFamily === "waffle") {
-                GlobalStates.searchOpen = !GlobalStates.searchOpen;
-            } else {
-                GlobalStates.overviewOpen = !GlobalStates.overviewOpen;
-            }
+            overviewScope.toggleOverview();
         }
         function close(): void {
             if (Config.options?.panelFamily === "waffle") {
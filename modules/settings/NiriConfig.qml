@@ -4,7 +4,6 @@ import QtQuick
 import QtQuick.Layouts
 import QtQuick.Controls
 import Quickshell
-import Quickshell.Io
 import qs.services
 import qs.modules.common
 import qs.modules.common.widgets
@@ -141,7 +140,7 @@ ContentPage {
     property string pendingChangeType: ""
     property string pendingChangeValue: ""
     property string pendingPreviewKind: ""
-    property string pendingSetSection: ""
+    property var pendingSetSections: []
     property string pendingActionLabel: ""
     property string applyOutputPurpose: ""
     property string applyOutputTargetName: ""
@@ -155,10 +154,13 @@ ContentPage {
     property string persistOutputValue: ""
     property string persistRollbackKey: ""
     property string persistRollbackValue: ""
+    property bool applyOutputRunning: false
+    property bool persistOutputRunning: false
+    property int setRequestsInFlight: 0
+    property bool setBurstFailed: false
     property var setRequestQueue: []
-    readonly property bool displayControlsLocked: confirmationPending || applyOutputProcess.running || persistOutputProcess.running
+    readonly property bool displayControlsLocked: confirmationPending || applyOutputRunning || persistOutputRunning
 
-    readonly property string scriptPath: Quickshell.shellPath("scripts/niri-config.py")
     readonly property var keyboardLayoutOptions: [
         { displayName: "US English", value: "us" },
         { displayName: "Spanish", value: "es" },
@@ -230,14 +232,75 @@ ContentPage {
         { displayName: Translation.tr("Always center"), value: "center-xy-always" }
     ]
 
-    function loadOutputs() { outputsProcess.running = true }
-    function loadInput() { inputProcess.running = true }
-    function loadLayout() { layoutProcess.running = true }
-    function loadAnimations() { animationsProcess.running = true }
-    function loadWindowRules() { windowRulesProcess.running = true }
-    function loadCursorThemes() { cursorThemesProcess.running = true }
-    function loadValidation() { validationProcess.running = true }
-    function loadCustomizations() { customizationsProcess.running = true }
+    // Reads go through NiriConfigClient: one request to the resident
+    // niri-config server, or a one-shot process when it is unavailable.
+    function requestSection(method, processKey, readyProperty, failureText, onSuccess) {
+        NiriConfigClient.request(method, [], (ok, result, error) => {
+            if (readyProperty.length > 0)
+                root[readyProperty] = false
+            if (!ok) {
+                setProcessError(processKey, error || failureText)
+                return
+            }
+            handleJsonResult(result, processKey, onSuccess)
+        })
+    }
+
+    function loadOutputs() {
+        requestSection("outputs", "outputs", "outputReady", Translation.tr("Unable to query connected outputs."), data => {
+            if (Array.isArray(data))
+                root.outputList = data
+            root.outputReady = true
+        })
+    }
+
+    function loadInput() {
+        requestSection("get-input", "input", "inputReady", Translation.tr("Unable to read input configuration."), data => {
+            root.inputData = data
+            root.inputReady = true
+        })
+    }
+
+    function loadLayout() {
+        requestSection("get-layout", "layout", "layoutReady", Translation.tr("Unable to read layout configuration."), data => {
+            root.layoutData = data
+            root.layoutReady = true
+        })
+    }
+
+    function loadAnimations() {
+        requestSection("get-animations", "animations", "animationsReady", Translation.tr("Unable to read animations configuration."), data => {
+            root.animationsData = data
+            root.animationsReady = true
+        })
+    }
+
+    function loadWindowRules() {
+        requestSection("get-window-rules", "windowRules", "windowRulesReady", Translation.tr("Unable to read window rules."), data => {
+            root.windowRulesData = data
+            root.windowRulesReady = true
+        })
+    }
+
+    function loadCursorThemes() {
+        requestSection("list-cursor-themes", "cursorThemes", "", Translation.tr("Unable to enumerate cursor themes."), data => {
+            root.cursorThemes = Array.isArray(data) ? data : []
+        })
+    }
+
+    function loadValidation() {
+        requestSection("validate", "validation", "validationReady", Translation.tr("Unable to validate Niri configuration."), data => {
+            root.validationData = data
+            root.validationReady = true
+        })
+    }
+
+    function loadCustomizations() {
+        requestSection("detect-customizations", "customizations", "customizationsReady", Translation.tr("Unable to inspect custom Niri configuration."), data => {
+            root.customConfigData = data
+            root.customizationsReady = true
+        })
+    }
 
     function setProcessError(key, message) {
         processErrors = Object.assign({}, processErrors, { [key]: message })
@@ -250,25 +313,24 @@ ContentPage {
         lastActionInfo = message
     }
 
-    function handleJsonResult(rawText, processKey, onSuccess) {
-        try {
-            const parsed = JSON.parse(rawText)
-            if (parsed && typeof parsed === "object" && parsed.error) {
-                const errorText = String(parsed.error)
-                setProcessError(processKey, errorText)
-                if (processKey === "validation") {
-                    validationData = { valid: false, output: errorText, config_path: "" }
-                    validationReady = true
-                }
-                return
-            }
-            setProcessError(processKey, "")
-            onSuccess(parsed)
-        } catch (e) {
+    function handleJsonResult(parsed, processKey, onSuccess) {
+        if (!parsed || typeof parsed !== "object") {
             const parseError = Translation.tr("Failed to parse %1 response.").arg(processKey)
-            console.warn(`[NiriConfig] ${processKey} parse failure:`, e)
+            console.warn(`[NiriConfig] ${processKey} parse failure:`, parsed)
             setProcessError(processKey, parseError)
+            return
+        }
+        if (parsed.error) {
+            const errorText = String(parsed.error)
+            setProcessError(processKey, errorText)
+            if (processKey === "validation") {
+                validationData = { valid: false, output: errorText, config_path: "" }
+                validationReady = true
+            }
+            return
         }
+        setProcessError(processKey, "")
+        onSuccess(parsed)
     }
 
     function saveAndRefresh(message) {
@@ -381,8 +443,60 @@ ContentPage {
         applyOutputValue = String(value)
         applyRollbackKey = rollbackKey ?? ""
         applyRollbackValue = rollbackValue ?? ""
-        applyOutputProcess.command = ["python3", scriptPath, "apply-output", outputName, `${key}=${String(value)}`]
-        applyOutputProcess.running = true
+        applyOutputRunning = true
+        NiriConfigClient.request("apply-output", [outputName, `${key}=${String(value)}`], (ok, result, error) => {
+            root.applyOutputRunning = false
+            root.finishOutputApply(ok, result, error)
+        })
+    }
+
+    function finishOutputApply(ok, result, error) {
+        const purpose = applyOutputPurpose
+
+        // Parse JSON results for detailed failure info
+        let jsonFailed = false
+        let failDetail = ""
+        if (result?.results) {
+            const failed = result.results.filter(r => r.success === false)
+            if (failed.length > 0) {
+                jsonFailed = true
+                failDetail = failed.map(r => `${r.key}: ${r.output || "failed"}`).join("; ")
+            }
+        }
+
+        const effectiveFailed = !ok || jsonFailed
+        const text = (failDetail || error || "").trim()
+
+        if (!effectiveFailed) {
+            if (purpose === "preview") {
+                lastActionError = ""
+                confirmationPending = true
+            } else if (purpose === "preview-revert") {
+                lastActionError = ""
+                clearPreviewState()
+                lastActionInfo = Translation.tr("Display preview reverted.")
+            } else if (purpose === "preview-revert-after-failure") {
+                clearPreviewState()
+                lastActionInfo = Translation.tr("Display preview reverted after save failure.")
+            } else if (purpose === "apply-and-persist") {
+                lastActionError = ""
+                startOutputPersist(applyOutputTargetName, applyOutputKey, applyOutputValue, "apply-and-persist", applyRollbackKey, applyRollbackValue)
+            } else if (purpose === "apply-and-persist-rollback") {
+                lastActionInfo = Translation.tr("Display change reverted after save failure.")
+            } else {
+                lastActionError = ""
+            }
+            _deferredOutputRefresh.restart()
+        } else {
+            if (purpose === "preview" || purpose === "preview-revert" || purpose === "preview-revert-after-failure")
+                clearPreviewState()
+            lastActionError = text.length > 0 ? text : ((purpose === "preview")
+                ? Translation.tr("Failed to preview display change.")
+                : ((purpose === "preview-revert" || purpose === "preview-revert-after-failure" || purpose === "apply-and-persist-rollback")
+                    ? Translation.tr("Failed to revert display change.")
+                    : Translation.tr("Failed to apply display change.")))
+        }
+        clearApplyOutputState()
     }
 
     function startOutputPersist(outputName, key, value, purpose, rollbackKey, rollbackValue) {
@@ -392,8 +506,35 @@ ContentPage {
         persistOutputValue = String(value)
         persistRollbackKey = rollbackKey ?? ""
         persistRollbackValue = rollbackValue ?? ""
-        persistOutputProcess.command = ["python3", scriptPath, "persist-output", outputName, `${key}=${String(value)}`]
-        persistOutputProcess.running = true
+        persistOutputRunning = true
+        NiriConfigClient.request("persist-output", [outputName, `${key}=${String(value)}`], (ok, result, error) => {
+            root.persistOutputRunning = false
+            root.finishOutputPersist(ok, error)
+        })
+    }
+
+    function finishOutputPersist(ok, error) {
+        const purpose = persistOutputPurpose
+        const text = (error || "").trim()
+        if (ok) {
+            lastActionError = ""
+            if (purpose === "preview-confirm")
+                clearPreviewState()
+            saveAndRefresh(Translation.tr("Display settings saved."))
+            loadOutputs()
+        } else {
+            lastActionError = text.length > 0 ? text : Translation.tr("Failed to save display settings.")
+
+            if (purpose === "preview-confirm" && persistRollbackKey.length > 0 && persistRollbackValue.length > 0) {
+                pendingActionLabel = Translation.tr("Reverting display preview")
+                startOutputApply(persistOutputTargetName, persistRollbackKey, persistRollbackValue, "preview-revert-after-failure", "", "")
+            } else if (purpose === "apply-and-persist" && persistRollbackKey.length > 0 && persistRollbackValue.length > 0) {
+                startOutputApply(persistOutputTargetName, persistRollbackKey, persistRollbackValue, "apply-and-persist-rollback", "", "")
+            } else if (purpose === "preview-confirm") {
+                clearPreviewState()
+            }
+        }
+        clearPersistOutputState()
     }
 
     function applyOutput(key, value) {
@@ -455,7 +596,7 @@ ContentPage {
     }
 
     function confirmDisplayChange() {
-        if (!confirmationPending || applyOutputProcess.running || persistOutputProcess.running || !pendingOutputName.length)
+        if (!confirmationPending || applyOutputRunning || persistOutputRunning || !pendingOutputName.length)
             return
 
         const rollback = previewRollbackRequest()
@@ -466,7 +607,7 @@ ContentPage {
     }
 
     function revertDisplayChange() {
-        if (!pendingOutputName.length || applyOutputProcess.running || persistOutputProcess.running)
+        if (!pendingOutputName.length || applyOutputRunning || persistOutputRunning)
             return
 
         const outputName = pendingOutputName
@@ -485,16 +626,77 @@ ContentPage {
     }
 
     function runNextSetRequest() {
-        if (setProcess.running || setRequestQueue.length === 0)
+        if (setRequestQueue.length === 0)
+            return
+        // The niri-config server validates a file once its writes go quiet,
+        // so while connected each change (a dragged slider's every step) is
+        // sent straight away and the server merges the burst into one
+        // validation. One-shot CLI processes must not write the same file
+        // concurrently: everything queued while the previous write ran goes
+        // out as one set-many batch instead.
+        if (setRequestsInFlight > 0 && !NiriConfigClient.connected)
             return
 
-        const nextQueue = setRequestQueue.slice()
-        const request = nextQueue.shift()
-        setRequestQueue = nextQueue
-        pendingSetSection = request.section
-        pendingActionLabel = `${request.section}.${request.key}`
-        setProcess.command = ["python3", scriptPath, "set", request.section, request.key, request.value]
-        setProcess.running = true
+        const batch = setRequestQueue.slice()
+        setRequestQueue = []
+        const sections = pendingSetSections.slice()
+        for (const request of batch) {
+            if (!sections.includes(request.section))
+                sections.push(request.section)
+        }
+        pendingSetSections = sections
+
+        let method = "set"
+        let params = []
+        if (batch.length === 1) {
+            const request = batch[0]
+            pendingActionLabel = `${request.section}.${request.key}`
+            params = [request.section, request.key, request.value]
+        } else {
+            pendingActionLabel = batch.map(request => `${request.section}.${request.key}`).join(", ")
+            method = "set-many"
+            params = [JSON.stringify(batch.map(request => [request.section, request.key, request.value]))]
+        }
+        setRequestsInFlight += 1
+        NiriConfigClient.request(method, params, (ok, result, error) => {
+            root.setRequestsInFlight -= 1
+            root.finishSetRequest(ok, error)
+        })
+    }
+
+    function finishSetRequest(ok, error) {
+        if (!ok) {
+            lastActionError = (error || Translation.tr("Failed to update Niri configuration.")).trim()
+            setBurstFailed = true
+        }
+        // Refresh once the whole burst has been written and validated
+        if (setRequestsInFlight > 0)
+            return
+
+        if (setBurstFailed) {
+            setBurstFailed = false
+            pendingSetSections = []
+            pendingActionLabel = ""
+            runNextSetRequest()
+            return
+        }
+
+        lastActionError = ""
+
+        const sections = pendingSetSections
+        if (sections.includes("input"))
+            loadInput()
+        if (sections.includes("layout"))
+            loadLayout()
+        if (sections.includes("animations"))
+            loadAnimations()
+        if (sections.includes("window-rules"))
+            loadWindowRules()
+
+        saveAndRefresh(Translation.tr("Niri configuration updated."))
+        pendingSetSections = []
+        pendingActionLabel = ""
+        runNextSetRequest()
     }
 
     function setConfig(section, key, value) {
@@ -617,290 +819,6 @@ ContentPage {
         onTriggered: root.shadowEditorReady = true
     }
 
-    // =====================
-    // PROCESSES
-    // =====================
-    Process {
-        id: outputsProcess
-        command: ["python3", root.scriptPath, "outputs"]
-        stdout: StdioCollector {
-            id: outputsCollector
-            onStreamFinished: {
-                root.outputReady = false
-                root.handleJsonResult(outputsCollector.text, "outputs", data => {
-                    if (Array.isArray(data))
-                        root.outputList = data
-                    root.outputReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: outputsErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("outputs", (outputsErrorCollector.text || outputsCollector.text || Translation.tr("Unable to query connected outputs.")).trim())
-        }
-    }
-
-    Process {
-        id: inputProcess
-        command: ["python3", root.scriptPath, "get-input"]
-        stdout: StdioCollector {
-            id: inputCollector
-            onStreamFinished: {
-                root.inputReady = false
-                root.handleJsonResult(inputCollector.text, "input", data => {
-                    root.inputData = data
-                    root.inputReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: inputErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("input", (inputErrorCollector.text || inputCollector.text || Translation.tr("Unable to read input configuration.")).trim())
-        }
-    }
-
-    Process {
-        id: layoutProcess
-        command: ["python3", root.scriptPath, "get-layout"]
-        stdout: StdioCollector {
-            id: layoutCollector
-            onStreamFinished: {
-                root.layoutReady = false
-                root.handleJsonResult(layoutCollector.text, "layout", data => {
-                    root.layoutData = data
-                    root.layoutReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: layoutErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("layout", (layoutErrorCollector.text || layoutCollector.text || Translation.tr("Unable to read layout configuration.")).trim())
-        }
-    }
-
-    Process {
-        id: animationsProcess
-        command: ["python3", root.scriptPath, "get-animations"]
-        stdout: StdioCollector {
-            id: animationsCollector
-            onStreamFinished: {
-                root.animationsReady = false
-                root.handleJsonResult(animationsCollector.text, "animations", data => {
-                    root.animationsData = data
-                    root.animationsReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: animationsErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("animations", (animationsErrorCollector.text || animationsCollector.text || Translation.tr("Unable to read animations configuration.")).trim())
-        }
-    }
-
-    Process {
-        id: windowRulesProcess
-        command: ["python3", root.scriptPath, "get-window-rules"]
-        stdout: StdioCollector {
-            id: windowRulesCollector
-            onStreamFinished: {
-                root.windowRulesReady = false
-                root.handleJsonResult(windowRulesCollector.text, "windowRules", data => {
-                    root.windowRulesData = data
-                    root.windowRulesReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: windowRulesErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("windowRules", (windowRulesErrorCollector.text || windowRulesCollector.text || Translation.tr("Unable to read window rules.")).trim())
-        }
-    }
-
-    Process {
-        id: cursorThemesProcess
-        command: ["python3", root.scriptPath, "list-cursor-themes"]
-        stdout: StdioCollector {
-            id: cursorThemesCollector
-            onStreamFinished: {
-                root.handleJsonResult(cursorThemesCollector.text, "cursorThemes", data => {
-                    root.cursorThemes = Array.isArray(data) ? data : []
-                })
-            }
-        }
-        stderr: StdioCollector { id: cursorThemesErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("cursorThemes", (cursorThemesErrorCollector.text || cursorThemesCollector.text || Translation.tr("Unable to enumerate cursor themes.")).trim())
-        }
-    }
-
-    Process {
-        id: validationProcess
-        command: ["python3", root.scriptPath, "validate"]
-        stdout: StdioCollector {
-            id: validationCollector
-            onStreamFinished: {
-                root.validationReady = false
-                root.handleJsonResult(validationCollector.text, "validation", data => {
-                    root.validationData = data
-                    root.validationReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: validationErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("validation", (validationErrorCollector.text || validationCollector.text || Translation.tr("Unable to validate Niri configuration.")).trim())
-        }
-    }
-
-    Process {
-        id: customizationsProcess
-        command: ["python3", root.scriptPath, "detect-customizations"]
-        stdout: StdioCollector {
-            id: customizationsCollector
-            onStreamFinished: {
-                root.customizationsReady = false
-                root.handleJsonResult(customizationsCollector.text, "customizations", data => {
-                    root.customConfigData = data
-                    root.customizationsReady = true
-                })
-            }
-        }
-        stderr: StdioCollector { id: customizationsErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0)
-                root.setProcessError("customizations", (customizationsErrorCollector.text || customizationsCollector.text || Translation.tr("Unable to inspect custom Niri configuration.")).trim())
-        }
-    }
-
-    Process {
-        id: applyOutputProcess
-        stdout: StdioCollector { id: applyOutputCollector }
-        stderr: StdioCollector { id: applyOutputErrorCollector }
-        onExited: (exitCode) => {
-            const purpose = root.applyOutputPurpose
-            const stdout = (applyOutputCollector.text || "").trim()
-            const stderr = (applyOutputErrorCollector.text || "").trim()
-
-            // Parse JSON results for detailed failure info
-            let jsonFailed = false
-            let failDetail = ""
-            try {
-                const parsed = JSON.parse(stdout)
-                if (parsed?.results) {
-                    const failed = parsed.results.filter(r => r.success === false)
-                    if (failed.length > 0) {
-                        jsonFailed = true
-                        failDetail = failed.map(r => `${r.key}: ${r.output || "failed"}`).join("; ")
-                    }
-                }
-            } catch (_) {
-                // Not JSON — fall through to text-based handling
-            }
-
-            const effectiveFailed = exitCode !== 0 || jsonFailed
-            const text = failDetail || stderr || stdout
-
-            if (!effectiveFailed) {
-                if (purpose === "preview") {
-                    root.lastActionError = ""
-                    root.confirmationPending = true
-                } else if (purpose === "preview-revert") {
-                    root.lastActionError = ""
-                    root.clearPreviewState()
-                    root.lastActionInfo = Translation.tr("Display preview reverted.")
-                } else if (purpose === "preview-revert-after-failure") {
-                    root.clearPreviewState()
-                    root.lastActionInfo = Translation.tr("Display preview reverted after save failure.")
-                } else if (purpose === "apply-and-persist") {
-                    root.lastActionError = ""
-                    root.startOutputPersist(root.applyOutputTargetName, root.applyOutputKey, root.applyOutputValue, "apply-and-persist", root.applyRollbackKey, root.applyRollbackValue)
-                } else if (purpose === "apply-and-persist-rollback") {
-                    root.lastActionInfo = Translation.tr("Display change reverted after save failure.")
-                } else {
-                    root.lastActionError = ""
-                }
-                root._deferredOutputRefresh.restart()
-            } else {
-                if (purpose === "preview" || purpose === "preview-revert" || purpose === "preview-revert-after-failure")
-                    root.clearPreviewState()
-                root.lastActionError = text.length > 0 ? text : ((purpose === "preview")
-                    ? Translation.tr("Failed to preview display change.")
-                    : ((purpose === "preview-revert" || purpose === "preview-revert-after-failure" || purpose === "apply-and-persist-rollback")
-                        ? Translation.tr("Failed to revert display change.")
-                        : Translation.tr("Failed to apply display change.")))
-            }
-            root.clearApplyOutputState()
-        }
-    }
-
-    Process {
-        id: persistOutputProcess
-        stdout: StdioCollector { id: persistOutputCollector }
-        stderr: StdioCollector { id: persistOutputErrorCollector }
-        onExited: (exitCode) => {
-            const purpose = root.persistOutputPurpose
-            const text = (persistOutputErrorCollector.text || persistOutputCollector.text || "").trim()
-            if (exitCode === 0) {
-                root.lastActionError = ""
-                if (purpose === "preview-confirm")
-                    root.clearPreviewState()
-                root.saveAndRefresh(Translation.tr("Display settings saved."))
-                root.loadOutputs()
-            } else {
-                root.lastActionError = text.length > 0 ? text : Translation.tr("Failed to save display settings.")
-
-                if (purpose === "preview-confirm" && root.persistRollbackKey.length > 0 && root.persistRollbackValue.length > 0) {
-                    root.pendingActionLabel = Translation.tr("Reverting display preview")
-                    root.startOutputApply(root.persistOutputTargetName, root.persistRollbackKey, root.persistRollbackValue, "preview-revert-after-failure", "", "")
-                } else if (purpose === "apply-and-persist" && root.persistRollbackKey.length > 0 && root.persistRollbackValue.length > 0) {
-                    root.startOutputApply(root.persistOutputTargetName, root.persistRollbackKey, root.persistRollbackValue, "apply-and-persist-rollback", "", "")
-                } else if (purpose === "preview-confirm") {
-                    root.clearPreviewState()
-                }
-            }
-            root.clearPersistOutputState()
-        }
-    }
-
-    Process {
-        id: setProcess
-        stdout: StdioCollector { id: setCollector }
-        stderr: StdioCollector { id: setErrorCollector }
-        onExited: (exitCode) => {
-            if (exitCode !== 0) {
-                root.lastActionError = (setErrorCollector.text || setCollector.text || Translation.tr("Failed to update Niri configuration.")).trim()
-                root.pendingSetSection = ""
-                root.pendingActionLabel = ""
-                root.runNextSetRequest()
-                return
-            }
-
-            root.lastActionError = ""
-
-            if (root.pendingSetSection === "input") {
-                root.loadInput()
-            } else if (root.pendingSetSection === "layout") {
-                root.loadLayout()
-            } else if (root.pendingSetSection === "animations") {
-                root.loadAnimations()
-            } else if (root.pendingSetSection === "window-rules") {
-                root.loadWindowRules()
-            }
-
-            root.saveAndRefresh(Translation.tr("Niri configuration updated."))
-            root.pendingSetSection = ""
-            root.pendingActionLabel = ""
-            root.runNextSetRequest()
-        }
-    }
-
     // =====================
     // DISPLAY CONFIRMATION OVERLAY
     // =====================
@@ -43,6 +43,8 @@ ContentPage {
     readonly property var recordingAudioBitrateOptions: [96, 128, 160, 192, 256, 320].map(value => ({ value: value, displayName: `${value} kbps` }))
     readonly property var recordingSampleRateOptions: [32000, 44100, 48000, 96000].map(value => ({ value: value, displayName: `${value} Hz` }))
     readonly property var recordingSoftwarePresetOptions: ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"].map(value => ({ value: value, displayName: value }))
+    // "auto" lets compress-discord.py pick from its --benchmark profile
+    readonly property var recordingDiscordPresetOptions: [{ value: "auto", displayName: Translation.tr("Auto") }].concat(recordingSoftwarePresetOptions)
     readonly property var recordingPixelFormatOptions: [
         { value: "yuv420p", displayName: Translation.tr("yuv420p — smaller files") },
         { value: "yuv444p", displayName: Translation.tr("yuv444p — sharper text, bigger files") }
@@ -412,7 +414,7 @@ ContentPage {
                     RecordingDropdownField {
                         title: Translation.tr("Encoder speed")
                         description: Translation.tr("Slower is smaller and cleaner, because physics remains annoying.")
-                        options: root.recordingSoftwarePresetOptions
+                        options: root.recordingDiscordPresetOptions
                         currentValue: Config.options?.screenRecord?.discordCompress?.preset ?? "slow"
                         onSelected: newValue => Config.setNestedValue("screenRecord.discordCompress.preset", newValue)
                     }
@@ -433,6 +435,14 @@ ContentPage {
                     checked: Config.options?.screenRecord?.discordCompress?.onlyIfNeeded ?? true
                     onCheckedChanged: Config.setNestedValue("screenRecord.discordCompress.onlyIfNeeded", checked)
                 }
+
+                SettingsSwitch {
+                    visible: Config.options?.screenRecord?.discordCompress?.enabled ?? false
+                    buttonIcon: "speed"
+                    text: Translation.tr("Encode long recordings in parallel")
+                    checked: Config.options?.screenRecord?.discordCompress?.parallelEncode ?? true
+                    onCheckedChanged: Config.setNestedValue("screenRecord.discordCompress.parallelEncode", checked)
+                }
             }
 
             ContentSubsection {
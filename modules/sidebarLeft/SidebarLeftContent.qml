@@ -54,7 +54,7 @@ Item {
 
     // ─── WebApp management functions (DISABLED) ──────────────────────
 
-    function openWebApp(id: string, url: string, name: string, icon: string, userscriptSources): void {}
+    function openWebApp(id: string, url: string, name: string, icon: string, userscripts): void {}
     function closeWebApp(): void {}
     function removeWebApp(id: string): void {}
     function _freezeAllWebApps(): void {}
@@ -330,7 +330,7 @@ Item {
         //     id: pluginsComp
         //     PluginsTab {
         //         activePluginId: root._activeWebAppId
-        //         onPluginRequested: (id, url, name, icon, userscriptSources) => root.openWebApp(id, url, name, icon, userscriptSources)
+        //         onPluginRequested: (id, url, name, icon, userscripts) => root.openWebApp(id, url, name, icon, userscripts)
         //         onPluginCloseRequested: root.closeWebApp()
         //         onPluginRemoved: (id) => root.removeWebApp(id)
         //     }
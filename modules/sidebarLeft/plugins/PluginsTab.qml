@@ -25,7 +25,8 @@ Item {
     property bool addingInProgress: false
 
     // Signals to parent — parent owns the WebAppView lifecycle
-    signal pluginRequested(string id, string url, string name, string icon, var userscriptSources)
+    // userscripts: [{ path, hash }] — sources are read by the WebAppView itself
+    signal pluginRequested(string id, string url, string name, string icon, var userscripts)
     signal pluginCloseRequested()
     signal pluginRemoved(string id)
 
@@ -302,7 +303,10 @@ Item {
                         modelData.url ?? "",
                         modelData.name ?? modelData.id ?? "Plugin",
                         modelData.icon ?? "language",
-                        modelData.userscriptSources ?? []
+                        (modelData.userscriptPaths ?? []).map((path, i) => ({
+                            path: path,
+                            hash: modelData.userscriptHashes?.[i] ?? ""
+                        }))
                     )
 
                     contentItem: RowLayout {
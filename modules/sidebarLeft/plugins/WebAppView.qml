@@ -5,6 +5,7 @@ import QtQuick.Layouts
 // DISABLED: webapps — requires quickshell-webengine rebuild
 // import QtWebEngine
 import Qt5Compat.GraphicalEffects as GE
+import Quickshell.Io
 import qs.modules.common
 import qs.modules.common.widgets
 import qs.services
@@ -18,9 +19,9 @@ Item {
     property string pluginName: ""
     property string pluginIcon: "language"
 
-    // Userscript JS source code — pre-read by scan-plugins.py
-    // Injected via runJavaScript after each successful page load.
-    property var userscriptSources: []
+    // Userscripts listed by scan-plugins.py as [{ path, hash }].
+    // Sources are read from disk only when this view installs them.
+    property var userscripts: []
 
     // External profile — created by SidebarLeftContent with storageName
     // already set, avoiding the off-the-record → disk-based transition
@@ -261,26 +262,40 @@ Item {
 
     property bool _userscriptsInstalled: false
 
+    FileView {
+        id: userscriptReader
+        blockLoading: true
+        printErrors: false
+    }
+
+    function _readUserscript(path: string): string {
+        userscriptReader.path = ""
+        userscriptReader.path = path
+        return userscriptReader.text() ?? ""
+    }
+
     function _installUserscripts(): void {
         if (root._userscriptsInstalled) return
-        const sources = root.userscriptSources ?? []
-        if (sources.length === 0) return
+        const scripts = root.userscripts ?? []
+        if (scripts.length === 0) return
 
         root._userscriptsInstalled = true
 
-        for (let i = 0; i < sources.length; i++) {
-            const code = sources[i]
+        for (let i = 0; i < scripts.length; i++) {
+            const code = root._readUserscript(scripts[i].path ?? "")
             if (!code || code.length === 0) continue
 
             // WebEngine singleton has the factory: WebEngine.script()
             let script = WebEngine.script()
-            script.name = root.pluginId + "_us_" + i
+            // Content hash in the name, so an edited script never reuses a stale one
+            script.name = root.pluginId + "_us_" + i + "_" + (scripts[i].hash ?? "").slice(0, 12)
             script.sourceCode = code
             script.injectionPoint = 1  // DocumentReady (DOMContentLoaded)
             script.worldId = 0         // MainWorld
             script.runOnSubframes = false
             webView.userScripts.insert(script)
         }
+        userscriptReader.path = "" // Don't keep the last source loaded
     }
 
     function _injectUserscripts(): void {
@@ -51,6 +51,8 @@ WSettingsPage {
     readonly property var recordingVideoBitrateOptions: [4000, 6000, 8000, 10000, 12000, 16000, 20000, 28000].map(value => ({ value: value, displayName: `${value} kbps` }))
     readonly property var recordingAudioBitrateOptions: [96, 128, 160, 192, 256, 320].map(value => ({ value: value, displayName: `${value} kbps` }))
     readonly property var recordingSoftwarePresetOptions: ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"].map(value => ({ value: value, displayName: value }))
+    // "auto" lets compress-discord.py pick from its --benchmark profile
+    readonly property var recordingDiscordPresetOptions: [{ value: "auto", displayName: Translation.tr("Auto") }].concat(recordingSoftwarePresetOptions)
     readonly property var recordingDiscordTargetSizeOptions: [
         { value: 8, displayName: Translation.tr("8 MB") },
         { value: 10, displayName: Translation.tr("10 MB") },
@@ -624,7 +626,7 @@ WSettingsPage {
             icon: "arrow-clockwise"
             description: Translation.tr("Slower is smaller and cleaner")
             currentValue: Config.options?.screenRecord?.discordCompress?.preset ?? "slow"
-            options: root.recordingSoftwarePresetOptions
+            options: root.recordingDiscordPresetOptions
             onSelected: newValue => Config.setNestedValue("screenRecord.discordCompress.preset", newValue)
         }
 
@@ -646,6 +648,15 @@ WSettingsPage {
             onCheckedChanged: Config.setNestedValue("screenRecord.discordCompress.onlyIfNeeded", checked)
         }
 
+        WSettingsSwitch {
+            visible: Config.options?.screenRecord?.discordCompress?.enabled ?? false
+            label: Translation.tr("Encode long recordings in parallel")
+            icon: "flash-on"
+            description: Translation.tr("Splits clips over two minutes at keyframes and uses every core")
+            checked: Config.options?.screenRecord?.discordCompress?.parallelEncode ?? true
+            onCheckedChanged: Config.setNestedValue("screenRecord.discordCompress.parallelEncode", checked)
+        }
+
         WSettingsDropdown {
             visible: root.customRecordingPreset
             label: Translation.tr("Video codec")
@@ -6,11 +6,16 @@ Usage:
 """
 
 import argparse
+import concurrent.futures
 import html.parser
+import http.client
 import json
 import os
 import re
+import ssl
 import sys
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -32,6 +37,10 @@ def resolve_shell_config_dir() -> str:
 
 PLUGINS_DIR = os.path.join(resolve_shell_config_dir(), "plugins")
 TIMEOUT = 8
+# Icons are small; a candidate slower than this loses the race
+ICON_TIMEOUT = 3
+MAX_ICON_CANDIDATES = 8
+MAX_REDIRECTS = 5
 
 HEADERS = {
     "User-Agent": (
@@ -88,76 +97,188 @@ class _IconParser(html.parser.HTMLParser):
 # ---------------------------------------------------------------------------
 
 
-def _get(url: str, binary: bool = False):
-    """Fetch URL, return (content, final_url) or raise on error."""
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-        data = resp.read()
-        final_url = resp.url
-    if binary:
-        return data, final_url
-    charset = "utf-8"
-    ct = resp.headers.get_content_charset()
-    if ct:
-        charset = ct
-    return data.decode(charset, errors="replace"), final_url
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections per origin, shared by worker threads.
 
+    The page, /favicon.ico and most <link rel="icon"> targets live on the
+    same host, so reusing connections saves a TCP + TLS handshake per icon.
+    Hosts reached through a configured proxy (http_proxy, https_proxy,
+    no_proxy) are fetched with urllib instead, which knows how to use it.
+    """
+
+    def __init__(self):
+        self._idle: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+
+    def _proxied(self, parsed) -> bool:
+        return parsed.scheme in self._proxies and not urllib.request.proxy_bypass(parsed.netloc)
+
+    @staticmethod
+    def _urlopen(url: str, timeout: float):
+        req = urllib.request.Request(url, headers=HEADERS)
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read(), resp.geturl(), resp.headers.get_content_charset()
+
+    def _acquire(self, key: tuple, timeout: float, fresh: bool = False):
+        with self._lock:
+            idle = None if fresh else self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key: tuple, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+    def get(self, url: str, timeout: float):
+        """Fetch URL following redirects; return (body, final_url, charset) or raise."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            if parsed.scheme not in ("http", "https") or not parsed.hostname:
+                raise ValueError(f"Unsupported URL: {url}")
+            if self._proxied(parsed):
+                return self._urlopen(url, timeout)
+            key = (parsed.scheme, parsed.hostname, parsed.port)
+            target = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request("GET", target, headers=HEADERS)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                # Only a dropped idle connection is worth a retry, not a timeout
+                if not reused or not isinstance(exc, (ConnectionError, http.client.RemoteDisconnected)):
+                    raise
+                conn, _ = self._acquire(key, timeout, fresh=True)
+                try:
+                    conn.request("GET", target, headers=HEADERS)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+            location = resp.getheader("Location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if resp.status >= 400:
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            return body, url, resp.headers.get_content_charset()
+        raise urllib.error.URLError(f"Too many redirects: {url}")
 
-def fetch_title(url: str) -> str | None:
-    """Return <title> text for *url*, or None on failure."""
+
+_pool = _ConnectionPool()
+
+
+def fetch_page(url: str):
+    """Return (html_text, final_url) for *url*, or None on failure."""
     try:
-        html_text, _ = _get(url)
-        parser = _TitleParser()
-        parser.feed(html_text)
-        title = parser.title.strip()
-        return title if title else None
+        data, final_url, charset = _pool.get(url, TIMEOUT)
+        return data.decode(charset or "utf-8", errors="replace"), final_url
     except Exception:
         return None
 
 
+def parse_title(html_text: str) -> str | None:
+    """Return the <title> text of a page, or None."""
+    parser = _TitleParser()
+    parser.feed(html_text)
+    title = parser.title.strip()
+    return title if title else None
+
+
 def _resolve_icon_url(href: str, base_url: str) -> str:
     """Resolve a possibly-relative icon href against the page base URL."""
     return urllib.parse.urljoin(base_url, href)
 
 
-def fetch_favicon(url: str) -> bytes | None:
-    """Try to fetch a favicon for *url*.
+def _fetch_icon(url: str) -> bytes | None:
+    try:
+        data, _, _ = _pool.get(url, ICON_TIMEOUT)
+    except Exception:
+        return None
+    return data if data and len(data) > 16 else None
+
+
+def _submit(fn, *args) -> concurrent.futures.Future:
+    """Run fn(*args) in a daemon thread, so a straggling request never delays exit."""
+    future = concurrent.futures.Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
 
-    Strategy:
-    1. {origin}/favicon.ico
-    2. Parse HTML for <link rel="icon"> or <link rel="shortcut icon">
+def _first_icon(futures: list) -> bytes | None:
+    """Bytes of the first candidate to download successfully.
 
-    Returns raw bytes of the image, or None if nothing could be fetched.
+    Candidates that have not answered within ICON_TIMEOUT are abandoned.
+    """
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=ICON_TIMEOUT):
+            data = future.result()
+            if data:
+                return data
+    except concurrent.futures.TimeoutError:
+        pass
+    return None
+
+
+def fetch_page_and_favicon(url: str, want_title: bool = True):
+    """Fetch *url* once and find its favicon; return (title, icon_bytes).
+
+    /favicon.ico is requested while the page is still loading. Once the page
+    arrives, its <link rel="icon"> targets join the race and the first icon
+    to arrive wins. Either value may be None.
     """
     parsed = urllib.parse.urlparse(url)
     origin = f"{parsed.scheme}://{parsed.netloc}"
 
-    # Strategy 1: /favicon.ico
     favicon_ico = f"{origin}/favicon.ico"
-    try:
-        data, _ = _get(favicon_ico, binary=True)
-        if data and len(data) > 16:
-            return data
-    except Exception:
-        pass
-
-    # Strategy 2: parse <link rel="icon"> from the page HTML
-    try:
-        html_text, final_url = _get(url)
+    icon_futures = {favicon_ico: _submit(_fetch_icon, favicon_ico)}
+
+    title = None
+    page = fetch_page(url)
+    if page is not None:
+        html_text, final_url = page
+        if want_title:
+            title = parse_title(html_text)
         icon_parser = _IconParser()
         icon_parser.feed(html_text)
         for href in icon_parser.icon_hrefs:
             icon_url = _resolve_icon_url(href, final_url)
-            try:
-                data, _ = _get(icon_url, binary=True)
-                if data and len(data) > 16:
-                    return data
-            except Exception:
-                continue
-    except Exception:
-        pass
+            if icon_url not in icon_futures and len(icon_futures) < MAX_ICON_CANDIDATES:
+                icon_futures[icon_url] = _submit(_fetch_icon, icon_url)
 
-    return None
+    return title, _first_icon(list(icon_futures.values()))
 
 
 # ---------------------------------------------------------------------------
@@ -249,11 +370,15 @@ def main():
 
     plugin_id = id_from_url(url)
 
-    # --- name ---
+    # --- name and favicon, from a single fetch of the page ---
     name: str = args.name
+    print(f"[add-plugin] Fetching {url} ...", file=sys.stderr)
+    try:
+        title, favicon_data = fetch_page_and_favicon(url, want_title=not name)
+    finally:
+        _pool.close()
     if not name:
-        print(f"[add-plugin] Fetching title from {url} ...", file=sys.stderr)
-        name = fetch_title(url)
+        name = title
         if not name:
             name = plugin_id.capitalize()
             print(
@@ -270,8 +395,6 @@ def main():
     icon_field: str = args.icon or "language"
     icon_path_field: str | None = None
 
-    print(f"[add-plugin] Fetching favicon ...", file=sys.stderr)
-    favicon_data = fetch_favicon(url)
     if favicon_data:
         dest = os.path.join(plugin_dir, "icon.png")
         if _save_icon(favicon_data, dest):
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Benchmark the shared image statistics kernel on a fixed image corpus.
+
+Runs image_stats.image_stats() and the histogram mode against an
+independent colorsys-based reference on every image, reports the per-image time of each and
+flags images where the picked scheme differs from the reference.
+
+Usage: benchmark_image_stats.py [IMAGE_OR_DIR ...] [--size N] [--repeat N]
+Without paths a deterministic synthetic corpus is used. Exit 1 on any
+scheme mismatch.
+"""
+
+import argparse
+import colorsys
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from image_stats import HUE_SPREAD_MAX, histogram_stats, hsv_histogram, image_stats, pick_scheme
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def reference_stats(arr):
+    """
+    Independent per-pixel version of the statistics image_stats() computes.
+
+    Colorfulness is plain float64 NumPy; hue and saturation come from
+    colorsys for every distinct color, and the hue spread is the textbook
+    circular std-dev sqrt(-2 ln R) of the saturation-weighted hue angles.
+    """
+    flat = arr.reshape(-1, arr.shape[-1])[:, :3].astype(np.float64)
+    R, G, B = flat[:, 0], flat[:, 1], flat[:, 2]
+    rg = np.absolute(R - G)
+    yb = np.absolute(0.5 * (R + G) - B)
+    colorfulness = float(
+        np.sqrt(np.std(rg) ** 2 + np.std(yb) ** 2)
+        + 0.3 * np.sqrt(np.mean(rg) ** 2 + np.mean(yb) ** 2)
+    )
+
+    colors, counts = np.unique(arr.reshape(-1, arr.shape[-1])[:, :3], axis=0, return_counts=True)
+    weight = cos_sum = sin_sum = 0.0
+    for (r, g, b), count in zip(colors.tolist(), counts.tolist()):
+        h, s, _ = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+        weight += s * count
+        cos_sum += s * count * math.cos(2 * math.pi * h)
+        sin_sum += s * count * math.sin(2 * math.pi * h)
+    saturation = weight * 255 / flat.shape[0]
+
+    hue_spread = 0.0
+    if weight > 0:
+        resultant = math.hypot(cos_sum, sin_sum) / weight
+        hue_spread = HUE_SPREAD_MAX
+        if resultant > 0:
+            # Degrees on the 0-360 wheel, halved to OpenCV's 0-180 hue scale
+            spread = math.degrees(math.sqrt(-2 * math.log(min(resultant, 1.0)))) / 2
+            hue_spread = min(spread, HUE_SPREAD_MAX)
+    return colorfulness, saturation, hue_spread
+
+
+def histogram_mode(arr):
+    return histogram_stats(hsv_histogram(arr))
+
+
+def synthetic_corpus(size):
+    """Fixed images covering every branch of the decision tree."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    corpus = {
+        "gray-noise": np.repeat(rng.integers(0, 256, (size, size, 1)), 3, axis=2),
+        "muted-blue": np.dstack([x * 40 + 60, x * 40 + 70, x * 40 + 100]),
+        "teal-gradient": np.dstack([x * 30, 90 + y * 120, 110 + y * 110]),
+        "saturated-red": np.dstack([200 + x * 55, y * 30, y * 40]),
+        "red-wrap": np.dstack([220 + 0 * x, (x < 0.5) * 40, (x >= 0.5) * 60]),
+        "rainbow": np.dstack([
+            127 + 127 * np.sin(6.283 * x),
+            127 + 127 * np.sin(6.283 * x + 2.094),
+            127 + 127 * np.sin(6.283 * x + 4.189),
+        ]),
+        "color-noise": rng.integers(0, 256, (size, size, 3)),
+    }
+    return {name: np.clip(img, 0, 255).astype(np.uint8) for name, img in corpus.items()}
+
+
+def load_corpus(paths, size):
+    from PIL import Image
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTS)
+            )
+        else:
+            files.append(path)
+    corpus = {}
+    for path in files:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            if size:
+                image.thumbnail((size, size), Image.Resampling.BICUBIC)
+            corpus[os.path.basename(path)] = np.asarray(image)
+    return corpus
+
+
+def timed(fn, arr, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arr)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image_stats on a fixed corpus")
+    parser.add_argument("paths", nargs="*", help="images or directories (default: synthetic corpus)")
+    parser.add_argument("--size", type=int, default=256,
+                        help="longest side to analyze, 0 keeps files at full size (default: 256)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, best is kept")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths, args.size) if args.paths else synthetic_corpus(args.size)
+    mismatches = 0
+    totals = [0.0, 0.0, 0.0]
+    print(f"{'image':<24} {'reference':>10} {'kernel':>10} {'histogram':>10}  scheme")
+    for name, arr in corpus.items():
+        results = []
+        for column, fn in enumerate((reference_stats, image_stats, histogram_mode)):
+            stats, ms = timed(fn, arr, args.repeat)
+            totals[column] += ms
+            results.append((pick_scheme(*stats), ms))
+        ref_scheme = results[0][0]
+        notes = [ref_scheme] + [
+            f"{label} picked {scheme}"
+            for label, (scheme, _) in zip(("kernel", "histogram"), results[1:])
+            if scheme != ref_scheme
+        ]
+        mismatches += len(notes) - 1
+        times = " ".join(f"{ms:>8.2f}ms" for _, ms in results)
+        print(f"{name[:24]:<24} {times}  {', '.join(notes)}")
+    times = " ".join(f"{ms:>8.2f}ms" for ms in totals)
+    print(f"{'total':<24} {times}  {mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,10 @@ from materialyoucolor.utils.math_utils import (
     difference_degrees,
     rotation_direction,
 )
+from image_stats import scheme_for_pixels
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "images"))
+from wallpaper_cache import open_cache  # noqa: E402
 
 parser = argparse.ArgumentParser(description="Color generation script")
 parser.add_argument(
@@ -107,6 +111,12 @@ parser.add_argument(
 parser.add_argument(
     "--cache", type=str, default=None, help="file path to store the generated color"
 )
+parser.add_argument(
+    "--no-image-cache",
+    action="store_true",
+    default=False,
+    help="decode --path directly instead of using the wallpaper analysis cache",
+)
 parser.add_argument(
     "--soften", action="store_true", default=False, help="soften generated colors"
 )
@@ -165,66 +175,9 @@ display_color = lambda rgba: "\x1b[38;2;{};{};{}m{}\x1b[0m".format(
 
 def _auto_detect_scheme(pil_image):
     """Detect optimal material scheme from image statistics.
-    Uses the same decision tree as scheme_for_image.py but operates on an
-    already-loaded PIL image, avoiding a separate Python process + cv2 import."""
-    arr = np.array(pil_image, dtype=np.float64)
-    if arr.ndim != 3 or arr.shape[2] < 3:
-        return "scheme-tonal-spot"
-
-    R, G, B = arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]
-
-    # Colorfulness (Hasler-Süsstrunk metric)
-    rg = np.absolute(R - G)
-    yb = np.absolute(0.5 * (R + G) - B)
-    colorfulness = float(
-        np.sqrt(np.std(rg) ** 2 + np.std(yb) ** 2)
-        + 0.3 * np.sqrt(np.mean(rg) ** 2 + np.mean(yb) ** 2)
-    )
-
-    # HSV via numpy (H scaled to 0-180 to match cv2 convention)
-    r, g, b = R / 255.0, G / 255.0, B / 255.0
-    maxc = np.maximum(np.maximum(r, g), b)
-    minc = np.minimum(np.minimum(r, g), b)
-    s = np.where(maxc > 0, (maxc - minc) / maxc, 0.0) * 255
-    delta = maxc - minc
-    h = np.zeros_like(r)
-    with np.errstate(invalid="ignore", divide="ignore"):
-        mask = delta > 0
-        idx = (maxc == r) & mask
-        h[idx] = 30.0 * (((g[idx] - b[idx]) / delta[idx]) % 6)
-        idx = (maxc == g) & mask
-        h[idx] = 30.0 * ((b[idx] - r[idx]) / delta[idx] + 2)
-        idx = (maxc == b) & mask
-        h[idx] = 30.0 * ((r[idx] - g[idx]) / delta[idx] + 4)
-
-    saturation = float(np.mean(s))
-    hue_spread = float(np.std(h))
-
-    if saturation < 20:
-        return "scheme-monochrome"
-    if colorfulness < 30:
-        if saturation < 55:
-            return "scheme-neutral"
-        if hue_spread < 22:
-            return "scheme-content"
-        return "scheme-tonal-spot"
-    if colorfulness < 55:
-        if hue_spread < 22 and saturation < 100:
-            return "scheme-content"
-        return "scheme-tonal-spot"
-    if colorfulness < 90:
-        if saturation > 140 and hue_spread < 35:
-            return "scheme-fidelity"
-        if hue_spread < 30:
-            return "scheme-content"
-        return "scheme-tonal-spot"
-    if hue_spread > 55 and saturation > 150:
-        return "scheme-rainbow"
-    if saturation > 160:
-        return "scheme-fidelity"
-    if hue_spread > 45:
-        return "scheme-expressive"
-    return "scheme-tonal-spot"
+    Uses the same kernel and decision tree as scheme_for_image.py but operates
+    on an already-loaded PIL image, avoiding a separate Python process + cv2 import."""
+    return scheme_for_pixels(np.asarray(pil_image))
 
 
 def calculate_optimal_size(width: int, height: int, bitmap_size: int) -> (int, int):
@@ -537,17 +490,31 @@ darkmode = args.mode == "dark"
 transparent = args.transparency == "transparent"
 
 if args.path is not None:
-    image = Image.open(args.path)
+    # Start from the shared wallpaper analysis cache's mipmaps when possible;
+    # they come from a single decode that the other wallpaper analyzers reuse.
+    # The mipmaps are RGB, so images with transparency are read directly to
+    # keep transparent pixels out of the seed color.
+    cache = None if args.no_image_cache else open_cache(args.path)
+    if cache is not None and cache.has_alpha:
+        cache = None
+    if cache is not None:
+        wsize, hsize = cache.size
+        wsize_new, hsize_new = calculate_optimal_size(wsize, hsize, args.size)
+        image = Image.fromarray(np.asarray(cache.mip(max(wsize_new, hsize_new))))
+        if image.size != (wsize_new, hsize_new):
+            image = image.resize((wsize_new, hsize_new), Image.Resampling.BICUBIC)
+    else:
+        image = Image.open(args.path)
 
-    if image.format == "GIF":
-        image.seek(1)
+        if image.format == "GIF":
+            image.seek(1)
 
-    if image.mode in ["L", "P"]:
-        image = image.convert("RGB")
-    wsize, hsize = image.size
-    wsize_new, hsize_new = calculate_optimal_size(wsize, hsize, args.size)
-    if wsize_new < wsize or hsize_new < hsize:
-        image = image.resize((wsize_new, hsize_new), Image.Resampling.BICUBIC)
+        if image.mode in ["L", "P"]:
+            image = image.convert("RGB")
+        wsize, hsize = image.size
+        wsize_new, hsize_new = calculate_optimal_size(wsize, hsize, args.size)
+        if wsize_new < wsize or hsize_new < hsize:
+            image = image.resize((wsize_new, hsize_new), Image.Resampling.BICUBIC)
     # Auto-detect scheme from the already-resized image (avoids separate Python process)
     if args.scheme == "auto":
         args.scheme = _auto_detect_scheme(image)
@@ -1228,4 +1195,5 @@ if args.render_templates:
             ["python3", sddm_sync],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+            start_new_session=True,
         )
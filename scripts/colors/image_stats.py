@@ -0,0 +1,295 @@
+"""Image statistics and scheme selection shared by the wallpaper color scripts.
+
+scheme_for_image.py and generate_colors_material.py (--scheme auto) both
+classify an image with the decision tree in pick_scheme(); image_stats()
+computes its three inputs in one float32 pass, and hsv_histogram() plus
+histogram_stats() derive them from a fixed-size HSV histogram instead.
+"""
+
+import numpy as np
+
+# Allowed scheme types
+SCHEMES = [
+    "scheme-content",
+    "scheme-expressive",
+    "scheme-fidelity",
+    "scheme-fruit-salad",
+    "scheme-monochrome",
+    "scheme-neutral",
+    "scheme-rainbow",
+    "scheme-tonal-spot",
+]
+
+
+# Circular hue spread is reported on OpenCV's 0-180 hue scale and capped here;
+# a uniform hue distribution has no finite circular std-dev.
+HUE_SPREAD_MAX = 90.0
+
+# histogram_stats() bins: hue (2 degree steps on the 0-180 scale), saturation, value
+HIST_BINS = (90, 32, 32)
+# Pixels converted per step when accumulating a histogram
+HIST_CHUNK = 1 << 18
+
+
+def _mean_std(values, n):
+    total = float(values.sum(dtype=np.float64))
+    mean = total / n
+    var = max(float(np.dot(values, values)) / n - mean * mean, 0.0)
+    return mean, var ** 0.5
+
+
+def _circular_spread(cos_sum, sin_sum, weight):
+    """Circular std-dev of hue angles, in OpenCV hue units (degrees / 2)."""
+    if weight <= 0:
+        return 0.0
+    resultant = min((cos_sum * cos_sum + sin_sum * sin_sum) ** 0.5 / weight, 1.0)
+    if resultant <= 0:
+        return HUE_SPREAD_MAX
+    return min(float(np.degrees((-2 * np.log(resultant)) ** 0.5)) / 2, HUE_SPREAD_MAX)
+
+
+def _load_rgb(flat, bgr, r, g, b):
+    r[:] = flat[:, 2 if bgr else 0]
+    g[:] = flat[:, 1]
+    b[:] = flat[:, 0 if bgr else 2]
+
+
+def _hsv_into(r, g, b, v, s, h, tmp, alt, mask):
+    """
+    8-bit RGB rows -> value (0-255), saturation (0-1) and hue (radians).
+
+    Hue follows OpenCV's channel priority (R, then G, then B). Gray pixels
+    have zero numerators, so clamping the chroma to 1 leaves their hue at 0;
+    callers weight hue by saturation, which is 0 for them.
+    """
+    np.maximum(r, g, out=v)
+    np.maximum(v, b, out=v)
+    np.minimum(r, g, out=s)
+    np.minimum(s, b, out=s)
+    np.subtract(v, s, out=s)  # chroma
+    np.maximum(s, 1, out=tmp)
+    np.subtract(r, g, out=h)
+    h /= tmp
+    h += 4
+    np.subtract(b, r, out=alt)
+    alt /= tmp
+    alt += 2
+    np.equal(v, g, out=mask)
+    np.copyto(h, alt, where=mask)
+    np.subtract(g, b, out=alt)
+    alt /= tmp
+    np.remainder(alt, 6, out=alt)
+    np.equal(v, r, out=mask)
+    np.copyto(h, alt, where=mask)
+    h *= np.pi / 3
+    np.maximum(v, 1, out=tmp)
+    s /= tmp
+
+
+def image_stats(pixels, bgr=False):
+    """
+    Colorfulness, mean saturation and hue spread of an 8-bit image.
+
+    pixels is an (H, W, C) array with C >= 3 in RGB order (BGR with bgr=True,
+    as cv2 loads it); extra channels are ignored. Returns a tuple of:
+      - colorfulness  (Hasler-Süsstrunk metric, 0-~200+)
+      - saturation    (mean HSV saturation, 0-255)
+      - hue_spread    (saturation-weighted circular hue std-dev on OpenCV's
+                       0-180 scale, capped at HUE_SPREAD_MAX)
+
+    Hue is treated as an angle, so reds on both sides of 0/180 count as one
+    hue. All intermediates live in one float32 work buffer plus one boolean
+    mask; use histogram_stats() for full-resolution images.
+    """
+    flat = np.asarray(pixels).reshape(-1, pixels.shape[-1])
+    n = flat.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0.0
+
+    work = np.empty((8, n), dtype=np.float32)
+    mask = np.empty(n, dtype=bool)
+    r, g, b, v, s, h, tmp, alt = work
+    _load_rgb(flat, bgr, r, g, b)
+
+    # Colorfulness: |R - G| and |(R + G) / 2 - B|
+    np.subtract(r, g, out=s)
+    np.abs(s, out=s)
+    mean_rg, std_rg = _mean_std(s, n)
+    np.add(r, g, out=h)
+    h *= 0.5
+    h -= b
+    np.abs(h, out=h)
+    mean_yb, std_yb = _mean_std(h, n)
+    colorfulness = (std_rg ** 2 + std_yb ** 2) ** 0.5 + 0.3 * (
+        mean_rg ** 2 + mean_yb ** 2
+    ) ** 0.5
+
+    _hsv_into(r, g, b, v, s, h, tmp, alt, mask)
+    weight = float(s.sum(dtype=np.float64))
+    saturation = weight * 255 / n
+    np.cos(h, out=tmp)
+    cos_sum = float(np.dot(tmp, s))
+    np.sin(h, out=tmp)
+    sin_sum = float(np.dot(tmp, s))
+
+    return float(colorfulness), saturation, _circular_spread(cos_sum, sin_sum, weight)
+
+
+def hsv_histogram(pixels, bgr=False, bins=HIST_BINS, chunk=HIST_CHUNK):
+    """
+    Accumulate an (hue, saturation, value) pixel-count histogram in one pass.
+
+    Pixels are converted chunk by chunk, so memory stays at O(bins + chunk)
+    and the original image can be used instead of a downscale.
+    """
+    flat = np.asarray(pixels).reshape(-1, pixels.shape[-1])
+    hb, sb, vb = bins
+    hist = np.zeros(hb * sb * vb, dtype=np.float64)
+    size = min(chunk, max(flat.shape[0], 1))
+    work = np.empty((8, size), dtype=np.float32)
+    mask = np.empty(size, dtype=bool)
+    index = np.empty(size, dtype=np.intp)
+    for start in range(0, flat.shape[0], size):
+        part = flat[start:start + size]
+        m = part.shape[0]
+        r, g, b, v, s, h, tmp, alt = work[:, :m]
+        _load_rgb(part, bgr, r, g, b)
+        _hsv_into(r, g, b, v, s, h, tmp, alt, mask[:m])
+        # bin index = (hue_bin * sb + sat_bin) * vb + val_bin, exact in float32
+        h *= hb / (2 * np.pi)
+        np.minimum(h, hb - 1, out=h)
+        s *= sb
+        np.minimum(s, sb - 1, out=s)
+        v *= vb / 256
+        np.floor(h, out=h)
+        np.floor(s, out=s)
+        np.floor(v, out=v)
+        h *= sb
+        h += s
+        h *= vb
+        h += v
+        idx = index[:m]
+        idx[:] = h
+        hist += np.bincount(idx, minlength=hist.size)
+    return hist.reshape(bins)
+
+
+def _hsv_to_rgb(h, s, v):
+    """Vectorized HSV (hue in radians, s 0-1, v 0-255) to R, G, B arrays."""
+    sector = h * (3 / np.pi)
+    c = v * s
+    x = c * (1 - np.abs(sector % 2 - 1))
+    zero = np.zeros_like(c)
+    idx = np.minimum(sector.astype(int), 5)
+    r = np.choose(idx, [c, x, zero, zero, x, c])
+    g = np.choose(idx, [x, c, c, x, zero, zero])
+    b = np.choose(idx, [zero, zero, x, c, c, x])
+    m = v - c
+    return r + m, g + m, b + m
+
+
+def histogram_stats(hist):
+    """
+    image_stats() equivalents derived from an hsv_histogram().
+
+    Each occupied bin contributes its center color, so colorfulness is
+    approximated to the bin resolution; saturation and the circular hue
+    spread use the same weighting as image_stats().
+    """
+    hb, sb, vb = hist.shape
+    hi, si, vi = np.nonzero(hist)
+    counts = hist[hi, si, vi]
+    n = counts.sum()
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    h = (hi + 0.5) * (2 * np.pi / hb)
+    # Saturation bin 0 counts as gray so near-gray pixels stay out of the hue spread
+    s = np.where(si == 0, 0.0, (si + 0.5) / sb)
+    v = (vi + 0.5) * (256 / vb)
+    r, g, b = _hsv_to_rgb(h, s, v)
+
+    def weighted_mean_std(values):
+        mean = float(np.dot(counts, values) / n)
+        var = max(float(np.dot(counts, values * values) / n) - mean * mean, 0.0)
+        return mean, var ** 0.5
+
+    mean_rg, std_rg = weighted_mean_std(np.abs(r - g))
+    mean_yb, std_yb = weighted_mean_std(np.abs(0.5 * (r + g) - b))
+    colorfulness = (std_rg ** 2 + std_yb ** 2) ** 0.5 + 0.3 * (
+        mean_rg ** 2 + mean_yb ** 2
+    ) ** 0.5
+    weights = counts * s
+    weight = float(weights.sum())
+    hue_spread = _circular_spread(
+        float(np.dot(weights, np.cos(h))), float(np.dot(weights, np.sin(h))), weight
+    )
+    return float(colorfulness), weight * 255 / float(n), hue_spread
+
+
+def pick_scheme(colorfulness, saturation, hue_spread):
+    """
+    Multi-axis decision tree for scheme variant selection.
+
+    Axes:
+      - colorfulness  (Hasler-Süsstrunk metric, 0-~200+)
+      - saturation    (mean HSV saturation, 0-255)
+      - hue_spread    (circular hue std-dev, 0-90)
+
+    Design goals:
+      - tonal-spot is the safe default — most images should land here
+      - Near-grayscale images → monochrome (preserves intent)
+      - Low-color, muted images → neutral (calm palette)
+      - Focused moderate color → content (faithful to source)
+      - High saturation + focused hue → fidelity (vibrant but faithful)
+      - Expressive/rainbow only for genuinely extreme images
+    """
+    # Near-grayscale: very low saturation regardless of other metrics
+    if saturation < 20:
+        return "scheme-monochrome"
+
+    # Very low colorfulness can still carry enough saturation to avoid a flat
+    # neutral palette. Keep neutral for truly muted frames only.
+    if colorfulness < 30:
+        if saturation < 55:
+            return "scheme-neutral"
+        if hue_spread < 22:
+            return "scheme-content"
+        return "scheme-tonal-spot"
+
+    # Low-to-moderate colorfulness — tonal-spot or content
+    if colorfulness < 55:
+        if hue_spread < 22 and saturation < 100:
+            return "scheme-content"
+        return "scheme-tonal-spot"
+
+    # Moderate colorfulness — mostly tonal-spot, fidelity for saturated
+    if colorfulness < 90:
+        if saturation > 140 and hue_spread < 35:
+            # Very saturated with focused hue → fidelity
+            return "scheme-fidelity"
+        if hue_spread < 30:
+            # Focused color, moderate saturation → content
+            return "scheme-content"
+        return "scheme-tonal-spot"
+
+    # High colorfulness (90+) — only here do expressive/rainbow appear
+    if hue_spread > 55 and saturation > 150:
+        return "scheme-rainbow"
+    if saturation > 160:
+        return "scheme-fidelity"
+    if hue_spread > 45:
+        return "scheme-expressive"
+    return "scheme-tonal-spot"
+
+
+def scheme_for_pixels(pixels, bgr=False, histogram=False):
+    """Pick a scheme for an (H, W, C) 8-bit image array.
+
+    histogram=True derives the statistics from hsv_histogram(), which keeps
+    memory flat for full-resolution input."""
+    pixels = np.asarray(pixels)
+    if pixels.ndim != 3 or pixels.shape[2] < 3:
+        return "scheme-tonal-spot"
+    if histogram:
+        return pick_scheme(*histogram_stats(hsv_histogram(pixels, bgr=bgr)))
+    return pick_scheme(*image_stats(pixels, bgr=bgr))
@@ -1000,7 +1000,7 @@ inject_css_cdp() {
   fi
 
   py="$(venv_python)"
-  if [[ -f "$inject_script" ]] && "$py" "$inject_script" "$css_file" --port "$CDP_PORT" 2>/dev/null; then
+  if [[ -f "$inject_script" ]] && "$py" "$inject_script" "$css_file" --port "$CDP_PORT" --keep-alive 2>/dev/null; then
     log_module "injected CSS via CDP (live update)"
     return 0
   fi
@@ -2,60 +2,438 @@
 """Inject CSS into Pear Desktop (YouTube Music) via Chrome DevTools Protocol.
 
 Pear Desktop must be launched with --remote-debugging-port=9222 for this to work.
-The script reads a CSS file and injects it as a <style> element into every
-open page context, producing an instant live theme update.
+The script reads a CSS file and applies it as a constructed stylesheet
+(document.adoptedStyleSheets) in every open page context, producing an instant
+live theme update.
 
-Usage: pear-css-inject.py <css-file> [--port PORT]
+With --keep-alive the first run also starts a resident injector that holds
+one CDP websocket per Pear page, follows new pages through
+Target.setDiscoverTargets and listens on $XDG_RUNTIME_DIR/inir/pear-css.sock.
+Later runs hand the CSS file to it, so a theme change costs one message
+round-trip per page and only the top-level rules that changed are sent.
+The resident injector exits when Pear closes.
+
+Usage: pear-css-inject.py <css-file> [--port PORT] [--keep-alive]
+       pear-css-inject.py <css-file> --serve [--port PORT]
 Exit 0 on success (at least one context injected), 1 on failure.
 """
 
 import json
+import os
 import sys
 import asyncio
 import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
 
 DEFAULT_PORT = 9222
 STYLE_ID = "inir-pear-theme"
+SHEET_VAR = "__inirPearTheme"
+RPC_TIMEOUT = 3
+# Diffs touching more rules than this fraction are sent as a full replace
+DIFF_MAX_RATIO = 0.5
+
+# Replace the whole sheet; returns the browser's rule count (-1 on failure).
+# Also removes the <style> element older versions of this script injected.
+FULL_JS = (
+    "(function(css){"
+    "var d=document;if(!d.adoptedStyleSheets)return -1;"
+    f"var s=window.{SHEET_VAR};"
+    "if(!s||d.adoptedStyleSheets.indexOf(s)<0){"
+    f"s=new CSSStyleSheet();window.{SHEET_VAR}=s;"
+    "d.adoptedStyleSheets=d.adoptedStyleSheets.concat([s]);}"
+    f"var e=d.getElementById('{STYLE_ID}');if(e)e.remove();"
+    "s.replaceSync(css);return s.cssRules.length;"
+    "})"
+)
+
+# Swap individual rules by index; -1 tells the caller to fall back to FULL_JS
+DIFF_JS = (
+    "(function(n,ops){"
+    f"var s=window.{SHEET_VAR};"
+    "if(!s||document.adoptedStyleSheets.indexOf(s)<0||s.cssRules.length!==n)return -1;"
+    "try{for(var i=0;i<ops.length;i++){"
+    "s.deleteRule(ops[i][0]);s.insertRule(ops[i][1],ops[i][0]);}"
+    "}catch(err){return -1;}"
+    "return s.cssRules.length;"
+    "})"
+)
+
+
+def socket_path() -> Path:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/inir-{os.getuid()}"
+    return Path(runtime_dir) / "inir" / "pear-css.sock"
+
+
+def split_rules(css: str) -> list[str]:
+    """Split a stylesheet into its top-level rules (comments dropped)."""
+    rules = []
+    start = None
+    depth = 0
+    quote = None
+    i = 0
+    n = len(css)
+    while i < n:
+        ch = css[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch == "/" and css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0 and start is not None:
+                rules.append(css[start:i + 1].strip())
+                start = None
+        elif ch == ";" and depth == 0 and start is not None:
+            # Statement at-rules (@import, @charset, @layer a, b;)
+            rules.append(css[start:i + 1].strip())
+            start = None
+        if start is None and not ch.isspace() and ch not in ";}":
+            start = i
+        i += 1
+    return rules
+
+
+def wants_page(info: dict) -> bool:
+    """Only YouTube Music pages (avoid injecting into random tabs)."""
+    url = info.get("url", "")
+    return info.get("type", "page") == "page" and (
+        "music.youtube.com" in url
+        or "youtube-music" in url.lower()
+        or url.startswith("about:blank")
+    )
+
+
+def fetch_json(port: int, path: str):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=2) as r:
+        return json.loads(r.read())
+
+
+def call_expression(fn: str, *args) -> str:
+    return f"{fn}({','.join(json.dumps(a) for a in args)})"
 
 
 async def inject_into_page(ws_url: str, css: str) -> bool:
-    """Inject CSS into a single page context via WebSocket."""
+    """Inject CSS into a single page context via a one-off WebSocket."""
     try:
         import websockets
     except ImportError:
         return False
     try:
         async with websockets.connect(ws_url, max_size=2**20, open_timeout=2) as ws:
-            # JavaScript to inject/replace our style element
-            js = (
-                "(function(){"
-                f"var e=document.getElementById('{STYLE_ID}');"
-                "if(e)e.remove();"
-                "var s=document.createElement('style');"
-                f"s.id='{STYLE_ID}';"
-                f"s.textContent={json.dumps(css)};"
-                "if(document.head)document.head.appendChild(s);"
-                "return !!document.head;"
-                "})()"
-            )
             await ws.send(
                 json.dumps(
                     {
                         "id": 1,
                         "method": "Runtime.evaluate",
-                        "params": {"expression": js, "returnByValue": True},
+                        "params": {
+                            "expression": call_expression(FULL_JS, css),
+                            "returnByValue": True,
+                        },
                     }
                 )
             )
-            resp = json.loads(await asyncio.wait_for(ws.recv(), timeout=3))
-            val = resp.get("result", {}).get("result", {}).get("value", False)
-            return bool(val)
+            while True:
+                resp = json.loads(await asyncio.wait_for(ws.recv(), timeout=RPC_TIMEOUT))
+                if resp.get("id") == 1:
+                    break
+            val = resp.get("result", {}).get("result", {}).get("value", -1)
+            return isinstance(val, int) and val >= 0
     except Exception:
         return False
 
 
-async def main(css_file: str, port: int) -> int:
+class PageSession:
+    """A held CDP connection to one page, remembering the rules it has applied."""
+
+    def __init__(self, target_id: str, ws_url: str, injector: "ResidentInjector"):
+        self.target_id = target_id
+        self.ws_url = ws_url
+        self.injector = injector
+        self.ws = None
+        self.rules = None
+        self.next_id = 0
+        self.pending = {}
+        self.reader = None
+        self.lock = asyncio.Lock()
+
+    async def open(self) -> bool:
+        import websockets
+        try:
+            self.ws = await websockets.connect(self.ws_url, max_size=2**22, open_timeout=2)
+        except Exception:
+            return False
+        self.reader = asyncio.create_task(self._read())
+        # Navigation throws away adoptedStyleSheets; re-apply on every new document
+        try:
+            await self.call("Page.enable")
+        except Exception:
+            await self.close()
+            return False
+        return True
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        if self.ws:
+            await self.ws.close()
+        for fut in self.pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError("page closed"))
+        self.pending.clear()
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                fut = self.pending.pop(msg.get("id"), None)
+                if fut is not None:
+                    if not fut.done():
+                        fut.set_result(msg)
+                elif msg.get("method") == "Page.domContentEventFired":
+                    self.rules = None
+                    asyncio.create_task(self.injector.apply_to(self))
+        except Exception:
+            pass
+        finally:
+            self.injector.drop(self.target_id)
+
+    async def call(self, method: str, params: dict | None = None) -> dict:
+        self.next_id += 1
+        msg_id = self.next_id
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[msg_id] = fut
+        await self.ws.send(json.dumps({"id": msg_id, "method": method, "params": params or {}}))
+        try:
+            return await asyncio.wait_for(fut, timeout=RPC_TIMEOUT)
+        finally:
+            self.pending.pop(msg_id, None)
+
+    async def evaluate(self, expression: str) -> int:
+        resp = await self.call(
+            "Runtime.evaluate", {"expression": expression, "returnByValue": True}
+        )
+        val = resp.get("result", {}).get("result", {}).get("value", -1)
+        return val if isinstance(val, int) else -1
+
+    async def apply(self, css: str, rules: list[str]) -> bool:
+        async with self.lock:
+            old = self.rules
+            if old is not None and len(old) == len(rules):
+                ops = [[i, rule] for i, (prev, rule) in enumerate(zip(old, rules)) if prev != rule]
+                if not ops:
+                    return True
+                if len(ops) <= max(1, len(rules) * DIFF_MAX_RATIO):
+                    count = await self.evaluate(call_expression(DIFF_JS, len(old), ops))
+                    if count == len(rules):
+                        self.rules = rules
+                        return True
+            count = await self.evaluate(call_expression(FULL_JS, css))
+            # Rule-level diffs are only safe when the browser parsed the sheet
+            # into the same rules we split it into (it drops invalid ones)
+            self.rules = rules if count == len(rules) else None
+            return count >= 0
+
+
+class ResidentInjector:
+    """Keeps CDP sessions to Pear pages open and pushes CSS updates over them."""
+
+    def __init__(self, port: int, css_file: str):
+        self.port = port
+        self.css_file = css_file
+        self.css = ""
+        self.rules = []
+        self.sessions = {}
+        self.browser = None
+        self.closed = asyncio.Event()
+
+    def load(self, css_file: str | None = None) -> bool:
+        if css_file:
+            self.css_file = css_file
+        try:
+            with open(self.css_file) as f:
+                css = f.read()
+        except IOError as e:
+            print(f"Cannot read CSS file: {e}", file=sys.stderr)
+            return False
+        if css != self.css:
+            self.css = css
+            self.rules = split_rules(css)
+        return True
+
+    async def attach(self, info: dict):
+        target_id = info.get("targetId") or info.get("id")
+        if not target_id or target_id in self.sessions or not wants_page(info):
+            return
+        ws_url = info.get("webSocketDebuggerUrl") or (
+            f"ws://127.0.0.1:{self.port}/devtools/page/{target_id}"
+        )
+        session = PageSession(target_id, ws_url, self)
+        self.sessions[target_id] = session
+        if not await session.open():
+            self.sessions.pop(target_id, None)
+            return
+        await self.apply_to(session)
+
+    def drop(self, target_id: str):
+        session = self.sessions.pop(target_id, None)
+        if session is not None:
+            asyncio.create_task(session.close())
+
+    async def apply_to(self, session: PageSession) -> bool:
+        try:
+            return await session.apply(self.css, self.rules)
+        except Exception:
+            return False
+
+    async def rescan(self):
+        """Pick up pages through /json when target discovery is unavailable."""
+        try:
+            pages = await asyncio.to_thread(fetch_json, self.port, "/json")
+        except Exception:
+            return
+        for page in pages:
+            await self.attach(page)
+
+    async def inject(self, css_file: str | None = None) -> int:
+        if not self.load(css_file):
+            return 0
+        if self.browser is None:
+            await self.rescan()
+        results = await asyncio.gather(
+            *(self.apply_to(s) for s in list(self.sessions.values()))
+        )
+        return sum(1 for r in results if r)
+
+    async def discover(self):
+        """Follow page creation and navigation through the browser target."""
+        import websockets
+        try:
+            version = await asyncio.to_thread(fetch_json, self.port, "/json/version")
+            browser_url = version["webSocketDebuggerUrl"]
+            self.browser = await websockets.connect(browser_url, max_size=2**22, open_timeout=2)
+            await self.browser.send(
+                json.dumps({"id": 1, "method": "Target.setDiscoverTargets",
+                            "params": {"discover": True}})
+            )
+        except Exception:
+            self.browser = None
+            return await self._poll()
+        try:
+            async for raw in self.browser:
+                msg = json.loads(raw)
+                method = msg.get("method")
+                info = msg.get("params", {}).get("targetInfo", {})
+                if method in ("Target.targetCreated", "Target.targetInfoChanged"):
+                    asyncio.create_task(self.attach(info))
+                elif method == "Target.targetDestroyed":
+                    self.drop(msg["params"].get("targetId", ""))
+        except Exception:
+            pass
+        # The browser socket only closes when Pear exits
+        self.closed.set()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(5)
+            try:
+                await asyncio.to_thread(fetch_json, self.port, "/json/version")
+            except Exception:
+                self.closed.set()
+                return
+            await self.rescan()
+
+    async def handle_client(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            injected = await self.inject(request.get("css_file"))
+            writer.write(json.dumps({"injected": injected}).encode() + b"\n")
+            await writer.drain()
+        except Exception as e:
+            writer.write(json.dumps({"injected": 0, "error": str(e)}).encode() + b"\n")
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+        for session in list(self.sessions.values()):
+            await session.close()
+
+
+async def ask_resident(css_file: str) -> int | None:
+    """Hand the CSS file to a running resident injector, or None if there is none."""
+    path = socket_path()
+    if not path.exists():
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(str(path)), 1)
+        writer.write(json.dumps({"css_file": os.path.abspath(css_file)}).encode() + b"\n")
+        await writer.drain()
+        reply = json.loads(await asyncio.wait_for(reader.readline(), RPC_TIMEOUT * 2))
+        writer.close()
+    except Exception:
+        return None
+    return int(reply.get("injected", 0))
+
+
+def spawn_resident(css_file: str, port: int):
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), os.path.abspath(css_file),
+         "--serve", "--port", str(port)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+async def serve(css_file: str, port: int) -> int:
+    """Run the resident injector until Pear closes."""
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        print("websockets not installed", file=sys.stderr)
+        return 1
+
+    path = socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if await ask_resident(css_file) is not None:
+        return 0  # another instance already serves this session
+    path.unlink(missing_ok=True)
+
+    injector = ResidentInjector(port, css_file)
+    injector.load()
+    server = await asyncio.start_unix_server(injector.handle_client, path=str(path))
+    os.chmod(path, 0o600)
+    discovery = asyncio.create_task(injector.discover())
+    await injector.rescan()
+    try:
+        await injector.closed.wait()
+    finally:
+        discovery.cancel()
+        server.close()
+        path.unlink(missing_ok=True)
+        await injector.close()
+    return 0
+
+
+async def main(css_file: str, port: int, keep_alive: bool = False) -> int:
     """Main injection routine."""
+    injected = await ask_resident(css_file)
+    if injected is not None:
+        return 0 if injected > 0 else 1
+
     try:
         import websockets  # noqa: F401
     except ImportError:
@@ -69,34 +447,24 @@ async def main(css_file: str, port: int) -> int:
         print(f"Cannot read CSS file: {e}", file=sys.stderr)
         return 1
 
-    import urllib.request
-
-    cdp_url = f"http://127.0.0.1:{port}/json"
     try:
-        with urllib.request.urlopen(cdp_url, timeout=2) as r:
-            pages = json.loads(r.read())
+        pages = fetch_json(port, "/json")
     except Exception:
         # CDP not available — pear-desktop probably not running with debug port
         return 1
 
-    # Filter to only YouTube Music pages (avoid injecting into random tabs)
-    tasks = []
-    for page in pages:
-        ws_url = page.get("webSocketDebuggerUrl", "")
-        url = page.get("url", "")
-        # Inject into music.youtube.com pages and the main app frame
-        if ws_url and (
-            "music.youtube.com" in url
-            or "youtube-music" in url.lower()
-            or url.startswith("about:blank")
-        ):
-            tasks.append(inject_into_page(ws_url, css))
-
+    tasks = [
+        inject_into_page(page["webSocketDebuggerUrl"], css)
+        for page in pages
+        if page.get("webSocketDebuggerUrl") and wants_page(page)
+    ]
     if not tasks:
         return 1
 
     results = await asyncio.gather(*tasks)
     injected = sum(1 for r in results if r)
+    if keep_alive:
+        spawn_resident(css_file, port)
     return 0 if injected > 0 else 1
 
 
@@ -109,5 +477,17 @@ if __name__ == "__main__":
         default=DEFAULT_PORT,
         help=f"CDP port (default: {DEFAULT_PORT})",
     )
+    parser.add_argument(
+        "--keep-alive",
+        action="store_true",
+        help="Start a resident injector so later updates reuse open CDP sessions",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the resident injector in the foreground",
+    )
     args = parser.parse_args()
-    sys.exit(asyncio.run(main(args.css_file, args.port)))
+    if args.serve:
+        sys.exit(asyncio.run(serve(args.css_file, args.port)))
+    sys.exit(asyncio.run(main(args.css_file, args.port, args.keep_alive)))
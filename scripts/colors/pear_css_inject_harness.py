@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Fake-CDP harness for pear-css-inject.py's resident injector.
+
+Starts a local fake Chrome DevTools endpoint (/json, /json/version, one
+websocket per page and one for the browser target) that keeps a model of
+each page's adopted stylesheet, then drives ResidentInjector against it:
+
+  - attach to the listed pages, skipping one whose socket dies on
+    Page.enable (no session or reader task may be left behind);
+  - push a theme with one changed rule and check it goes out as a
+    single rule-level diff, one message per page;
+  - announce a new page through Target.targetCreated and check it gets
+    the full sheet.
+
+Prints a JSON report; exits non-zero if any check fails.
+
+Usage: pear_css_inject_harness.py [--pages N] [--updates N]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+from websockets.asyncio.server import serve
+from websockets.http11 import Response
+from websockets.datastructures import Headers
+
+_spec = importlib.util.spec_from_file_location(
+    "pear_css_inject", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pear-css-inject.py")
+)
+pci = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pci)
+
+BASE_CSS = "".join(f".rule{i} {{ color: #{i:06x}; }}\n" for i in range(40))
+
+
+def themed_css(update):
+    """BASE_CSS with exactly one rule changed per update."""
+    rules = pci.split_rules(BASE_CSS)
+    rules[update % len(rules)] = f".rule{update % len(rules)} {{ color: #ff{update:04x}; }}"
+    return "\n".join(rules) + "\n"
+
+
+class FakePage:
+    def __init__(self, target_id, broken=False):
+        self.target_id = target_id
+        self.broken = broken
+        self.rules = None
+        self.evaluations = []  # "full" or "diff", in arrival order
+
+    def info(self, port):
+        return {
+            "id": self.target_id,
+            "targetId": self.target_id,
+            "type": "page",
+            "url": "https://music.youtube.com/",
+            "webSocketDebuggerUrl": f"ws://127.0.0.1:{port}/devtools/page/{self.target_id}",
+        }
+
+    def evaluate(self, expression):
+        for name, fn in (("full", pci.FULL_JS), ("diff", pci.DIFF_JS)):
+            if expression.startswith(fn + "("):
+                args = json.loads("[" + expression[len(fn) + 1 : -1] + "]")
+                break
+        else:
+            return -1
+        self.evaluations.append(name)
+        if name == "full":
+            self.rules = pci.split_rules(args[0])
+            return len(self.rules)
+        count, ops = args
+        if self.rules is None or len(self.rules) != count:
+            return -1
+        for index, rule in ops:
+            self.rules[index] = rule
+        return len(self.rules)
+
+
+class FakeCdp:
+    def __init__(self):
+        self.pages = {}
+        self.browsers = set()
+        self.port = None
+
+    def add_page(self, target_id, broken=False):
+        page = self.pages[target_id] = FakePage(target_id, broken)
+        return page
+
+    async def announce(self, page):
+        message = json.dumps({"method": "Target.targetCreated",
+                              "params": {"targetInfo": page.info(self.port)}})
+        for ws in list(self.browsers):
+            await ws.send(message)
+
+    def process_request(self, connection, request):
+        if request.path in ("/json", "/json/list"):
+            body = [p.info(self.port) for p in self.pages.values()]
+        elif request.path == "/json/version":
+            body = {"webSocketDebuggerUrl": f"ws://127.0.0.1:{self.port}/devtools/browser/fake"}
+        else:
+            return None  # websocket upgrade
+        data = json.dumps(body).encode()
+        headers = Headers([("Content-Type", "application/json"), ("Content-Length", str(len(data)))])
+        return Response(200, "OK", headers, data)
+
+    async def handler(self, ws):
+        path = ws.request.path
+        if path.startswith("/devtools/browser/"):
+            self.browsers.add(ws)
+            try:
+                async for raw in ws:
+                    msg = json.loads(raw)
+                    await ws.send(json.dumps({"id": msg["id"], "result": {}}))
+            finally:
+                self.browsers.discard(ws)
+            return
+        page = self.pages.get(path.rsplit("/", 1)[-1])
+        if page is None:
+            return
+        async for raw in ws:
+            msg = json.loads(raw)
+            method = msg.get("method")
+            if method == "Page.enable" and page.broken:
+                return  # drop the socket mid-handshake
+            result = {}
+            if method == "Runtime.evaluate":
+                value = page.evaluate(msg["params"]["expression"])
+                result = {"result": {"type": "number", "value": value}}
+            await ws.send(json.dumps({"id": msg["id"], "result": result}))
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def run(page_count, updates):
+    fake = FakeCdp()
+    pages = [fake.add_page(f"page{i}") for i in range(page_count)]
+    broken = fake.add_page("broken", broken=True)
+    checks = {}
+
+    async with serve(fake.handler, "127.0.0.1", 0, process_request=fake.process_request) as server:
+        fake.port = server.sockets[0].getsockname()[1]
+        with tempfile.TemporaryDirectory() as tmp:
+            css_file = os.path.join(tmp, "theme.css")
+            with open(css_file, "w") as f:
+                f.write(BASE_CSS)
+
+            injector = pci.ResidentInjector(fake.port, css_file)
+            injector.load()
+            discovery = asyncio.create_task(injector.discover())
+            try:
+                await injector.rescan()
+                await wait_for(lambda: fake.browsers)
+                checks["attached"] = sorted(injector.sessions) == sorted(p.target_id for p in pages)
+                checks["broken_page_dropped"] = broken.target_id not in injector.sessions
+                checks["initial_full_sheet"] = all(p.evaluations == ["full"] for p in pages)
+
+                latencies = []
+                for update in range(1, updates + 1):
+                    with open(css_file, "w") as f:
+                        f.write(themed_css(update))
+                    start = time.perf_counter_ns()
+                    injected = await injector.inject(css_file)
+                    latencies.append(time.perf_counter_ns() - start)
+                    if injected != page_count:
+                        checks["every_update_injected"] = False
+                checks.setdefault("every_update_injected", True)
+                expected = pci.split_rules(themed_css(updates))
+                checks["updates_sent_as_diffs"] = all(
+                    p.evaluations == ["full"] + ["diff"] * updates for p in pages
+                )
+                checks["sheets_match"] = all(p.rules == expected for p in pages)
+
+                late = fake.add_page("late")
+                await fake.announce(late)
+                checks["new_page_attached"] = await wait_for(
+                    lambda: late.rules == expected
+                )
+            finally:
+                discovery.cancel()
+                await injector.close()
+
+    latencies.sort()
+    return {
+        "pages": page_count,
+        "updates": updates,
+        "messages_per_page_per_update": 1 if checks.get("updates_sent_as_diffs") else None,
+        "median_update_us": round(latencies[len(latencies) // 2] / 1000) if latencies else None,
+        "checks": checks,
+        "ok": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the resident Pear CSS injector against a fake CDP server")
+    parser.add_argument("--pages", type=int, default=3, help="Fake YouTube Music pages")
+    parser.add_argument("--updates", type=int, default=20, help="Theme updates to push")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(max(1, args.pages), max(1, args.updates)))
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -174,6 +174,12 @@ has_valid_file() {
     [[ -n "$path" && -f "$path" && -s "$path" ]]
 }
 
+# Cache a video's first frame as $THUMBNAIL_DIR/<md5 of path>.jpg through the
+# extractor Wallpapers.qml and the SDDM sync share; a no-op when already cached
+extract_video_first_frame() {
+    python3 "$SCRIPT_DIR/../thumbnails/video_frames.py" --output-dir "$THUMBNAIL_DIR" "$1" >/dev/null 2>&1
+}
+
 kill_existing_mpvpaper() {
     pkill -f -9 mpvpaper || true
 }
@@ -483,7 +489,7 @@ switch() {
             if has_valid_file "$config_thumbnail"; then
                 thumbnail="$config_thumbnail"
             elif ! has_valid_file "$thumbnail"; then
-                ffmpeg -y -i "$imgpath" -vframes 1 "$thumbnail" 2>/dev/null
+                extract_video_first_frame "$imgpath"
             fi
 
             if ! has_valid_file "$thumbnail"; then
@@ -579,6 +585,7 @@ switch() {
                 # Check if backdrop is a video - use its thumbnail instead
                 if is_video "$backdrop_path"; then
                     local backdrop_thumb="$THUMBNAIL_DIR/$(echo -n "$backdrop_path" | md5sum | cut -d' ' -f1).jpg"
+                    has_valid_file "$backdrop_thumb" || extract_video_first_frame "$backdrop_path"
                     if [[ -f "$backdrop_thumb" ]]; then
                         generate_colors_material_args=(--path "$backdrop_thumb")
                     fi
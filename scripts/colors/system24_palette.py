@@ -15,6 +15,7 @@ import json
 import os
 import math
 from colorsys import rgb_to_hls, hls_to_rgb
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Tuple
 
@@ -203,11 +204,18 @@ def _load_colors() -> Dict[str, str]:
     return {k: v.lower() for k, v in data.items()}
 
 
+@lru_cache(maxsize=None)
 def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
     color = color.lstrip("#")
     return tuple(int(color[i : i + 2], 16) for i in range(0, 6, 2))
 
 
+@lru_cache(maxsize=None)
+def _hex_to_hls(color: str) -> Tuple[float, float, float]:
+    r, g, b = (c / 255.0 for c in _hex_to_rgb(color))
+    return rgb_to_hls(r, g, b)
+
+
 def _rgb_to_hex(rgb) -> str:
     # Keep parity with Go generator (math.Round rounds .5 away from zero).
     def _round_half_up(v: float) -> int:
@@ -229,8 +237,7 @@ def _mix(color_a: str, color_b: str, weight: float) -> str:
 
 
 def _adjust_lightness(color: str, delta: float) -> str:
-    r, g, b = (c / 255.0 for c in _hex_to_rgb(color))
-    h, l, s = rgb_to_hls(r, g, b)
+    h, l, s = _hex_to_hls(color)
     l = max(0.0, min(1.0, l + delta))
     r2, g2, b2 = hls_to_rgb(h, l, s)
     return _rgb_to_hex((r2 * 255, g2 * 255, b2 * 255))
@@ -241,147 +248,134 @@ def _rgba(color: str, alpha: float) -> str:
     return f"rgba({r}, {g}, {b}, {alpha:.2f})"
 
 
-def _build_palette(colors: Dict[str, str]) -> Dict[str, str]:
-    """Build the complete system24 color palette from Material You colors."""
-    primary = colors["primary"]
-    secondary = colors["secondary"]
-    tertiary = colors["tertiary"]
-    error = colors["error"]
-    surface = colors["surface"]
-    surface_low = colors["surface_container_low"]
-    surface_std = colors["surface_container"]
-    surface_high = colors["surface_container_high"]
-    surface_highest = colors["surface_container_highest"]
-    outline = colors["outline"]
-    on_surface = colors["on_surface"]
-    on_surface_variant = colors["on_surface_variant"]
-    on_primary = colors["on_primary"]
-
-    palette: Dict[str, str] = {}
+def _gradient(color: str, transparency: int) -> str:
+    return (
+        f"linear-gradient(to right, "
+        f"color-mix(in hsl, {color}, transparent {transparency}%) 40%, transparent)"
+    )
 
-    # Enable custom colors
-    palette["--colors"] = "on"
 
+# Operations available to PALETTE_TABLE; color operands are looked up by name
+# (Material color keys or earlier table entries), the rest are passed as-is.
+_OPS = {
+    "copy": lambda color: color,
+    "mix": _mix,
+    "lighten": _adjust_lightness,
+    "rgba": _rgba,
+    "gradient": _gradient,
+}
+
+# 5-step ladder offsets applied by make_ladder()
+LADDER_STEPS = (0.15, 0.08, 0.0, -0.08, -0.15)
+
+
+def make_ladder(name: str, base: str) -> list:
+    """Table rows for a 5-step color ladder (--{name}-1 .. --{name}-5) from base."""
+    return [
+        (f"--{name}-{i}", "lighten", base, delta) if delta else (f"--{name}-{i}", "copy", base)
+        for i, delta in enumerate(LADDER_STEPS, 1)
+    ]
+
+
+# The system24 palette as a table of (variable, operation, color, *arguments)
+# rows over the Material You colors. Rows without a "--" prefix are
+# intermediate colors that later rows refer to.
+PALETTE_TABLE = [
     # === TEXT COLORS ===
     # --text-0: text on colored elements (like buttons)
-    palette["--text-0"] = on_primary
+    ("--text-0", "copy", "on_primary"),
     # --text-1: bright white text
-    palette["--text-1"] = on_surface
+    ("--text-1", "copy", "on_surface"),
     # --text-2: headings and important text
-    palette["--text-2"] = _mix(on_surface, on_surface_variant, 0.2)
+    ("--text-2", "mix", "on_surface", "on_surface_variant", 0.2),
     # --text-3: normal text
-    palette["--text-3"] = _mix(on_surface, on_surface_variant, 0.4)
+    ("--text-3", "mix", "on_surface", "on_surface_variant", 0.4),
     # --text-4: icon buttons and channels
-    palette["--text-4"] = on_surface_variant
+    ("--text-4", "copy", "on_surface_variant"),
     # --text-5: muted channels/chats and timestamps
-    palette["--text-5"] = outline
-
+    ("--text-5", "copy", "outline"),
     # === BACKGROUND COLORS ===
     # --bg-4: main background (darkest)
-    palette["--bg-4"] = surface
+    ("--bg-4", "copy", "surface"),
     # --bg-3: spacing, secondary elements
-    palette["--bg-3"] = surface_low
+    ("--bg-3", "copy", "surface_container_low"),
     # --bg-2: dark buttons
-    palette["--bg-2"] = surface_std
+    ("--bg-2", "copy", "surface_container"),
     # --bg-1: dark buttons when clicked
-    palette["--bg-1"] = surface_high
+    ("--bg-1", "copy", "surface_container_high"),
     # --bg-floating: floating panels
-    palette["--bg-floating"] = surface_highest
-
+    ("--bg-floating", "copy", "surface_container_highest"),
     # === INTERACTION STATES ===
-    palette["--hover"] = _rgba(primary, 0.10)
-    palette["--active"] = _rgba(primary, 0.20)
-    palette["--active-2"] = _rgba(primary, 0.30)
-    palette["--message-hover"] = _rgba(primary, 0.08)
-
+    ("--hover", "rgba", "primary", 0.10),
+    ("--active", "rgba", "primary", 0.20),
+    ("--active-2", "rgba", "primary", 0.30),
+    ("--message-hover", "rgba", "primary", 0.08),
     # === ACCENT COLORS (based on primary) ===
-    palette["--accent-1"] = _adjust_lightness(primary, 0.10)
-    palette["--accent-2"] = primary
-    palette["--accent-3"] = _adjust_lightness(primary, -0.05)
-    palette["--accent-4"] = _adjust_lightness(primary, -0.10)
-    palette["--accent-5"] = _adjust_lightness(primary, -0.15)
-    palette["--accent-new"] = primary  # Use accent color instead of error for NEW badge
-
+    ("--accent-1", "lighten", "primary", 0.10),
+    ("--accent-2", "copy", "primary"),
+    ("--accent-3", "lighten", "primary", -0.05),
+    ("--accent-4", "lighten", "primary", -0.10),
+    ("--accent-5", "lighten", "primary", -0.15),
+    ("--accent-new", "copy", "primary"),  # Use accent color instead of error for NEW badge
     # === MENTION/REPLY GRADIENTS ===
-    palette["--mention"] = (
-        f"linear-gradient(to right, "
-        f"color-mix(in hsl, {primary}, transparent 90%) 40%, transparent)"
-    )
-    palette["--mention-hover"] = (
-        f"linear-gradient(to right, "
-        f"color-mix(in hsl, {primary}, transparent 95%) 40%, transparent)"
-    )
-    palette["--reply"] = (
-        f"linear-gradient(to right, "
-        f"color-mix(in hsl, {on_surface_variant}, transparent 90%) 40%, transparent)"
-    )
-    palette["--reply-hover"] = (
-        f"linear-gradient(to right, "
-        f"color-mix(in hsl, {on_surface_variant}, transparent 95%) 40%, transparent)"
-    )
-
+    ("--mention", "gradient", "primary", 90),
+    ("--mention-hover", "gradient", "primary", 95),
+    ("--reply", "gradient", "on_surface_variant", 90),
+    ("--reply-hover", "gradient", "on_surface_variant", 95),
     # === STATUS COLORS ===
-    palette["--online"] = tertiary
-    palette["--dnd"] = error
-    palette["--idle"] = secondary
-    palette["--streaming"] = _adjust_lightness(tertiary, 0.10)
-    palette["--offline"] = on_surface_variant
-
+    ("--online", "copy", "tertiary"),
+    ("--dnd", "copy", "error"),
+    ("--idle", "copy", "secondary"),
+    ("--streaming", "lighten", "tertiary", 0.10),
+    ("--offline", "copy", "on_surface_variant"),
     # === BORDER COLORS ===
-    palette["--border-light"] = _rgba(outline, 0.12)
-    palette["--border"] = _rgba(outline, 0.22)
-    palette["--border-hover"] = _rgba(_mix(outline, primary, 0.35), 0.50)
-    palette["--button-border"] = _rgba(outline, 0.16)
-
+    ("--border-light", "rgba", "outline", 0.12),
+    ("--border", "rgba", "outline", 0.22),
+    ("border_hover_base", "mix", "outline", "primary", 0.35),
+    ("--border-hover", "rgba", "border_hover_base", 0.50),
+    ("--button-border", "rgba", "outline", 0.16),
     # === BASE COLOR LADDERS ===
     # These are used throughout system24 for various UI elements
-
-    def make_ladder(base: str) -> list:
-        """Create 5-step color ladder from base color."""
-        return [
-            _adjust_lightness(base, 0.15),
-            _adjust_lightness(base, 0.08),
-            base,
-            _adjust_lightness(base, -0.08),
-            _adjust_lightness(base, -0.15),
-        ]
-
     # Red ladder (from error color)
-    for i, color in enumerate(make_ladder(error), 1):
-        palette[f"--red-{i}"] = color
-
+    *make_ladder("red", "error"),
     # Green ladder (from tertiary - usually green-ish)
-    for i, color in enumerate(make_ladder(tertiary), 1):
-        palette[f"--green-{i}"] = color
-
+    *make_ladder("green", "tertiary"),
     # Blue ladder (from secondary)
-    for i, color in enumerate(make_ladder(secondary), 1):
-        palette[f"--blue-{i}"] = color
-
+    *make_ladder("blue", "secondary"),
     # Yellow ladder (mix of primary and tertiary for warm tone)
-    yellow_base = _mix(primary, tertiary, 0.3)
-    yellow_base = _adjust_lightness(yellow_base, 0.05)
-    for i, color in enumerate(make_ladder(yellow_base), 1):
-        palette[f"--yellow-{i}"] = color
-
+    ("yellow_mix", "mix", "primary", "tertiary", 0.3),
+    ("yellow_base", "lighten", "yellow_mix", 0.05),
+    *make_ladder("yellow", "yellow_base"),
     # Purple ladder (mix of primary and secondary)
-    purple_base = _mix(primary, secondary, 0.5)
-    for i, color in enumerate(make_ladder(purple_base), 1):
-        palette[f"--purple-{i}"] = color
-
+    ("purple_base", "mix", "primary", "secondary", 0.5),
+    *make_ladder("purple", "purple_base"),
     # Orange ladder (warmer version of primary)
-    orange_base = _mix(primary, error, 0.3)
-    for i, color in enumerate(make_ladder(orange_base), 1):
-        palette[f"--orange-{i}"] = color
-
+    ("orange_base", "mix", "primary", "error", 0.3),
+    *make_ladder("orange", "orange_base"),
     # === DISCORD BRAND OVERRIDES ===
     # These override Discord's default blurple with our accent
-    palette["--brand-360"] = _adjust_lightness(primary, 0.08)
-    palette["--brand-400"] = _adjust_lightness(primary, 0.04)
-    palette["--brand-500"] = primary
-    palette["--brand-560"] = _adjust_lightness(primary, -0.06)
-    palette["--brand-600"] = _adjust_lightness(primary, -0.12)
+    ("--brand-360", "lighten", "primary", 0.08),
+    ("--brand-400", "lighten", "primary", 0.04),
+    ("--brand-500", "copy", "primary"),
+    ("--brand-560", "lighten", "primary", -0.06),
+    ("--brand-600", "lighten", "primary", -0.12),
+]
+
 
+def _build_palette(colors: Dict[str, str]) -> Dict[str, str]:
+    """Build the complete system24 color palette from Material You colors.
+
+    Evaluates PALETTE_TABLE in one pass; each distinct color is parsed and
+    converted to HLS once (see _hex_to_hls) however many rows use it.
+    """
+    values: Dict[str, str] = dict(colors)
+    # Enable custom colors
+    palette: Dict[str, str] = {"--colors": "on"}
+    for name, op, color, *args in PALETTE_TABLE:
+        operands = [values[a] if isinstance(a, str) else a for a in args]
+        values[name] = _OPS[op](values[color], *operands)
+        if name.startswith("--"):
+            palette[name] = values[name]
     return palette
 
 
@@ -393,31 +387,49 @@ def _build_palette_css(palette: Dict[str, str]) -> str:
     return "\n".join(palette_lines)
 
 
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace path with content unless it already matches.
+
+    A symlinked path (e.g. a theme file kept in a dotfiles repo) is resolved
+    first, so its target is replaced and the link itself is kept.
+    """
+    path = path.resolve()
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return False
+    except OSError:
+        pass
+    _ensure_parent(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
 def _write_palette(palette: Dict[str, str]) -> None:
-    """Write the complete theme files with embedded palette."""
+    """Write the complete theme files with embedded palette.
+
+    Targets whose content is already current are left untouched, so the
+    Discord clients' theme watchers only reload when the palette changed.
+    """
     palette_css = _build_palette_css(palette)
 
     system24_outputs = _resolve_output_files("SYSTEM24_PALETTE_CSS", OUTPUT_FILE)
     midnight_outputs = _resolve_output_files("MIDNIGHT_DMS_CSS", MIDNIGHT_OUTPUT_FILE)
 
-    for out in system24_outputs + midnight_outputs:
-        _ensure_parent(out)
-
     system24_content = THEME_TEMPLATE.format(palette_css=palette_css)
     midnight_content = MIDNIGHT_THEME_TEMPLATE.format(palette_css=palette_css)
 
     for out in system24_outputs:
-        with out.open("w", encoding="utf-8") as fh:
-            fh.write(system24_content)
-        print(f"Generated: {out}")
+        changed = _write_if_changed(out, system24_content)
+        print(f"{'Generated' if changed else 'Unchanged'}: {out}")
 
     for out in midnight_outputs:
-        with out.open("w", encoding="utf-8") as fh:
-            fh.write(midnight_content)
+        changed = _write_if_changed(out, midnight_content)
         legacy_out = out.parent / "ii-midnight.theme.css"
         if legacy_out != out:
             legacy_out.unlink(missing_ok=True)
-        print(f"Generated: {out}")
+        print(f"{'Generated' if changed else 'Unchanged'}: {out}")
 
 
 def main() -> None:
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""iNiR input daemon: one evdev reader per device, events for the shell.
+
+Every keyboard and pointer is opened once through the shared device
+registry (inir_input_devices.py) and each event is passed to the handlers
+that claimed the device. Handlers publish JSON events, one per line, to
+every shell connected to $XDG_RUNTIME_DIR/inir/input.sock:
+
+  {"type": "super-tap"}
+  {"type": "lock-state", "caps": true, "num": false, "scroll": false, "devices": 2}
+
+A new subscriber first receives each handler's current state, so the
+shell never has to poll or spawn a helper to learn it. Handlers are
+listed in HANDLERS; a new one (e.g. a chord) subclasses InputHandler.
+
+When no shell is subscribed, a Super tap falls back to the
+`inir overview toggle` launcher, using the shell environment read once
+and kept while a pidfd reports the shell alive.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from evdev import ecodes
+
+from inir_input_devices import DeviceRegistry
+
+SUPER_CODES = {ecodes.KEY_LEFTMETA, ecodes.KEY_RIGHTMETA}
+
+POINTER_BUTTON_CODES = {
+    ecodes.BTN_LEFT,
+    ecodes.BTN_RIGHT,
+    ecodes.BTN_MIDDLE,
+    ecodes.BTN_SIDE,
+    ecodes.BTN_EXTRA,
+    ecodes.BTN_FORWARD,
+    ecodes.BTN_BACK,
+}
+
+LOCK_LED_CODES = {ecodes.LED_CAPSL, ecodes.LED_NUML, ecodes.LED_SCROLLL}
+# lock-state field -> LED
+LOCK_LEDS = {"caps": ecodes.LED_CAPSL, "num": ecodes.LED_NUML, "scroll": ecodes.LED_SCROLLL}
+
+# Ignore clearly virtual devices (ydotoold, etc.) to avoid echo.
+IGNORED_NAME_PARTS = ("ydotool", "virtual")
+
+# Debounce window (seconds) to coalesce multiple duplicate events from
+# several devices (physical + virtual keyboards).
+DEBOUNCE_SEC = 0.25
+
+# Environment variables of the shell process worth passing to the launcher
+INIR_ENV_KEYS = ("WAYLAND_DISPLAY", "XDG_RUNTIME_DIR", "QT_QPA_PLATFORM", "NIRI_SOCKET")
+
+
+def log(message):
+    # stderr, so the stdout of keyboard_lock_state_daemon.py stays pure JSON
+    print(f"[inir-input-daemon] {message}", file=sys.stderr, flush=True)
+
+
+def event_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    return os.path.join(runtime_dir, "inir", "input.sock")
+
+
+def is_virtual(dev):
+    name = (dev.name or "").lower()
+    return any(part in name for part in IGNORED_NAME_PARTS)
+
+
+def _find_inir_pid():
+    """Locate the PID of the running iNiR quickshell process by inspecting /proc.
+
+    Matches both legacy ``qs -c inir`` invocations and the current
+    path-based ``qs -p <path>`` / ``qs -n -p <path>`` form.
+    """
+    proc_root = "/proc"
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        cmdline_path = f"{proc_root}/{entry}/cmdline"
+        try:
+            with open(cmdline_path, "rb") as f:
+                raw = f.read().decode("utf-8", errors="ignore")
+        except FileNotFoundError:
+            continue
+        if not raw:
+            continue
+        args = [a for a in raw.split("\0") if a]
+        if len(args) < 2:
+            continue
+        exe = os.path.basename(args[0])
+        if exe != "qs":
+            continue
+        # Legacy: qs -c inir
+        if len(args) >= 3 and args[1] == "-c" and args[2] == "inir":
+            return pid
+        # Path-based: qs ... -p <path>/shell.qml  or  qs ... -p <path>
+        # where <path> ends with /inir or contains /inir/
+        for i, arg in enumerate(args[1:], 1):
+            if arg == "-p" and i + 1 < len(args):
+                p = args[i + 1]
+                if p.rstrip("/").endswith("/inir") or "/inir/" in p:
+                    return pid
+                break
+    return None
+
+
+class InirShell:
+    """The running iNiR shell: found by one /proc scan, then followed with a pidfd.
+
+    The environment is read when the shell is found and dropped when the
+    pidfd reports its exit, so taps never walk /proc while it stays up.
+    Without pidfd support (Linux < 5.3) liveness is a kill(pid, 0) per tap.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.env = {}
+        self._pidfd = None
+
+    def ensure_env(self):
+        if self.pid is not None and self._pidfd is None:
+            try:
+                os.kill(self.pid, 0)
+            except OSError:
+                self._forget()
+        if self.pid is None:
+            self._locate()
+        return self.env
+
+    def _locate(self):
+        pid = _find_inir_pid()
+        if pid is None:
+            log("inir not running, cannot import env")
+            return
+        try:
+            with open(f"/proc/{pid}/environ", "rb") as f:
+                raw = f.read().decode("utf-8", errors="ignore")
+        except OSError as e:
+            log(f"Error reading inir env: {e}")
+            return
+        env_vars = {}
+        for entry in raw.split("\0"):
+            k, sep, v = entry.partition("=")
+            # Only keep what matters for Wayland / Qt
+            if sep and k in INIR_ENV_KEYS:
+                env_vars[k] = v
+        self.pid = pid
+        self.env = env_vars
+        log(f"Found inir pid={pid}, env: {env_vars}")
+        try:
+            self._pidfd = os.pidfd_open(pid)
+            asyncio.get_running_loop().add_reader(self._pidfd, self._on_exit)
+        except (AttributeError, OSError):
+            self._pidfd = None
+
+    def _on_exit(self):
+        log(f"inir pid={self.pid} exited")
+        self._forget()
+
+    def _forget(self):
+        if self._pidfd is not None:
+            asyncio.get_running_loop().remove_reader(self._pidfd)
+            os.close(self._pidfd)
+            self._pidfd = None
+        self.pid = None
+        self.env = {}
+
+
+class EventServer:
+    """Unix socket that pushes one JSON line per event to every connected shell.
+
+    snapshot() returns the events a new subscriber receives first.
+    """
+
+    def __init__(self, path, snapshot=None):
+        self.path = path
+        self.snapshot = snapshot or (lambda: [])
+        self.clients = set()
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        await asyncio.start_unix_server(self._serve, path=self.path)
+        log(f"Serving events on {self.path}")
+
+    async def _serve(self, reader, writer):
+        for event in self.snapshot():
+            writer.write(self._encode(event))
+        self.clients.add(writer)
+        try:
+            # Subscribers only listen; reading just detects the disconnect
+            while await reader.read(4096):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _encode(event):
+        return (json.dumps(event, separators=(",", ":")) + "\n").encode()
+
+    def publish(self, event):
+        """Queue event for every subscriber; returns how many received it."""
+        line = self._encode(event)
+        delivered = 0
+        for writer in list(self.clients):
+            if writer.is_closing():
+                self.clients.discard(writer)
+                continue
+            writer.write(line)
+            delivered += 1
+        return delivered
+
+
+class InputHandler:
+    """Base class for daemon handlers.
+
+    publish(event) sends an event to the subscribers and returns how many
+    received it. accepts() claims devices; handle() then sees every event
+    from the claimed devices, in order, on the event loop.
+    """
+
+    def __init__(self, publish):
+        self.publish = publish
+
+    def accepts(self, dev):
+        return False
+
+    def device_added(self, path, dev):
+        pass
+
+    def device_removed(self, path, dev):
+        pass
+
+    def handle(self, path, event):
+        pass
+
+    def snapshot(self):
+        """Current state for a new subscriber, or None."""
+        return None
+
+
+class SuperTapHandler(InputHandler):
+    """Super pressed and released with no other key or click in between."""
+
+    def __init__(self, publish):
+        super().__init__(publish)
+        self.shell = InirShell()
+        self.keyboards = set()
+        # Per keyboard: Super held, and whether another key joined it
+        self.super_down = {}
+        self.chord = {}
+        self.super_down_global = False
+        self.interaction_since_super_down = False
+        self.tap_handled = False
+        self.last_toggle_time = 0.0
+
+    def accepts(self, dev):
+        if is_virtual(dev):
+            return False
+        caps = dev.capabilities().get(ecodes.EV_KEY, [])
+        return any(code in SUPER_CODES or code in POINTER_BUTTON_CODES for code in caps)
+
+    def device_added(self, path, dev):
+        caps = dev.capabilities().get(ecodes.EV_KEY, [])
+        if any(code in SUPER_CODES for code in caps):
+            log(f"Using keyboard device {path} ({dev.name}), has_super=True")
+            self.keyboards.add(path)
+        else:
+            log(f"Using pointer device {path} ({dev.name}), has_pointer_button=True")
+
+    def device_removed(self, path, dev):
+        self.keyboards.discard(path)
+        self.super_down.pop(path, None)
+        self.chord.pop(path, None)
+
+    def handle(self, path, event):
+        if event.type != ecodes.EV_KEY:
+            return
+        code = event.code
+        value = event.value  # 1=down, 2=hold, 0=up
+
+        if path not in self.keyboards:
+            if code in POINTER_BUTTON_CODES and value == 1 and self.super_down_global:
+                self.interaction_since_super_down = True
+            return
+
+        if code in SUPER_CODES:
+            if value == 1:
+                self.super_down[path] = True
+                self.chord[path] = False
+                self.super_down_global = True
+                self.interaction_since_super_down = False
+                self.tap_handled = False
+            elif value == 0:
+                if (
+                    self.super_down.get(path)
+                    and not self.chord.get(path)
+                    and not self.interaction_since_super_down
+                    and not self.tap_handled
+                ):
+                    # Tap of Super with no other keys or clicks: toggle inir overview
+                    # with a global debounce so multiple devices don't double-trigger.
+                    now = time.monotonic()
+                    if now - self.last_toggle_time >= DEBOUNCE_SEC:
+                        self.last_toggle_time = now
+                        self.tap_handled = True
+                        log("Super tap detected, toggling inir overview")
+                        try:
+                            self.toggle_overview()
+                        except Exception as e:
+                            log(f"Error running toggle command: {e}")
+                self.super_down[path] = False
+                self.chord[path] = False
+                self.super_down_global = False
+                self.interaction_since_super_down = False
+            return
+
+        # Any other key (or a keyboard's own button) while Super is down marks this as a chord.
+        if value == 1:
+            if self.super_down.get(path):
+                self.chord[path] = True
+            if self.super_down_global:
+                self.interaction_since_super_down = True
+
+    def toggle_overview(self):
+        """Tell the shell to toggle its overview, preferably over the event socket."""
+        if self.publish({"type": "super-tap"}):
+            return
+
+        inir_env = self.shell.ensure_env()
+        if not inir_env:
+            log("No inir env available, skipping toggle")
+            return
+
+        env = os.environ.copy()
+        env.update(inir_env)
+
+        # Resolve the inir launcher for the IPC call
+        inir_bin = os.environ.get(
+            "INIR_LAUNCHER_PATH",
+            shutil.which("inir") or "inir",
+        )
+        subprocess.Popen(
+            [inir_bin, "overview", "toggle"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+
+class LockStateHandler(InputHandler):
+    """Caps / Num / Scroll Lock state across every keyboard with those LEDs.
+
+    Each device's LEDs are read with one ioctl when it is added; after that
+    the EV_LED events the kernel sends on every change keep the per-device
+    state and the per-LED counts current, so a key press costs no ioctls.
+    """
+
+    def __init__(self, publish):
+        super().__init__(publish)
+        # path -> lock LEDs currently lit on that device
+        self.leds = {}
+        # LED -> number of devices with it lit
+        self.lit = {led: 0 for led in LOCK_LED_CODES}
+        self.last_state = None
+        self._last_empty = None
+
+    def accepts(self, dev):
+        if is_virtual(dev):
+            return False
+        caps = dev.capabilities()
+        key_caps = set(caps.get(ecodes.EV_KEY, []))
+        led_caps = set(caps.get(ecodes.EV_LED, []))
+        # Caps/Num decide which keyboards vote; Scroll Lock alone does not qualify
+        return (
+            bool(key_caps & {ecodes.KEY_CAPSLOCK, ecodes.KEY_NUMLOCK})
+            and bool(led_caps & {ecodes.LED_CAPSL, ecodes.LED_NUML})
+        )
+
+    def device_added(self, path, dev):
+        try:
+            active = set(dev.leds()) & LOCK_LED_CODES
+        except OSError:
+            active = set()
+        self.device_removed(path, dev, emit=False)
+        self.leds[path] = active
+        for led in active:
+            self.lit[led] += 1
+        self.emit_state()
+
+    def device_removed(self, path, dev, emit=True):
+        for led in self.leds.pop(path, ()):
+            self.lit[led] -= 1
+        if emit:
+            self.emit_state()
+
+    def handle(self, path, event):
+        if event.type != ecodes.EV_LED or event.code not in LOCK_LED_CODES:
+            return
+        active = self.leds.get(path)
+        if active is None or (event.code in active) == bool(event.value):
+            return
+        if event.value:
+            active.add(event.code)
+            self.lit[event.code] += 1
+        else:
+            active.discard(event.code)
+            self.lit[event.code] -= 1
+        self.emit_state()
+
+    @staticmethod
+    def _aggregate(true_count, total, previous):
+        false_count = total - true_count
+        if true_count == false_count:
+            return previous if previous is not None else False
+        return true_count > false_count
+
+    def current_state(self):
+        previous = self.last_state or {}
+        total = len(self.leds)
+        return {
+            key: self._aggregate(self.lit[led], total, previous.get(key))
+            for key, led in LOCK_LEDS.items()
+        }
+
+    def _event(self, state):
+        return {"type": "lock-state", **state, "devices": len(self.leds)}
+
+    def emit_state(self, force=False):
+        state = self.current_state()
+        empty = not self.leds
+        if force or state != self.last_state or empty != self._last_empty:
+            # "devices": 0 tells the shell to fall back to sysfs
+            self.publish(self._event(state))
+        self.last_state = state
+        self._last_empty = empty
+
+    def snapshot(self):
+        return self._event(self.current_state())
+
+
+# Handlers run by the daemon, in dispatch order
+HANDLERS = (SuperTapHandler, LockStateHandler)
+
+
+class InputDaemon:
+    """Registry of devices, one reader task each, dispatching to the handlers."""
+
+    def __init__(self, handler_classes, publish):
+        self.handlers = [cls(publish) for cls in handler_classes]
+        self.tasks = {}
+        self.registry = DeviceRegistry(
+            self._accepts,
+            on_added=self._added,
+            on_removed=self._removed,
+            log=log,
+        )
+
+    def _claims(self, dev):
+        return [handler for handler in self.handlers if handler.accepts(dev)]
+
+    def _accepts(self, dev):
+        return bool(self._claims(dev))
+
+    def _added(self, path, dev):
+        handlers = self._claims(dev)
+        for handler in handlers:
+            handler.device_added(path, dev)
+        self.tasks[path] = (asyncio.create_task(self._read(path, dev, handlers)), handlers)
+
+    def _removed(self, path, dev):
+        task, handlers = self.tasks.pop(path, (None, ()))
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        for handler in handlers:
+            handler.device_removed(path, dev)
+
+    async def _read(self, path, dev, handlers):
+        try:
+            async for event in dev.async_read_loop():
+                for handler in handlers:
+                    handler.handle(path, event)
+        except OSError as e:
+            log(f"Lost {path}: {e}")
+        self.registry.remove(path)
+
+    def snapshot(self):
+        return [event for event in (h.snapshot() for h in self.handlers) if event is not None]
+
+    def close(self):
+        for task, _handlers in self.tasks.values():
+            task.cancel()
+        # Shutting down: handlers need not react to every device going away
+        self.registry.on_removed = None
+        self.registry.close()
+
+
+async def main():
+    server = EventServer(event_socket_path())
+    daemon = InputDaemon(HANDLERS, server.publish)
+    server.snapshot = daemon.snapshot
+    try:
+        await server.start()
+    except OSError as e:
+        log(f"Event socket unavailable, using the launcher: {e}")
+
+    # Devices are picked up as they appear, so the service also works if it
+    # starts before the session is fully up or a keyboard reconnects later.
+    await daemon.registry.start()
+    if not daemon.tasks:
+        log("No suitable input devices yet, waiting for hotplug")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
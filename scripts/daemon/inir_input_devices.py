@@ -0,0 +1,166 @@
+"""Hotplug-aware registry of evdev input devices shared by the iNiR input daemons.
+
+Devices are enumerated once at startup; afterwards /dev/input is watched
+with inotify, so a keyboard that appears later (a Bluetooth keyboard
+reconnecting after sleep, a USB hub being plugged in) is picked up when
+its node is created and dropped when it is removed. Nodes are only
+opened when they appear, never on a timer, and a node that was looked at
+and rejected is not opened again until it is recreated.
+
+udev creates event nodes before it applies the session ACL, so a node
+that cannot be opened yet is retried on its IN_ATTRIB event.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+
+from evdev import InputDevice, list_devices
+
+INPUT_DIR = "/dev/input"
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Rescan interval when inotify is unavailable
+FALLBACK_RESCAN_SEC = 5
+
+
+def _inotify_fd(directory, mask):
+    """Non-blocking inotify descriptor watching directory, or None."""
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_events(fd):
+    """Yield (mask, name) for every inotify event waiting on fd."""
+    try:
+        data = os.read(fd, 64 * 1024)
+    except BlockingIOError:
+        return
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(data):
+        _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        name = data[offset:offset + length].rstrip(b"\0").decode(errors="ignore")
+        offset += length
+        yield mask, name
+
+
+class DeviceRegistry:
+    """Open evdev devices accepted by a filter, kept in sync with hotplug.
+
+    accept(dev) decides whether a freshly opened device is kept.
+    on_added(path, dev) and on_removed(path, dev) are called from the
+    event loop as devices come and go; readers that hit an OSError on an
+    unplugged device should call remove(path), which is idempotent.
+    """
+
+    def __init__(self, accept, on_added=None, on_removed=None, log=None):
+        self.accept = accept
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self.log = log or (lambda message: None)
+        self.devices = {}
+        self._ignored = set()
+        self._inotify = None
+        self._rescan_task = None
+
+    def scan(self):
+        """Enumerate /dev/input once, adding every accepted device."""
+        for path in list_devices():
+            self.add(path)
+
+    async def start(self):
+        """Scan, then follow hotplug until close()."""
+        loop = asyncio.get_running_loop()
+        try:
+            self._inotify = _inotify_fd(INPUT_DIR, IN_CREATE | IN_ATTRIB | IN_MOVED_TO | IN_DELETE)
+        except OSError:
+            self._inotify = None
+        if self._inotify is not None:
+            loop.add_reader(self._inotify, self._on_inotify)
+        else:
+            self.log(f"inotify unavailable, rescanning {INPUT_DIR} every {FALLBACK_RESCAN_SEC}s")
+            self._rescan_task = asyncio.create_task(self._rescan_loop())
+        self.scan()
+
+    def add(self, path):
+        if path in self.devices or path in self._ignored:
+            return
+        try:
+            dev = InputDevice(path)
+        except OSError:
+            # Not readable yet (ACL pending) or already gone; IN_ATTRIB retries
+            return
+        try:
+            accepted = self.accept(dev)
+        except OSError:
+            accepted = False
+        if not accepted:
+            dev.close()
+            self._ignored.add(path)
+            return
+        self.devices[path] = dev
+        self.log(f"Added {path} ({dev.name})")
+        if self.on_added is not None:
+            self.on_added(path, dev)
+
+    def remove(self, path):
+        self._ignored.discard(path)
+        dev = self.devices.pop(path, None)
+        if dev is None:
+            return
+        self.log(f"Removed {path}")
+        if self.on_removed is not None:
+            self.on_removed(path, dev)
+        try:
+            dev.close()
+        except OSError:
+            pass
+
+    def close(self):
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify)
+            os.close(self._inotify)
+            self._inotify = None
+        if self._rescan_task is not None:
+            self._rescan_task.cancel()
+            self._rescan_task = None
+        for path in list(self.devices):
+            self.remove(path)
+
+    def _on_inotify(self):
+        for mask, name in _read_events(self._inotify):
+            if not name.startswith("event"):
+                continue
+            path = os.path.join(INPUT_DIR, name)
+            if mask & IN_DELETE:
+                self.remove(path)
+            else:
+                self.add(path)
+
+    async def _rescan_loop(self):
+        while True:
+            await asyncio.sleep(FALLBACK_RESCAN_SEC)
+            present = set(list_devices())
+            for path in list(self.devices):
+                if path not in present:
+                    self.remove(path)
+            self._ignored &= present
+            for path in present:
+                self.add(path)
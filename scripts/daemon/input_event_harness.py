@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Synthetic-event harness for the input daemon's lock-state handler.
+
+Drives LockStateHandler with simulated Caps Lock / Num Lock presses on
+several keyboards and reports what each event costs: handler time per
+event, LED ioctls issued and lock-state events published. Every press
+emits what the kernel would send: key down, key up, then one EV_LED
+change per keyboard.
+
+Two modes:
+  - fake (default): in-process fake devices; needs no privileges and
+    measures the handler alone.
+  - --uinput: real virtual keyboards created through /dev/uinput and read
+    back through evdev, so the numbers include the kernel round trip and
+    the daemon's reader tasks. Needs write access to /dev/uinput.
+
+Usage: input_event_harness.py [--keyboards N] [--presses N] [--uinput]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from evdev import ecodes
+
+from inir_input_daemon import InputDaemon, LockStateHandler
+
+PRESS_KEYS = (
+    (ecodes.KEY_CAPSLOCK, ecodes.LED_CAPSL),
+    (ecodes.KEY_NUMLOCK, ecodes.LED_NUML),
+)
+
+
+class FakeKeyboard:
+    """Just enough of evdev.InputDevice for LockStateHandler, counting ioctls."""
+
+    def __init__(self, index):
+        self.path = f"/dev/input/fake-event{index}"
+        self.name = f"harness keyboard {index}"
+        self.lit = set()
+        self.ioctls = 0
+
+    def capabilities(self):
+        return {
+            ecodes.EV_KEY: [ecodes.KEY_CAPSLOCK, ecodes.KEY_NUMLOCK],
+            ecodes.EV_LED: [ecodes.LED_CAPSL, ecodes.LED_NUML],
+        }
+
+    def leds(self):
+        self.ioctls += 1
+        return list(self.lit)
+
+
+def press_events(keyboards, press):
+    """(device, event) pairs the kernel would deliver for one lock key press."""
+    key, led = PRESS_KEYS[press % len(PRESS_KEYS)]
+    on = led not in keyboards[0].lit
+    events = [
+        (keyboards[0], SimpleNamespace(type=ecodes.EV_KEY, code=key, value=1)),
+        (keyboards[0], SimpleNamespace(type=ecodes.EV_KEY, code=key, value=0)),
+    ]
+    for dev in keyboards:
+        (dev.lit.add if on else dev.lit.discard)(led)
+        events.append((dev, SimpleNamespace(type=ecodes.EV_LED, code=led, value=int(on))))
+    return events
+
+
+def run_fake(keyboard_count, presses):
+    published = []
+    handler = LockStateHandler(lambda event: published.append(event) or 1)
+    keyboards = [FakeKeyboard(i) for i in range(keyboard_count)]
+    for dev in keyboards:
+        handler.device_added(dev.path, dev)
+    sync_ioctls = sum(dev.ioctls for dev in keyboards)
+    published.clear()
+
+    elapsed = 0
+    events = 0
+    for press in range(presses):
+        batch = press_events(keyboards, press)
+        start = time.perf_counter_ns()
+        for dev, event in batch:
+            handler.handle(dev.path, event)
+        elapsed += time.perf_counter_ns() - start
+        events += len(batch)
+
+    expected = {
+        "caps": ecodes.LED_CAPSL in keyboards[0].lit,
+        "num": ecodes.LED_NUML in keyboards[0].lit,
+    }
+    final = handler.current_state()
+    return {
+        "mode": "fake",
+        "keyboards": keyboard_count,
+        "presses": presses,
+        "events": events,
+        "ns_per_event": round(elapsed / max(events, 1)),
+        "sync_ioctls": sync_ioctls,
+        "event_ioctls": sum(dev.ioctls for dev in keyboards) - sync_ioctls,
+        "published": len(published),
+        "consistent": all(final[key] == value for key, value in expected.items()),
+    }
+
+
+async def run_uinput(keyboard_count, presses):
+    from evdev import UInput
+
+    capabilities = {
+        ecodes.EV_KEY: [ecodes.KEY_CAPSLOCK, ecodes.KEY_NUMLOCK],
+        ecodes.EV_LED: [ecodes.LED_CAPSL, ecodes.LED_NUML],
+    }
+    inputs = [UInput(capabilities, name=f"inir harness keyboard {i}") for i in range(keyboard_count)]
+    changed = asyncio.Event()
+    published = []
+
+    def publish(event):
+        published.append(event)
+        changed.set()
+        return 1
+
+    daemon = InputDaemon([LockStateHandler], publish)
+    handler = daemon.handlers[0]
+    try:
+        # Give udev a moment to create the nodes, then track only these devices
+        await asyncio.sleep(0.5)
+        for ui in inputs:
+            daemon.registry.add(ui.device.path)
+        published.clear()
+
+        latencies = []
+        lit = set()
+        for press in range(presses):
+            key, led = PRESS_KEYS[press % len(PRESS_KEYS)]
+            on = led not in lit
+            (lit.add if on else lit.discard)(led)
+            changed.clear()
+            start = time.perf_counter_ns()
+            for ui in inputs:
+                ui.write(ecodes.EV_KEY, key, 1)
+                ui.write(ecodes.EV_KEY, key, 0)
+                ui.write(ecodes.EV_LED, led, int(on))
+                ui.syn()
+            try:
+                await asyncio.wait_for(changed.wait(), 1.0)
+            except asyncio.TimeoutError:
+                continue
+            latencies.append(time.perf_counter_ns() - start)
+        # Let the remaining per-device LED events drain
+        await asyncio.sleep(0.1)
+        final = handler.current_state()
+    finally:
+        daemon.close()
+        for ui in inputs:
+            ui.close()
+
+    latencies.sort()
+    return {
+        "mode": "uinput",
+        "keyboards": keyboard_count,
+        "presses": presses,
+        "observed": len(latencies),
+        "median_latency_us": round(latencies[len(latencies) // 2] / 1000) if latencies else None,
+        "published": len(published),
+        "consistent": final["caps"] == (ecodes.LED_CAPSL in lit) and final["num"] == (ecodes.LED_NUML in lit),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-event cost of lock key tracking")
+    parser.add_argument("--keyboards", type=int, default=3, help="Simulated keyboards")
+    parser.add_argument("--presses", type=int, default=2000, help="Lock key presses to simulate (at most 200 with --uinput)")
+    parser.add_argument("--uinput", action="store_true", help="Use real uinput devices instead of fakes")
+    args = parser.parse_args()
+
+    try:
+        if args.uinput:
+            result = asyncio.run(run_uinput(args.keyboards, min(args.presses, 200)))
+        else:
+            result = run_fake(args.keyboards, args.presses)
+    except OSError as exc:
+        print(json.dumps({"error": str(exc)}), file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["consistent"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,44 +2,117 @@
 
 import argparse
 import cv2
+import hashlib
 import json
 import numpy as np
+import os
 import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from wallpaper_cache import open_cache  # noqa: E402
 
 DEFAULT_IMAGE_PATH = '/tmp/quickshell/media/screenshot/image'
 
-def iou(boxA, boxB):
-    # Compute intersection over union for two boxes
-    xA = max(boxA['x'], boxB['x'])
-    yA = max(boxA['y'], boxB['y'])
-    xB = min(boxA['x'] + boxA['width'], boxB['x'] + boxB['width'])
-    yB = min(boxA['y'] + boxA['height'], boxB['y'] + boxB['height'])
-    interW = max(0, xB - xA)
-    interH = max(0, yB - yA)
-    interArea = interW * interH
-    boxAArea = boxA['width'] * boxA['height']
-    boxBArea = boxB['width'] * boxB['height']
-    iou = interArea / float(boxAArea + boxBArea - interArea) if (boxAArea + boxBArea - interArea) > 0 else 0
-    return iou
+# Scale applied when neither --resize-factor nor --max-pixels is given
+DEFAULT_RESIZE_FACTOR = 0.1
+RESULT_CACHE_VERSION = 1
+RESULT_CACHE_ENTRIES = 32
 
 def non_max_suppression(regions, iou_threshold=0.7):
-    # Sort by area (largest first)
-    regions = sorted(regions, key=lambda r: r['width'] * r['height'], reverse=True)
+    """Greedy NMS, largest region first; each step compares the kept box
+    against all remaining boxes at once."""
+    if not regions:
+        return []
+    boxes = np.array([[r['x'], r['y'], r['width'], r['height']] for r in regions], dtype=np.float64)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    # Stable sort keeps the original order among equal areas
+    order = np.argsort(-areas, kind='stable')
     keep = []
-    while regions:
-        current = regions.pop(0)
+    while order.size:
+        current = order[0]
         keep.append(current)
-        regions = [r for r in regions if iou(current, r) < iou_threshold]
-    return keep
+        rest = order[1:]
+        inter_w = np.maximum(0, np.minimum(x2[current], x2[rest]) - np.maximum(x1[current], x1[rest]))
+        inter_h = np.maximum(0, np.minimum(y2[current], y2[rest]) - np.maximum(y1[current], y1[rest]))
+        inter = inter_w * inter_h
+        union = areas[current] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou < iou_threshold]
+    return [regions[i] for i in keep]
 
-def find_regions(image_path, min_width, min_height, max_width=None, max_height=None, quality=False, k=150, min_size=20, sigma=0.8, resize_factor=1.0):
+def load_scaled(image_path, resize_factor=None, max_pixels=None, use_cache=False):
+    """BGR image scaled by resize_factor (or to about max_pixels, or by
+    DEFAULT_RESIZE_FACTOR), plus the factor used and the original (width, height). With
+    use_cache, downscales come from wallpaper_cache.py's mipmaps instead of a
+    full decode."""
+    cache = open_cache(image_path) if use_cache else None
+    if cache is not None:
+        orig_w, orig_h = cache.size
+        factor = scale_factor(orig_w, orig_h, resize_factor, max_pixels)
+        if factor < 1.0:
+            size = (int(orig_w * factor), int(orig_h * factor))
+            image = np.ascontiguousarray(cache.mip(max(size))[:, :, ::-1])
+            if (image.shape[1], image.shape[0]) != size:
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            return image, factor, (orig_w, orig_h)
     image = cv2.imread(image_path)
+    if image is None:
+        return None, 1.0, (0, 0)
+    orig_h, orig_w = image.shape[:2]
+    factor = scale_factor(orig_w, orig_h, resize_factor, max_pixels)
+    if factor != 1.0:
+        image = cv2.resize(image, (int(orig_w * factor), int(orig_h * factor)), interpolation=cv2.INTER_AREA)
+    return image, factor, (orig_w, orig_h)
+
+def scale_factor(orig_w, orig_h, resize_factor=None, max_pixels=None):
+    if resize_factor is not None:
+        return resize_factor
+    if max_pixels is not None:
+        return min(1.0, (max_pixels / float(orig_w * orig_h)) ** 0.5)
+    return DEFAULT_RESIZE_FACTOR
+
+def result_cache_path(image_path, params):
+    """Cache file for these parameters, keyed by the image content so a
+    screenshot overwritten in place is not served stale results."""
+    digest = hashlib.sha1()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(json.dumps([RESULT_CACHE_VERSION, params], sort_keys=True).encode())
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(cache_home, 'inir', 'find-regions', digest.hexdigest() + '.json')
+
+def store_result(path, regions):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(regions, f)
+    os.replace(tmp, path)
+    entries = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')),
+        key=os.path.getmtime, reverse=True,
+    )
+    for stale in entries[RESULT_CACHE_ENTRIES:]:
+        os.unlink(stale)
+
+def find_regions(image_path, min_width, min_height, max_width=None, max_height=None, quality=False, k=150, min_size=20, sigma=0.8, resize_factor=None, max_pixels=None, use_cache=False, result_cache=True):
+    cache_path = None
+    if result_cache:
+        params = [min_width, min_height, max_width, max_height, quality, k, min_size, sigma, resize_factor, max_pixels]
+        try:
+            cache_path = result_cache_path(image_path, params)
+            with open(cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    image, factor, (orig_w, orig_h) = load_scaled(image_path, resize_factor, max_pixels, use_cache)
     if image is None:
         print(f'Error: Could not load image {image_path}', file=sys.stderr)
         sys.exit(1)
-    orig_h, orig_w = image.shape[:2]
-    if resize_factor != 1.0:
-        image = cv2.resize(image, (int(orig_w * resize_factor), int(orig_h * resize_factor)), interpolation=cv2.INTER_AREA)
     ss = cv2.ximgproc.segmentation.createSelectiveSearchSegmentation()
     ss.setBaseImage(image)
     if quality:
@@ -50,11 +123,11 @@ def find_regions(image_path, min_width, min_height, max_width=None, max_height=N
     regions = []
     for (x, y, w, h) in rects:
         # Scale regions back to original image size if resized
-        if resize_factor != 1.0:
-            x = int(x / resize_factor)
-            y = int(y / resize_factor)
-            w = int(w / resize_factor)
-            h = int(h / resize_factor)
+        if factor != 1.0:
+            x = int(x / factor)
+            y = int(y / factor)
+            w = int(w / factor)
+            h = int(h / factor)
         # Filter out region that is exactly the same size as the original image
         if w == orig_w and h == orig_h and x == 0 and y == 0:
             continue
@@ -63,7 +136,12 @@ def find_regions(image_path, min_width, min_height, max_width=None, max_height=N
                 regions.append({'x': int(x), 'y': int(y), 'width': int(w), 'height': int(h)})
     # Remove duplicates/overlaps
     regions = non_max_suppression(regions, iou_threshold=0.7)
-    return regions, cv2.imread(image_path)  # Return original image for drawing
+    if cache_path:
+        try:
+            store_result(cache_path, regions)
+        except OSError:
+            pass
+    return regions
 
 def draw_regions(image, regions, output_path):
     for region in regions:
@@ -90,11 +168,14 @@ def main():
     parser.add_argument('--k', type=int, default=3000, help='Segmentation parameter k (default: 150)')
     parser.add_argument('--min-size', type=int, default=50, help='Segmentation parameter min_size (default: 20)')
     parser.add_argument('--sigma', type=float, default=0.6, help='Segmentation parameter sigma (default: 0.8)')
-    parser.add_argument('--resize-factor', type=float, default=0.1, help='Resize factor for input image before processing (default: 1.0, e.g. 0.5 for half size)')
+    parser.add_argument('--resize-factor', type=float, help=f'Resize factor for input image before processing (default: {DEFAULT_RESIZE_FACTOR}, e.g. 0.5 for half size)')
+    parser.add_argument('--max-pixels', type=int, help='Instead of a fixed factor, scale the input to about this many pixels')
+    parser.add_argument('--no-result-cache', action='store_true', help='Always run selective search instead of reusing results for the same image and parameters')
+    parser.add_argument('--cache', action='store_true', help='Read the downscaled image from the wallpaper analysis cache (for wallpapers, not one-off screenshots)')
     parser.add_argument('--hyprctl', action='store_true', help='Mimics hyprctl\'s window output, like {"at": [x, y], "size": [w, h]}')
     args = parser.parse_args()
 
-    regions, image = find_regions(
+    regions = find_regions(
         args.image,
         min_width=args.min_width,
         min_height=args.min_height,
@@ -104,7 +185,10 @@ def main():
         k=args.k,
         min_size=args.min_size,
         sigma=args.sigma,
-        resize_factor=args.resize_factor
+        resize_factor=args.resize_factor,
+        max_pixels=args.max_pixels,
+        use_cache=args.cache,
+        result_cache=not args.no_result_cache
     )
     if args.single and regions:
         largest = max(regions, key=lambda r: r['width'] * r['height'])
@@ -113,7 +197,7 @@ def main():
         regions = [{"at": [r['x'], r['y']], "size": [r['width'], r['height']]} for r in regions]
     print(json.dumps(regions))
     if args.debug_output:
-        draw_regions(image, regions, args.debug_output)
+        draw_regions(cv2.imread(args.image), regions, args.debug_output)
 
 if __name__ == '__main__':
     main()
@@ -7,6 +7,15 @@ import cv2
 import numpy as np
 import argparse
 import json
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from wallpaper_cache import open_cache  # noqa: E402
+
+# Set by --no-cache; analyzing the screen-sized copy from wallpaper_cache.py
+# skips decoding the full-resolution file
+USE_WALLPAPER_CACHE = True
+_screen_images = {}
 
 def center_crop(img, target_w, target_h):
     h, w = img.shape[:2]
@@ -18,30 +27,51 @@ def center_crop(img, target_w, target_h):
     y2 = y1 + target_h
     return img[y1:y2, x1:x2]
 
-def find_least_busy_region(image_path, region_width=300, region_height=200, screen_width=None, screen_height=None, verbose=False, stride=2, screen_mode="fill", horizontal_padding=50, vertical_padding=50, busiest=False):
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+def load_screen_image(image_path, screen_width=None, screen_height=None, screen_mode="fill", verbose=False):
+    """BGR image scaled to the screen and center-cropped (or at original size
+    without screen dimensions). Decoded at most once per run; callers that draw
+    on it must copy it first."""
+    key = (image_path, screen_width, screen_height, screen_mode)
+    if key in _screen_images:
+        return _screen_images[key]
+    img = None
+    if USE_WALLPAPER_CACHE and screen_width is not None and screen_height is not None:
+        cache = open_cache(image_path)
+        if cache is not None:
+            img = np.ascontiguousarray(cache.screen(screen_width, screen_height, screen_mode)[:, :, ::-1])
+            if verbose:
+                print(f"Using cached {screen_width}x{screen_height} copy of {cache.size[0]}x{cache.size[1]} image (mode: {screen_mode})")
     if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    orig_h, orig_w = img.shape
-    scale = 1.0
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        if screen_mode == "fill":
-            scale = max(scale_w, scale_h)
+        img = cv2.imread(image_path)
+        if img is None:
+            raise FileNotFoundError(f"Image not found: {image_path}")
+        orig_h, orig_w = img.shape[:2]
+        if screen_width is not None and screen_height is not None:
+            scale_w = screen_width / orig_w
+            scale_h = screen_height / orig_h
+            if screen_mode == "fill":
+                scale = max(scale_w, scale_h)
+            else:
+                scale = min(scale_w, scale_h)
+            new_w = int(orig_w * scale)
+            new_h = int(orig_h * scale)
+            if verbose:
+                print(f"Scaling image from {orig_w}x{orig_h} to {new_w}x{new_h} (scale: {scale:.3f}, mode: {screen_mode})")
+            img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+            img = center_crop(img, screen_width, screen_height)
+            if verbose:
+                print(f"Cropped image to {screen_width}x{screen_height}")
         else:
-            scale = min(scale_w, scale_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
-        if verbose:
-            print(f"Scaling image from {orig_w}x{orig_h} to {new_w}x{new_h} (scale: {scale:.3f}, mode: {screen_mode})")
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
-        if verbose:
-            print(f"Cropped image to {screen_width}x{screen_height}")
-    else:
-        if verbose:
-            print(f"Using original image size: {orig_w}x{orig_h}")
+            if verbose:
+                print(f"Using original image size: {orig_w}x{orig_h}")
+    _screen_images[key] = img
+    return img
+
+def load_screen_gray(image_path, screen_width=None, screen_height=None, screen_mode="fill", verbose=False):
+    return cv2.cvtColor(load_screen_image(image_path, screen_width, screen_height, screen_mode, verbose), cv2.COLOR_BGR2GRAY)
+
+def find_least_busy_region(image_path, region_width=300, region_height=200, screen_width=None, screen_height=None, verbose=False, stride=2, screen_mode="fill", horizontal_padding=50, vertical_padding=50, busiest=False):
+    img = load_screen_gray(image_path, screen_width, screen_height, screen_mode, verbose)
     arr = img.astype(np.float64)
     h, w = arr.shape
     # Validate & adjust stride
@@ -111,30 +141,7 @@ def find_least_busy_region(image_path, region_width=300, region_height=200, scre
         return min_coords, min_var
 
 def find_largest_region(image_path, screen_width=None, screen_height=None, verbose=False, stride=2, screen_mode="fill", threshold=100.0, aspect_ratio=1.0, horizontal_padding=50, vertical_padding=50):
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    orig_h, orig_w = img.shape
-    # ...existing scaling logic...
-    scale = 1.0
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        if screen_mode == "fill":
-            scale = max(scale_w, scale_h)
-        else:
-            scale = min(scale_w, scale_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
-        if verbose:
-            print(f"Scaling image from {orig_w}x{orig_h} to {new_w}x{new_h} (scale: {scale:.3f}, mode: {screen_mode})")
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
-        if verbose:
-            print(f"Cropped image to {screen_width}x{screen_height}")
-    else:
-        if verbose:
-            print(f"Using original image size: {orig_w}x{orig_h}")
+    img = load_screen_gray(image_path, screen_width, screen_height, screen_mode, verbose)
     arr = img.astype(np.float64)
     h, w = arr.shape
     stride = max(1, int(stride) if stride else 1)
@@ -218,42 +225,14 @@ def find_largest_region(image_path, screen_width=None, screen_height=None, verbo
         return None, (0, 0), None
 
 def draw_region(image_path, coords, region_width=300, region_height=200, output_path='output.png', screen_width=None, screen_height=None, screen_mode="fill"):
-    img = cv2.imread(image_path)
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    orig_h, orig_w = img.shape[:2]
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        if screen_mode == "fill":
-            scale = max(scale_w, scale_h)
-        else:
-            scale = min(scale_w, scale_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
+    img = load_screen_image(image_path, screen_width, screen_height, screen_mode).copy()
     x, y = coords
     cv2.rectangle(img, (x, y), (x+region_width-1, y+region_height-1), (0,0,255), 3)
     cv2.imwrite(output_path, img)
     # print removed for quieter operation
 
 def draw_largest_region(image_path, center, size, output_path='output.png', screen_width=None, screen_height=None, screen_mode="fill"):
-    img = cv2.imread(image_path)
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    orig_h, orig_w = img.shape[:2]
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        if screen_mode == "fill":
-            scale = max(scale_w, scale_h)
-        else:
-            scale = min(scale_w, scale_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
+    img = load_screen_image(image_path, screen_width, screen_height, screen_mode).copy()
     cx, cy = center
     region_w, region_h = size
     x1 = cx - region_w // 2
@@ -266,16 +245,10 @@ def draw_largest_region(image_path, center, size, output_path='output.png', scre
 
 def get_region_brightness(image_path, x, y, w, h, screen_width=None, screen_height=None, screen_mode="fill"):
     """Get average brightness (0-255) of a specific region in the wallpaper."""
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
+    try:
+        img = load_screen_gray(image_path, screen_width, screen_height, screen_mode)
+    except FileNotFoundError:
         return 128
-    orig_h, orig_w = img.shape[:2]
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        scale = max(scale_w, scale_h) if screen_mode == "fill" else min(scale_w, scale_h)
-        img = cv2.resize(img, (int(orig_w * scale), int(orig_h * scale)), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
     x = max(0, x)
     y = max(0, y)
     w = max(1, min(w, img.shape[1] - x))
@@ -286,21 +259,7 @@ def get_region_brightness(image_path, x, y, w, h, screen_width=None, screen_heig
     return float(np.mean(region))
 
 def get_dominant_color(image_path, x, y, w, h, screen_width=None, screen_height=None, screen_mode="fill"):
-    img = cv2.imread(image_path)
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    orig_h, orig_w = img.shape[:2]
-    if screen_width is not None and screen_height is not None:
-        scale_w = screen_width / orig_w
-        scale_h = screen_height / orig_h
-        if screen_mode == "fill":
-            scale = max(scale_w, scale_h)
-        else:
-            scale = min(scale_w, scale_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
-        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-        img = center_crop(img, screen_width, screen_height)
+    img = load_screen_image(image_path, screen_width, screen_height, screen_mode)
     # Ensure region is within bounds
     x = max(0, x)
     y = max(0, y)
@@ -346,7 +305,10 @@ def main():
     parser.add_argument("--color-only", action="store_true", help="Skip region search; analyze color/brightness at a specific position")
     parser.add_argument("--position-x", type=int, default=0, help="Widget X position for --color-only mode")
     parser.add_argument("--position-y", type=int, default=0, help="Widget Y position for --color-only mode")
+    parser.add_argument("--no-cache", action="store_true", help="Decode the full image instead of using the wallpaper analysis cache")
     args = parser.parse_args()
+    global USE_WALLPAPER_CACHE
+    USE_WALLPAPER_CACHE = not args.no_cache
 
     # Color-only mode: analyze the region at the widget's actual position
     if args.color_only:
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Decode-once cache of downscaled wallpaper pixels for the image analyzers.
+
+A wallpaper change runs several analyzers over the same image
+(generate_colors_material.py, scheme_for_image.py, least_busy_region.py,
+find_regions.py). Instead of each one decoding the full-resolution file,
+the first to ask decodes it once (JPEGs through PIL's draft mode, which
+lets libjpeg scale while decoding) and stores a small mipmap set as .npy
+files that later runs memory-map:
+
+  - mip-128/256/1024: longest side at most that many pixels
+  - screen-WxH-MODE:  scaled to cover (fill) or fit a screen and
+                      center-cropped, as least_busy_region.py expects
+
+Entries live in $XDG_CACHE_HOME/inir/wallpaper-analysis/<key>/, keyed by the
+image's resolved path, mtime and size, so replacing a file invalidates it.
+Screen geometries that were asked for are remembered, and later decodes
+build them too, so a steady-state wallpaper switch decodes each image once.
+All arrays are read-only uint8 RGB; has_alpha tells callers that care about
+transparency to read the file itself.
+
+Usage: wallpaper_cache.py <image> [--screen WxH] [--screen-mode fill|fit]
+       (warms the cache and prints the entry as JSON)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+MIP_SIZES = (128, 256, 1024)
+MAX_ENTRIES = 8
+MAX_SCREENS = 4
+CACHE_VERSION = 2
+
+
+def default_cache_dir():
+    cache_home = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cache_home, "inir", "wallpaper-analysis")
+
+
+def screen_geometry(orig_w, orig_h, width, height, mode="fill"):
+    """Scaled size for a screen, using least_busy_region.py's fill/fit rule."""
+    scale_w = width / orig_w
+    scale_h = height / orig_h
+    scale = max(scale_w, scale_h) if mode == "fill" else min(scale_w, scale_h)
+    return max(1, int(orig_w * scale)), max(1, int(orig_h * scale))
+
+
+def _center_crop(arr, target_w, target_h):
+    h, w = arr.shape[:2]
+    x1 = max(0, (w - target_w) // 2)
+    y1 = max(0, (h - target_h) // 2)
+    return arr[y1:y1 + target_h, x1:x1 + target_w]
+
+
+def _fit(size, max_dim):
+    w, h = size
+    if max(w, h) <= max_dim:
+        return w, h
+    scale = max_dim / max(w, h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+class WallpaperCache:
+    """Cached mipmaps of one image file; see the module docstring."""
+
+    def __init__(self, path, cache_dir=None):
+        self.path = os.path.realpath(path)
+        st = os.stat(self.path)
+        self.root = cache_dir or default_cache_dir()
+        key = f"{CACHE_VERSION}:{self.path}:{st.st_mtime_ns}:{st.st_size}"
+        self.dir = os.path.join(self.root, hashlib.sha1(key.encode()).hexdigest()[:20])
+        self._meta = None
+
+    @property
+    def size(self):
+        """Original (width, height) of the image."""
+        meta = self._load_meta()
+        if meta is None:
+            self._build()
+            meta = self._load_meta()
+        return tuple(meta["size"])
+
+    @property
+    def has_alpha(self):
+        """Whether the image has transparency, which the RGB mipmaps drop."""
+        self.size  # builds the entry on a cold cache
+        return self._load_meta()["alpha"]
+
+    def mip(self, max_dim):
+        """Image with its longest side at most max_dim, from the smallest level that covers it."""
+        level = next((s for s in MIP_SIZES if s >= max_dim), None)
+        if level is None:
+            # Larger than any stored level: only a fresh decode can provide it
+            return np.asarray(self._decode_to(_fit(self._original_size(), max_dim)))
+        arr = self._load(f"mip-{level}")
+        if arr is None:
+            self._build()
+            arr = self._load(f"mip-{level}")
+        if max(arr.shape[:2]) > max_dim:
+            from PIL import Image
+
+            size = _fit((arr.shape[1], arr.shape[0]), max_dim)
+            arr = np.asarray(Image.fromarray(arr).resize(size, Image.Resampling.BOX))
+        return arr
+
+    def screen(self, width, height, mode="fill"):
+        """Image scaled to cover (fill) or fit width x height, then center-cropped."""
+        name = f"screen-{width}x{height}-{mode}"
+        self._remember_screen(width, height, mode)
+        arr = self._load(name)
+        if arr is None:
+            self._build()
+            arr = self._load(name)
+        return arr
+
+    # --- storage ---
+
+    def _load(self, name):
+        try:
+            return np.load(os.path.join(self.dir, f"{name}.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def _load_meta(self):
+        if self._meta is None:
+            try:
+                with open(os.path.join(self.dir, "meta.json")) as f:
+                    self._meta = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return self._meta
+
+    def _save(self, name, arr):
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(arr, dtype=np.uint8))
+        os.replace(tmp, os.path.join(self.dir, f"{name}.npy"))
+
+    def _screens(self):
+        try:
+            with open(os.path.join(self.root, "screens.json")) as f:
+                return [tuple(s) for s in json.load(f)]
+        except (OSError, ValueError):
+            return []
+
+    def _remember_screen(self, width, height, mode):
+        screens = self._screens()
+        entry = (width, height, mode)
+        if screens[:1] == [entry]:
+            return
+        screens = [entry] + [s for s in screens if s != entry]
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump([list(s) for s in screens[:MAX_SCREENS]], f)
+        os.replace(tmp, os.path.join(self.root, "screens.json"))
+
+    def _prune(self):
+        try:
+            entries = [
+                os.path.join(self.root, d) for d in os.listdir(self.root)
+                if os.path.isdir(os.path.join(self.root, d))
+            ]
+        except OSError:
+            return
+        entries.sort(key=lambda d: os.stat(d).st_mtime, reverse=True)
+        for stale in entries[MAX_ENTRIES:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    # --- decoding ---
+
+    def _open(self):
+        from PIL import Image
+
+        image = Image.open(self.path)
+        if image.format == "GIF" and getattr(image, "n_frames", 1) > 1:
+            image.seek(1)
+        return image
+
+    def _original_size(self):
+        meta = self._load_meta()
+        if meta is not None:
+            return tuple(meta["size"])
+        with self._open() as image:
+            return image.size
+
+    def _decode_to(self, size):
+        """Decode scaled to size (w, h), letting JPEG draft mode do most of the work."""
+        from PIL import Image
+
+        with self._open() as image:
+            image.draft("RGB", size)
+            image = image.convert("RGB")
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            return image
+
+    def _build(self):
+        """Decode once and write every mip level plus the remembered screen sizes."""
+        from PIL import Image
+
+        with self._open() as image:
+            orig = image.size
+            alpha = image.mode in ("RGBA", "LA", "PA", "La", "RGBa") or "transparency" in image.info
+            screens = [
+                (w, h, mode, screen_geometry(*orig, w, h, mode))
+                for w, h, mode in self._screens()
+            ]
+            largest = max([MIP_SIZES[-1]] + [max(s[3]) for s in screens])
+            image.draft("RGB", _fit(orig, largest))
+            base = image.convert("RGB")
+
+        os.makedirs(self.dir, exist_ok=True)
+        present = set(os.listdir(self.dir))
+        for level in MIP_SIZES:
+            if f"mip-{level}.npy" in present:
+                continue
+            size = _fit(orig, level)
+            mip = base if base.size == size else base.resize(size, Image.Resampling.LANCZOS)
+            self._save(f"mip-{level}", np.asarray(mip))
+        for w, h, mode, scaled in screens:
+            if f"screen-{w}x{h}-{mode}.npy" in present:
+                continue
+            arr = np.asarray(base.resize(scaled, Image.Resampling.LANCZOS))
+            self._save(f"screen-{w}x{h}-{mode}", _center_crop(arr, w, h))
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".json.tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"path": self.path, "size": list(orig), "alpha": alpha}, f)
+        os.replace(tmp, os.path.join(self.dir, "meta.json"))
+        self._meta = None
+        self._prune()
+
+
+def open_cache(path, cache_dir=None):
+    """WallpaperCache for path, or None when it cannot be decoded or cached."""
+    try:
+        cache = WallpaperCache(path, cache_dir)
+        cache.size  # decodes on a cold cache; fails early for videos and broken files
+        return cache
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the wallpaper analysis cache for an image")
+    parser.add_argument("image_path", help="Path to the image")
+    parser.add_argument("--screen", help="Also cache a screen-sized copy, as WIDTHxHEIGHT")
+    parser.add_argument("--screen-mode", choices=["fill", "fit"], default="fill")
+    args = parser.parse_args()
+
+    cache = open_cache(args.image_path)
+    if cache is None:
+        print(json.dumps({"error": f"Cannot cache {args.image_path}"}))
+        sys.exit(1)
+    if args.screen:
+        width, height = (int(v) for v in args.screen.lower().split("x"))
+        cache.screen(width, height, args.screen_mode)
+    print(json.dumps({"path": cache.path, "size": list(cache.size), "dir": cache.dir}))
+
+
+if __name__ == "__main__":
+    main()
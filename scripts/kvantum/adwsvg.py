@@ -1,5 +1,6 @@
 import re
 import os
+import sys
 
 def read_scss(file_path):
     """Reads an SCSS file and returns a dictionary of color variables."""
@@ -12,6 +13,87 @@ def read_scss(file_path):
                 colors[variable_name] = color
     return colors
 
+def light_colors(color_data):
+    """Colloid.svg source colors mapped to the generated material colors."""
+    return {
+        #'#cccccc': color_data['surfaceDim'],  # Map old SVG color to new SCSS color
+        #'#666666': color_data['surfaceDim'],
+        '#3c84f7': color_data['primary'],
+        #'#5a5a5a': color_data['neutral_paletteKeyColor'],
+        '#000000': color_data['shadow'],
+        '#f04a50': color_data['error'],
+        '#4285f4': color_data['primaryFixedDim'],
+        '#f2f2f2': color_data['background'],
+        #'#dfdfdf': color_data['surfaceContainerLow'],
+        '#ffffff': color_data['background'],
+        '#1e1e1e': color_data['onPrimaryFixed'],
+        #'#b6b6b6': color_data['surfaceContainer'],
+        '#333': color_data['inverseSurface'],
+        '#212121': color_data['onSecondaryFixed'],
+        '#5b9bf8': color_data['secondaryContainer'],
+        '#26272a': color_data['term7'],
+        #'#b3b3b3': color_data['surfaceBright'],
+        #'#b74aff': color_data['tertiary'],
+        #'#989898': color_data['surfaceContainerHighest'],
+        #'#c1c1c1': color_data['surfaceContainerHigh'],
+        '#444444': color_data['onBackground'],
+        '#333333': color_data['onPrimaryFixed'],
+    }
+
+def dark_colors(color_data):
+    """ColloidDark.svg source colors mapped to the generated material colors."""
+    return {
+        #'#525252': color_data['surfaceDim'],  # Map old SVG color to new SCSS color
+        #'#666666': color_data['surfaceDim'],
+        '#31363b': color_data['background'],
+        #'#eff0f1': color_data['neutral_paletteKeyColor'],
+        '#000000': color_data['shadow'],
+        '#5b9bf8': color_data['primary'],
+        '#93cee9': color_data['onSecondaryContainer'],
+        '#3daee9': color_data['secondary'],
+        #'#fff': color_data['term10'],
+        #'#5a5a5a': color_data['surfaceVariant'],
+        #'#acb1bc': color_data['onPrimaryFixed'],
+        '#ffffff': color_data['term11'],
+        '#5a616e': color_data['surfaceVariant'],
+        '#f04a50': color_data['error'],
+        '#4285f4': color_data['secondary'],
+        '#242424': color_data['background'],
+        '#2c2c2c': color_data['background'],
+        #'#dfdfdf': color_data['onSurfaceVariant'],
+        #'#646464': color_data['surfaceContainerHighest'],
+        #'#989898': color_data['surfaceContainerHigh'],
+        #'#c1c1c1': color_data['primaryFixedDim'],
+        '#1e1e1e': color_data['background'],
+        '#3c3c3c': color_data['background'],
+        '#26272a': color_data['surfaceBright'],
+        '#b74aff': color_data['tertiary'],
+        #'#b6b6b6': color_data['onSurfaceVariant'],
+        '#1a1a1a': color_data['background'],
+        '#333': color_data['term0'],
+        '#212121': color_data['background'],
+    }
+
+# variant -> (source SVG under ~/.config/Kvantum/Colloid, color map)
+VARIANTS = {
+    'light': ('Colloid.svg', light_colors),
+    'dark': ('ColloidDark.svg', dark_colors),
+}
+
+def compile_recolor(old_to_new_colors):
+    """
+    Builds a single-pass recolor function for the given color map.
+
+    All source colors go into one case-insensitive alternation, longest
+    first, so every color is rewritten in one scan and a replacement is
+    never rewritten again by a later mapping. A source color only matches
+    as a whole hex literal ('#333' does not match inside '#333333').
+    """
+    lookup = {old.lower(): new for old, new in old_to_new_colors.items()}
+    alternation = '|'.join(re.escape(old) for old in sorted(lookup, key=len, reverse=True))
+    pattern = re.compile(f'(?:{alternation})(?![0-9A-Fa-f])', re.IGNORECASE)
+    return lambda text: pattern.sub(lambda match: lookup[match.group(0).lower()], text)
+
 def update_svg_colors(svg_path, old_to_new_colors, output_path):
     """
     Updates the colors in an SVG file based on the provided color map.
@@ -25,55 +107,41 @@ def update_svg_colors(svg_path, old_to_new_colors, output_path):
         svg_content = file.read()
 
     # Replace old colors with new colors
-    for old_color, new_color in old_to_new_colors.items():
-        svg_content = re.sub(old_color, new_color, svg_content, flags=re.IGNORECASE)
+    svg_content = compile_recolor(old_to_new_colors)(svg_content)
+
+    # Leave the output (and Kvantum's mtime-based reload) alone when nothing changed
+    try:
+        with open(output_path, 'r') as file:
+            if file.read() == svg_content:
+                print(f"SVG colors already up to date in {output_path}")
+                return False
+    except OSError:
+        pass
 
     # Write the updated SVG content to the output file
     with open(output_path, 'w') as file:
         file.write(svg_content)
-    
+
     print(f"SVG colors have been updated and saved to {output_path}!")
+    return True
 
-def main():
+def main(variant='light'):
     xdg_config_home = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
     xdg_state_home = os.environ.get("XDG_STATE_HOME", os.path.expanduser("~/.local/state"))
 
     scss_file = os.path.join(xdg_state_home, "quickshell", "user", "generated", "material_colors.scss")
-    svg_path = os.path.join(xdg_config_home, "Kvantum", "Colloid", "Colloid.svg")
+    svg_name, color_map = VARIANTS[variant]
+    svg_path = os.path.join(xdg_config_home, "Kvantum", "Colloid", svg_name)
     output_path = os.path.join(xdg_config_home, "Kvantum", "MaterialAdw", "MaterialAdw.svg")
 
     # Read colors from the SCSS file
     color_data = read_scss(scss_file)
 
-    # Specify the old colors and map them to new colors from the SCSS file
-    old_to_new_colors = {
-        #'#cccccc': color_data['surfaceDim'],  # Map old SVG color to new SCSS color
-        #'#666666': color_data['surfaceDim'],
-        '#3c84f7': color_data['primary'],
-        #'#5a5a5a': color_data['neutral_paletteKeyColor'],
-        '#000000': color_data['shadow'],
-        '#f04a50': color_data['error'],
-        '#4285f4': color_data['primaryFixedDim'],
-        '#f2f2f2': color_data['background'],
-        #'#dfdfdf': color_data['surfaceContainerLow'],
-        '#ffffff': color_data['background'],
-        '#1e1e1e': color_data['onPrimaryFixed'],
-        #'#b6b6b6': color_data['surfaceContainer'],
-        '#333': color_data['inverseSurface'],
-        '#212121': color_data['onSecondaryFixed'],
-        '#5b9bf8': color_data['secondaryContainer'],
-        '#26272a': color_data['term7'],
-        #'#b3b3b3': color_data['surfaceBright'],
-        #'#b74aff': color_data['tertiary'],
-        #'#989898': color_data['surfaceContainerHighest'],
-        #'#c1c1c1': color_data['surfaceContainerHigh'],
-        '#444444': color_data['onBackground'],
-        '#333333': color_data['onPrimaryFixed'],
-    }
-
     # Update the SVG colors
-    update_svg_colors(svg_path, old_to_new_colors, output_path)
+    update_svg_colors(svg_path, color_map(color_data), output_path)
 
 if __name__ == "__main__":
-    main()
-
+    if len(sys.argv) > 1 and sys.argv[1] not in VARIANTS:
+        print(f"Usage: {sys.argv[0]} [{'|'.join(VARIANTS)}]", file=sys.stderr)
+        sys.exit(1)
+    main(sys.argv[1] if len(sys.argv) > 1 else 'light')
@@ -31,14 +31,16 @@ apply_qt() {
 	lightdark=$(get_light_dark)
 	if [ "$lightdark" = "light" ]; then
 		# apply ligght colors
-		cp "$XDG_CONFIG_HOME/Kvantum/Colloid/Colloid.kvconfig" "$XDG_CONFIG_HOME/Kvantum/MaterialAdw/MaterialAdw.kvconfig"
-		python "$CONFIG_DIR/scripts/kvantum/adwsvg.py"
-
+		kvconfig="$XDG_CONFIG_HOME/Kvantum/Colloid/Colloid.kvconfig"
 	else
 		#apply dark colors
-		cp "$XDG_CONFIG_HOME/Kvantum/Colloid/ColloidDark.kvconfig" "$XDG_CONFIG_HOME/Kvantum/MaterialAdw/MaterialAdw.kvconfig"
-		python "$CONFIG_DIR/scripts/kvantum/adwsvgDark.py"
+		kvconfig="$XDG_CONFIG_HOME/Kvantum/Colloid/ColloidDark.kvconfig"
 	fi
+
+	# Only touch MaterialAdw when the output would change; Kvantum reloads on write
+	cmp -s "$kvconfig" "$XDG_CONFIG_HOME/Kvantum/MaterialAdw/MaterialAdw.kvconfig" ||
+		cp "$kvconfig" "$XDG_CONFIG_HOME/Kvantum/MaterialAdw/MaterialAdw.kvconfig"
+	python "$CONFIG_DIR/scripts/kvantum/adwsvg.py" "$lightdark"
 }
 
 apply_qt
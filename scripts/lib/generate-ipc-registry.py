@@ -4,12 +4,18 @@
 QML is the ground truth for targets and functions.
 IPC.md enriches with descriptions, keybind examples, and family scope.
 
+QML scan results are cached per file (keyed by path, mtime and size) in
+$XDG_CACHE_HOME/inir/ipc-registry-scan.json, so an unchanged tree costs
+one stat per file.
+
 Usage:
     python3 scripts/lib/generate-ipc-registry.py           # generate
     python3 scripts/lib/generate-ipc-registry.py --check    # check if output is stale
+    python3 scripts/lib/generate-ipc-registry.py --no-cache # rescan every QML file
 """
 
 import hashlib
+import json
 import os
 import re
 import sys
@@ -25,6 +31,13 @@ QML_DIRS = [
 ]
 IPC_MD = REPO_ROOT / "docs" / "IPC.md"
 OUTPUT = REPO_ROOT / "scripts" / "lib" / "ipc-registry.sh"
+SCAN_CACHE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "inir"
+    / "ipc-registry-scan.json"
+)
+# Bump when the scanner's output for a file can change
+SCAN_CACHE_VERSION = 1
 
 # Targets under this IPC.md heading are waffle-only.
 WAFFLE_SECTION_HEADING = "## Waffle-Specific Targets"
@@ -61,86 +74,149 @@ class IpcTarget:
 # QML scanner
 # ---------------------------------------------------------------------------
 
-_RE_IPC_HANDLER = re.compile(r"IpcHandler\s*\{")
-_RE_TARGET = re.compile(r'target\s*:\s*"([^"]+)"')
-_RE_FUNCTION = re.compile(r"function\s+(\w+)\s*\(([^)]*)\)")
-_RE_CLOSING_BRACE = re.compile(r"^\s*\}")
+# One pass over the file: handler openings, braces, and the target / function
+# declarations inside a handler block.
+_RE_QML_TOKEN = re.compile(
+    r"(?P<handler>IpcHandler\s*\{)"
+    r'|target\s*:\s*"(?P<target>[^"]+)"'
+    r"|function\s+(?P<function>\w+)\s*\((?P<args>[^)]*)\)"
+    r"|(?P<brace>[{}])"
+)
 
 
-def _scan_qml_file(path: Path) -> list[IpcTarget]:
-    """Extract IpcHandler blocks from a single QML file."""
-    text = path.read_text(errors="replace")
-    lines = text.splitlines()
-    targets: list[IpcTarget] = []
+def _parse_args(raw_args: str) -> list[str]:
+    args = []
+    for part in raw_args.split(","):
+        # QML style: "name: type" or just "name"
+        arg_name = part.split(":")[0].strip()
+        if arg_name:
+            args.append(arg_name)
+    return args
 
-    i = 0
-    while i < len(lines):
-        if _RE_IPC_HANDLER.search(lines[i]):
-            target_name = None
-            functions: list[IpcFunction] = []
-            brace_depth = 0
-            # Count braces from the opening line
-            for ch in lines[i]:
-                if ch == "{":
-                    brace_depth += 1
-                elif ch == "}":
-                    brace_depth -= 1
-            j = i + 1
-            while j < len(lines) and brace_depth > 0:
-                line = lines[j]
-                for ch in line:
-                    if ch == "{":
-                        brace_depth += 1
-                    elif ch == "}":
-                        brace_depth -= 1
-                        if brace_depth == 0:
-                            break
-
-                m = _RE_TARGET.search(line)
-                if m:
-                    target_name = m.group(1)
-
-                m = _RE_FUNCTION.search(line)
-                if m and brace_depth >= 1:
-                    fname = m.group(1)
-                    raw_args = m.group(2).strip()
-                    args = []
-                    if raw_args:
-                        for part in raw_args.split(","):
-                            part = part.strip()
-                            # QML style: "name: type" or just "name"
-                            arg_name = part.split(":")[0].strip()
-                            if arg_name:
-                                args.append(arg_name)
-                    functions.append(IpcFunction(name=fname, args=args))
-
-                j += 1
-
-            if target_name:
-                rel = str(path.relative_to(REPO_ROOT))
-                targets.append(
-                    IpcTarget(name=target_name, functions=functions, qml_file=rel)
-                )
-            i = j
+
+def _parse_qml(text: str, rel: str) -> list[IpcTarget]:
+    """Extract IpcHandler blocks from QML source with a single brace-tracking pass."""
+    targets: list[IpcTarget] = []
+    depth = 0
+    handler_depth = None  # depth of the open IpcHandler block, if inside one
+    target_name = None
+    functions: list[IpcFunction] = []
+
+    for m in _RE_QML_TOKEN.finditer(text):
+        if m.group("handler") or m.group("brace") == "{":
+            depth += 1
+            if m.group("handler") and handler_depth is None:
+                handler_depth = depth
+                target_name = None
+                functions = []
+        elif m.group("brace") == "}":
+            if depth == handler_depth:
+                if target_name:
+                    targets.append(
+                        IpcTarget(name=target_name, functions=functions, qml_file=rel)
+                    )
+                handler_depth = None
+            depth -= 1
+        elif handler_depth is None:
+            continue
+        elif m.group("target"):
+            target_name = m.group("target")
         else:
-            i += 1
+            functions.append(
+                IpcFunction(name=m.group("function"), args=_parse_args(m.group("args")))
+            )
 
     return targets
 
 
-def scan_qml() -> dict[str, IpcTarget]:
-    """Scan all QML files for IpcHandler declarations."""
-    all_targets: dict[str, IpcTarget] = {}
-
-    paths: list[Path] = []
+def _scan_qml_file(path: Path) -> list[IpcTarget]:
+    """Extract IpcHandler blocks from a single QML file."""
+    data = path.read_bytes()
+    # Most files have no handler at all; skip them without tokenizing
+    if b"IpcHandler" not in data:
+        return []
+    rel = str(path.relative_to(REPO_ROOT))
+    return _parse_qml(data.decode(errors="replace"), rel)
+
+
+def _qml_paths() -> list[tuple[str, list[int]]]:
+    """(path relative to REPO_ROOT, [mtime_ns, size]) of every QML file to scan."""
+    found: list[tuple[str, list[int]]] = []
+    stack: list[str] = []
+    prefix = len(str(REPO_ROOT)) + 1
     for entry in QML_DIRS:
         if entry.is_file():
-            paths.append(entry)
+            st = entry.stat()
+            found.append((str(entry)[prefix:], [st.st_mtime_ns, st.st_size]))
         elif entry.is_dir():
-            paths.extend(entry.rglob("*.qml"))
+            stack.append(str(entry))
+    # scandir walk: one stat per QML file and no per-entry Path objects
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for child in it:
+                if child.is_dir(follow_symlinks=False):
+                    stack.append(child.path)
+                elif child.name.endswith(".qml") and child.is_file():
+                    st = child.stat()
+                    found.append((child.path[prefix:], [st.st_mtime_ns, st.st_size]))
+    return sorted(found)
+
+
+def _load_scan_cache() -> dict:
+    try:
+        cache = json.loads(SCAN_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != SCAN_CACHE_VERSION or cache.get("root") != str(REPO_ROOT):
+        return {}
+    return cache.get("files", {})
+
+
+def _save_scan_cache(files: dict) -> None:
+    payload = {"version": SCAN_CACHE_VERSION, "root": str(REPO_ROOT), "files": files}
+    try:
+        SCAN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SCAN_CACHE.with_name(f".{SCAN_CACHE.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        os.replace(tmp, SCAN_CACHE)
+    except OSError:
+        pass  # The cache is only an accelerator
+
+
+def _targets_to_json(targets: list[IpcTarget]) -> list:
+    return [
+        [t.name, [[fn.name, fn.args] for fn in t.functions]] for t in targets
+    ]
+
+
+def _targets_from_json(data: list, rel: str) -> list[IpcTarget]:
+    return [
+        IpcTarget(
+            name=name,
+            functions=[IpcFunction(name=fn, args=list(args)) for fn, args in fns],
+            qml_file=rel,
+        )
+        for name, fns in data
+    ]
 
-    for path in sorted(paths):
-        for target in _scan_qml_file(path):
+
+def scan_qml(use_cache: bool = True) -> dict[str, IpcTarget]:
+    """Scan all QML files for IpcHandler declarations."""
+    all_targets: dict[str, IpcTarget] = {}
+
+    cached = _load_scan_cache() if use_cache else {}
+    fresh: dict[str, list] = {}
+
+    for rel, key in _qml_paths():
+        entry = cached.get(rel)
+        if entry is not None and entry[0] == key:
+            fresh[rel] = entry
+            file_targets = _targets_from_json(entry[1], rel) if entry[1] else []
+        else:
+            file_targets = _scan_qml_file(REPO_ROOT / rel)
+            fresh[rel] = [key, _targets_to_json(file_targets)]
+
+        for target in file_targets:
             if target.name in all_targets:
                 if target.name in KNOWN_DUPLICATES:
                     # Merge functions from duplicate registrations.
@@ -158,6 +234,9 @@ def scan_qml() -> dict[str, IpcTarget]:
             else:
                 all_targets[target.name] = target
 
+    if use_cache and fresh != cached:
+        _save_scan_cache(fresh)
+
     return all_targets
 
 
@@ -500,7 +579,7 @@ def generate_bash(targets: list[IpcTarget], aliases: dict[str, str]) -> str:
 def main():
     check_mode = "--check" in sys.argv
 
-    qml_targets = scan_qml()
+    qml_targets = scan_qml(use_cache="--no-cache" not in sys.argv)
     md_entries = parse_ipc_md()
     targets = merge(qml_targets, md_entries)
     aliases = generate_aliases(targets)
@@ -18,19 +18,38 @@ Commands:
   validate             Validate current Niri config via niri validate
   detect-customizations Report Niri files that differ from shipped iNiR defaults
   set SECTION KEY VAL  Surgical edit of a single config value
+  set-many JSON|-      Apply a list of set edits atomically with one validation
   get-binds            JSON of all keybinds from 70-binds.kdl with categories/metadata
   set-bind KEY ACTION  Add or update a keybind in 70-binds.kdl (surgical edit)
   remove-bind KEY      Comment out a keybind in 70-binds.kdl (surgical edit)
+  serve [--socket P]   Resident JSON-RPC server with cached config (Unix socket)
 """
 
+from contextlib import redirect_stdout
 from difflib import unified_diff
+import io
 import json
 import os
 import re
+import selectors
+import shutil
+import signal
+import socket
+import struct
 import subprocess
 import sys
+import time
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from niri_kdl import parse_kdl  # noqa: E402
+from niri_keybinds import (  # noqa: E402
+    KeybindIndex,
+    file_binds,
+    group_by_category as group_binds_by_category,
+    load_index as load_keybind_index,
+)
+
 
 DEFAULT_NIRI_FILES = [
     "config.kdl",
@@ -61,14 +80,12 @@ def get_repo_default_niri_dir():
 
 
 def _root_includes(relative_path: str) -> bool:
-    config_file = get_niri_config_path()
-    if not config_file.exists():
-        return False
-
     try:
-        content = config_file.read_text()
+        content = _read_config_text(get_niri_config_path())
     except Exception:
         return False
+    if content is None:
+        return False
 
     escaped = re.escape(relative_path)
     return bool(re.search(rf'^\s*include\s+"{escaped}"\s*$', content, re.MULTILINE))
@@ -218,7 +235,8 @@ def cmd_apply_output(args):
 
 
 def cmd_persist_output(args):
-    """Write output config to KDL config.d/15-outputs.kdl using surgical edits."""
+    """Write output config to KDL config.d/15-outputs.kdl using surgical edits
+    on the parsed KdlDocument (nested blocks inside the output are safe)."""
     if len(args) < 2:
         print(json.dumps({"error": "Usage: persist-output <name> <key=value>..."}))
         return 1
@@ -249,50 +267,43 @@ def cmd_persist_output(args):
     outputs_file = resolve_niri_section_file("config.d/15-outputs.kdl")
     outputs_file.parent.mkdir(parents=True, exist_ok=True)
 
-    existing = outputs_file.read_text() if outputs_file.exists() else ""
+    existing = _read_config_text(outputs_file) or ""
 
-    # Find existing output block for this name
-    pattern = rf'(output\s+"{re.escape(output_name)}"\s*\{{)(.*?)(\}})'
-    match = re.search(pattern, existing, re.DOTALL)
+    node = _find_output_node(existing, output_name)
 
-    if match:
-        # Surgical edit within existing block
-        block_content = match.group(2)
+    if node is not None:
+        # Surgical edit of the block's own children; nested blocks are untouched
+        block_content = existing[node.inner_start : node.inner_end]
 
         for key, value in changes.items():
             if key == "mode":
-                block_content = _set_in_block(block_content, "mode", f'"{value}"')
+                block_content = _set_child_node(block_content, "mode", f'"{value}"')
             elif key == "scale":
-                block_content = _set_in_block(block_content, "scale", value)
+                block_content = _set_child_node(block_content, "scale", value)
             elif key == "transform":
-                block_content = _set_in_block(block_content, "transform", f'"{value}"')
+                block_content = _set_child_node(block_content, "transform", f'"{value}"')
             elif key == "vrr":
                 if value == "off":
-                    # Remove variable-refresh-rate line
-                    block_content = re.sub(
-                        r"\n?\s*variable-refresh-rate[^\n]*", "", block_content
+                    block_content = _remove_child_node(
+                        block_content, "variable-refresh-rate"
                     )
                 elif value == "on-demand":
-                    block_content = _set_in_block(
+                    block_content = _set_child_node(
                         block_content, "variable-refresh-rate", "on-demand=true"
                     )
                 else:
-                    block_content = _set_in_block(
+                    block_content = _set_child_node(
                         block_content, "variable-refresh-rate", ""
                     )
             elif key == "position":
                 parts = value.split(",")
                 if len(parts) == 2:
-                    block_content = _set_in_block(
+                    block_content = _set_child_node(
                         block_content, "position", f"x={parts[0]} y={parts[1]}"
                     )
 
         result = (
-            existing[: match.start()]
-            + match.group(1)
-            + block_content
-            + match.group(3)
-            + existing[match.end() :]
+            existing[: node.inner_start] + block_content + existing[node.inner_end :]
         )
     else:
         # Create new output block
@@ -324,26 +335,96 @@ def cmd_persist_output(args):
     return _write_validated(outputs_file, result)
 
 
-def _set_in_block(block_content, key, value):
-    """Set a key=value inside a KDL block, preserving other content.
-    If key exists, replace the line. If not, append it."""
-    # Escape key for regex (handles hyphens)
-    escaped = re.escape(key)
-    # Try to replace existing line
-    pattern = rf"(\n?\s*){escaped}\b[^\n]*"
-    if re.search(pattern, block_content):
-        if value:
-            return re.sub(pattern, rf"\g<1>{key} {value}", block_content, count=1)
-        else:
-            # Flag-style (no value) like variable-refresh-rate
-            return re.sub(pattern, rf"\g<1>{key}", block_content, count=1)
+def _find_output_node(content, output_name):
+    """Top-level ``output "<name>" { ... }`` node, or None."""
+    for node in parse_kdl(content).find_all("output", top_level=True):
+        name_end = node.start + len("output") + (2 if content[node.start] == '"' else 0)
+        header = content[name_end : node.inner_start - 1]
+        m = re.match(r'\s*(?:"((?:\\.|[^"\\])*)"|([^\s{;"]+))', header)
+        if m and (m.group(1) if m.group(1) is not None else m.group(2)) == output_name:
+            return node
+    return None
+
+
+# What may follow a node on its line: a ";" terminator and/or a line comment
+_NODE_TRAILER_RE = re.compile(r"[ \t]*;?[ \t]*(?://[^\n]*)?")
+
+
+def _child_node(block_content, key):
+    for node in parse_kdl(block_content).nodes:
+        if node.name == key:
+            return node
+    return None
+
+
+def _child_block(block_content, key):
+    """Direct child ``key { ... }`` (without arguments) of a block, or None."""
+    for node in parse_kdl(block_content).nodes:
+        if node.name == key and node.has_block and not node.has_args:
+            return node
+    return None
+
+
+def _edit_inner(content, node, edit):
+    """Apply edit(inner_text) to the text between node's braces."""
+    inner = content[node.inner_start : node.inner_end]
+    return content[: node.inner_start] + edit(inner) + content[node.inner_end :]
+
+
+def _append_child(block_content, text):
+    """Append a child node (text may span lines) before the closing brace,
+    indented like its siblings; the brace keeps its own indentation."""
+    body = block_content.rstrip()
+    tail = block_content[len(body) :]
+    close_indent = tail.rsplit("\n", 1)[1] if "\n" in tail else ""
+    nodes = parse_kdl(block_content).nodes
+    if nodes:
+        line_start = block_content.rfind("\n", 0, nodes[-1].start) + 1
+        indent = block_content[line_start : nodes[-1].start]
+        if indent.strip():
+            indent = close_indent + "    "
     else:
-        # Append
-        indent = "    "
-        if value:
-            return block_content.rstrip() + f"\n{indent}{key} {value}\n"
-        else:
-            return block_content.rstrip() + f"\n{indent}{key}\n"
+        indent = close_indent + "    "
+    text = text.replace("\n", "\n" + indent)
+    return f"{body}\n{indent}{text}\n{close_indent}"
+
+
+def _set_child_node(block_content, key, value):
+    """Set a direct child node of a KDL block, replacing its whole span.
+    Nodes nested in child blocks and commented-out lines are never matched."""
+    line = f"{key} {value}" if value else key
+    node = _child_node(block_content, key)
+    if node is None:
+        return _append_child(block_content, line)
+    return block_content[: node.start] + line + block_content[node.end :]
+
+
+def _remove_child_node(block_content, key):
+    node = _child_node(block_content, key)
+    if node is None:
+        return block_content
+    # Drop a terminator or comment trailing the node on the same line; when
+    # that empties the line, drop its indentation and newline too
+    start = node.start
+    end = _NODE_TRAILER_RE.match(block_content, node.end).end()
+    if end == len(block_content) or block_content[end] == "\n":
+        while start > 0 and block_content[start - 1] in " \t":
+            start -= 1
+        if start > 0 and block_content[start - 1] == "\n":
+            start -= 1
+    return block_content[:start] + block_content[end:]
+
+
+def _set_node_property(node_text, prop, value):
+    """Set ``prop=value`` among the arguments of a single node's text."""
+    tokens = node_text.split()
+    for i, token in enumerate(tokens[1:], 1):
+        if token.startswith(f"{prop}="):
+            tokens[i] = f"{prop}={value}"
+            break
+    else:
+        tokens.append(f"{prop}={value}")
+    return " ".join(tokens)
 
 
 # ─── Input ────────────────────────────────────────────────────────────
@@ -414,12 +495,11 @@ def cmd_get_input():
         },
     }
 
-    if not input_file.exists():
+    content = _read_config_text(input_file)
+    if content is None:
         print(json.dumps(result))
         return 0
 
-    content = input_file.read_text()
-
     # Extract subsections — handle nested braces properly
     input_block = _extract_block(content, "input", top_level=True)
     cursor_block = _extract_block(content, "cursor", top_level=True)
@@ -620,45 +700,17 @@ def _extract_block(content, section_name, top_level=False):
 
 
 def _find_block_bounds(content, section_name, top_level=False):
-    pattern = re.compile(rf"(?:^|\n)\s*{re.escape(section_name)}\s*\{{")
-    for match in pattern.finditer(content):
-        if top_level and _brace_depth_before(content, match.start()) != 0:
-            continue
-
-        inner_start = match.end()
-        depth = 1
-        i = inner_start
-        while i < len(content) and depth > 0:
-            if content[i] == "{":
-                depth += 1
-            elif content[i] == "}":
-                depth -= 1
-            i += 1
-
-        if depth == 0:
-            return match.start(), inner_start, i - 1, i
-
-    return None
-
-
-def _brace_depth_before(content, pos):
-    depth = 0
-    for ch in content[:pos]:
-        if ch == "{":
-            depth += 1
-        elif ch == "}" and depth > 0:
-            depth -= 1
-    return depth
+    node = parse_kdl(content).find(section_name, top_level=top_level)
+    if node is None:
+        return None
+    return node.bounds()
 
 
 def _has_top_level_flag(block_content, flag_name):
-    depth = 0
-    for raw_line in block_content.splitlines():
-        stripped = raw_line.strip()
-        if depth == 0 and stripped == flag_name:
-            return True
-        depth += raw_line.count("{") - raw_line.count("}")
-    return False
+    return any(
+        node.name == flag_name and not node.has_args and not node.has_block
+        for node in parse_kdl(block_content).nodes
+    )
 
 
 # ─── Layout ───────────────────────────────────────────────────────────
@@ -699,11 +751,10 @@ def cmd_get_layout():
         "overview_zoom": 0.75,
     }
 
-    if not layout_file.exists():
+    content = _read_config_text(layout_file)
+    if content is None:
         print(json.dumps(result))
         return 0
-
-    content = layout_file.read_text()
     layout_block = _extract_block(content, "layout", top_level=True)
 
     if layout_block:
@@ -878,13 +929,12 @@ def cmd_get_animations():
 
     result = {"enabled": True, "slowdown": 1.0, "types": {}}
 
-    if not anim_file.exists():
+    content = _read_config_text(anim_file)
+    if content is None:
         for t in ANIMATION_TYPES:
             result["types"][t] = dict(ANIMATION_DEFAULTS[t])
         print(json.dumps(result))
         return 0
-
-    content = anim_file.read_text()
     anim_block = _extract_block(content, "animations", top_level=True)
 
     if anim_block:
@@ -950,29 +1000,14 @@ def cmd_get_window_rules():
         "inactive_opacity": 0.9,
     }
 
-    if not rules_file.exists():
+    content = _read_config_text(rules_file)
+    if content is None:
         print(json.dumps(result))
         return 0
 
-    content = rules_file.read_text()
-
     # Find all window-rule blocks
-    pos = 0
-    while True:
-        match = re.search(r"window-rule\s*\{", content[pos:])
-        if not match:
-            break
-        block_start = pos + match.end()
-        depth = 1
-        i = block_start
-        while i < len(content) and depth > 0:
-            if content[i] == "{":
-                depth += 1
-            elif content[i] == "}":
-                depth -= 1
-            i += 1
-        block = content[block_start : i - 1] if depth == 0 else ""
-        pos = i
+    for node in parse_kdl(content).find_all("window-rule"):
+        block = content[node.inner_start : node.inner_end]
 
         # Check if this is the inactive-opacity rule (has match is-active=false)
         if re.search(r"match\s+is-active\s*=\s*false", block):
@@ -1288,6 +1323,92 @@ def cmd_set(args):
         return 1
 
 
+def cmd_set_many(args):
+    """Apply several `set` edits as one transaction.
+
+    Usage: set-many JSON | set-many -   (JSON read from stdin)
+
+    JSON is a list of [section, key, value] triples or
+    {"section", "key", "value"} objects, e.g.
+      [["layout", "gaps", "12"], ["layout", "border.enabled", "on"]]
+
+    All edits are applied in memory across the affected files, then every
+    changed file is written and `niri validate` runs once. If any edit is
+    rejected or validation fails, no file is left modified.
+    """
+    global _active_transaction
+
+    if len(args) < 1:
+        print(json.dumps({"error": "Usage: set-many <json>|-"}))
+        return 1
+
+    try:
+        raw = sys.stdin.read() if args[0] == "-" else args[0]
+        edits = json.loads(raw)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"error": f"Invalid set-many JSON: {e}"}))
+        return 1
+
+    if not isinstance(edits, list) or not edits:
+        print(json.dumps({"error": "set-many expects a non-empty JSON list"}))
+        return 1
+
+    triples = []
+    for edit in edits:
+        if isinstance(edit, dict):
+            edit = [edit.get("section"), edit.get("key"), edit.get("value")]
+        if not isinstance(edit, list) or len(edit) != 3 or None in edit:
+            print(json.dumps({"error": f"Invalid set-many entry: {edit!r}"}))
+            return 1
+        triples.append([str(part) for part in edit])
+
+    transaction = ConfigTransaction()
+    results = []
+    _active_transaction = transaction
+    try:
+        for section, key, value in triples:
+            captured = io.StringIO()
+            with redirect_stdout(captured):
+                rc = cmd_set([section, key, value])
+            try:
+                result = json.loads(captured.getvalue().strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                result = {}
+            result.update({"section": section, "key": key, "value": value})
+            results.append(result)
+            if rc != 0:
+                print(
+                    json.dumps(
+                        {
+                            "success": False,
+                            "error": result.get("error", f"set {section} {key} failed"),
+                            "results": results,
+                        }
+                    )
+                )
+                return 1
+    finally:
+        _active_transaction = None
+
+    valid, err = transaction.commit()
+    files = [str(path) for path in transaction.staged]
+    if not valid:
+        print(
+            json.dumps(
+                {
+                    "success": False,
+                    "error": f"Validation failed: {err}",
+                    "files": files,
+                    "results": results,
+                }
+            )
+        )
+        return 1
+
+    print(json.dumps({"success": True, "files": files, "results": results}))
+    return 0
+
+
 def _sync_cursor_env(theme=None, size=None):
     """Sync cursor theme/size to environment.d, gsettings, and running session.
 
@@ -1369,12 +1490,13 @@ def _sync_cursor_env(theme=None, size=None):
 def _set_input(config_dir, key, value):
     """Surgical edit in 10-input-and-cursor.kdl."""
     input_file = resolve_niri_section_file("config.d/10-input-and-cursor.kdl")
-    if not input_file.exists():
+    content = _read_config_text(input_file)
+    if content is None:
         print(json.dumps({"error": "input config file not found"}))
         return 1
-
-    content = input_file.read_text()
     parts = key.split(".", 1)
+    # Changes outside the KDL, applied only once the edit is validated
+    after_commit = []
 
     if len(parts) == 1:
         if key == "disable-power-key-handling":
@@ -1501,12 +1623,12 @@ def _set_input(config_dir, key, value):
             content = _set_value_in_block(
                 content, "cursor", prop, f'"{value}"', top_level=True
             )
-            _sync_cursor_env(theme=value)
+            after_commit.append(lambda: _sync_cursor_env(theme=value))
         elif prop == "xcursor-size":
             content = _set_value_in_block(
                 content, "cursor", prop, str(value), top_level=True
             )
-            _sync_cursor_env(size=value)
+            after_commit.append(lambda: _sync_cursor_env(size=value))
         elif prop == "hide-when-typing":
             content = _toggle_flag(
                 content, "cursor", "hide-when-typing", value == "on", top_level=True
@@ -1518,17 +1640,16 @@ def _set_input(config_dir, key, value):
         print(json.dumps({"error": f"Unknown input subsection: {subsection}"}))
         return 1
 
-    return _write_validated(input_file, content)
+    return _write_validated(input_file, content, after_commit=after_commit)
 
 
 def _set_layout(config_dir, key, value):
     layout_file = resolve_niri_section_file("config.d/20-layout-and-overview.kdl")
-    if not layout_file.exists():
+    content = _read_config_text(layout_file)
+    if content is None:
         print(json.dumps({"error": "layout config file not found"}))
         return 1
 
-    content = layout_file.read_text()
-
     if key == "gaps":
         content = _set_value_in_block(
             content, "layout", "gaps", str(value), top_level=True
@@ -1586,46 +1707,27 @@ def _set_layout(config_dir, key, value):
 
 def _set_animations(config_dir, key, value):
     anim_file = resolve_niri_section_file("config.d/60-animations.kdl")
-    if not anim_file.exists():
+    content = _read_config_text(anim_file)
+    if content is None:
         print(json.dumps({"error": "animations config file not found"}))
         return 1
 
-    content = anim_file.read_text()
+    animations = parse_kdl(content).find("animations", top_level=True)
+    if animations is None:
+        print(json.dumps({"error": "animations block not found"}))
+        return 1
 
     if key == "enabled":
-        anim_block = _extract_block(content, "animations", top_level=True)
-        if anim_block is None:
-            print(json.dumps({"error": "animations block not found"}))
-            return 1
-
-        has_off = _has_top_level_flag(anim_block, "off")
-
-        if value == "on" and has_off:
-            content = re.sub(
-                r"(animations\s*\{)\s*\n\s*off\s*\n",
-                r"\g<1>\n",
-                content,
-                count=1,
-            )
-        elif value == "off" and not has_off:
-            content = re.sub(
-                r"(animations\s*\{)\s*\n",
-                r"\g<1>\n    off\n",
-                content,
-                count=1,
-            )
+        content = _edit_inner(
+            content,
+            animations,
+            lambda block: _toggle_child_flag(block, "off", value != "on"),
+        )
 
     elif key == "slowdown":
-        anim_block = _extract_block(content, "animations", top_level=True)
-        if anim_block and "slowdown" in anim_block:
-            content = re.sub(r"(slowdown\s+)[\d.]+", rf"\g<1>{value}", content, count=1)
-        else:
-            content = re.sub(
-                r"(animations\s*\{)\s*\n",
-                rf"\g<1>\n    slowdown {value}\n",
-                content,
-                count=1,
-            )
+        content = _edit_inner(
+            content, animations, lambda block: _set_child_node(block, "slowdown", value)
+        )
 
     elif "." in key:
         # Per-type spring param: e.g. "window-open.damping-ratio" "0.98"
@@ -1637,56 +1739,33 @@ def _set_animations(config_dir, key, value):
             print(json.dumps({"error": f"Unknown spring param: {param}"}))
             return 1
 
-        anim_block = _extract_block(content, "animations", top_level=True)
-        if anim_block is None:
-            print(json.dumps({"error": "animations block not found"}))
-            return 1
-
-        type_block = _extract_block(anim_block, anim_type)
+        def edit_type(type_block):
+            if param == "enabled":
+                return _toggle_child_flag(type_block, "off", value != "on")
+            spring = _child_node(type_block, "spring")
+            if spring is None:
+                return _set_child_node(type_block, "spring", f"{param}={value}")
+            spring_text = type_block[spring.start : spring.end]
+            return (
+                type_block[: spring.start]
+                + _set_node_property(spring_text, param, value)
+                + type_block[spring.end :]
+            )
 
-        if param == "enabled":
-            if type_block:
-                content = _toggle_flag(content, anim_type, "off", value != "on")
-            elif value != "on":
-                content = re.sub(
-                    r"(animations\s*\{)\s*\n",
-                    rf"\g<1>\n    {anim_type} {{\n        off\n    }}\n",
-                    content,
-                    count=1,
-                )
-            return _write_validated(anim_file, content)
-
-        if type_block:
-            spring_match = re.search(r"spring\s+(.*)", type_block)
-            if spring_match:
-                old_spring_line = spring_match.group(0)
-                # Replace the specific param in the spring line
-                if re.search(rf"{re.escape(param)}=[\d.]+", old_spring_line):
-                    new_spring_line = re.sub(
-                        rf"{re.escape(param)}=[\d.]+",
-                        f"{param}={value}",
-                        old_spring_line,
-                    )
-                else:
-                    new_spring_line = old_spring_line + f" {param}={value}"
-                content = content.replace(old_spring_line, new_spring_line, 1)
+        def edit_animations(anim_block):
+            type_node = _child_block(anim_block, anim_type)
+            if type_node is not None:
+                return _edit_inner(anim_block, type_node, edit_type)
+            if param == "enabled":
+                if value == "on":
+                    return anim_block
+                child = "off"
             else:
-                # No spring line yet — add one
-                type_pattern = rf"({re.escape(anim_type)}\s*\{{)"
-                content = re.sub(
-                    type_pattern,
-                    rf"\g<1>\n        spring {param}={value}",
-                    content,
-                    count=1,
-                )
-        else:
+                child = f"spring {param}={value}"
             # Animation type block doesn't exist — create it
-            content = re.sub(
-                r"(animations\s*\{)\s*\n",
-                rf"\g<1>\n    {anim_type} {{\n        spring {param}={value}\n    }}\n",
-                content,
-                count=1,
-            )
+            return _append_child(anim_block, f"{anim_type} {{\n    {child}\n}}")
+
+        content = _edit_inner(content, animations, edit_animations)
 
     else:
         print(json.dumps({"error": f"Unknown animations key: {key}"}))
@@ -1697,38 +1776,43 @@ def _set_animations(config_dir, key, value):
 
 def _set_window_rules(config_dir, key, value):
     rules_file = resolve_niri_section_file("config.d/30-window-rules.kdl")
-    if not rules_file.exists():
+    content = _read_config_text(rules_file)
+    if content is None:
         print(json.dumps({"error": "window rules config file not found"}))
         return 1
 
-    content = rules_file.read_text()
-
-    if key == "corner-radius":
-        if re.search(r"geometry-corner-radius\s+\d+", content):
-            content = re.sub(
-                r"(geometry-corner-radius\s+)\d+",
-                rf"\g<1>{value}",
-                content,
-                count=1,
+    rules = list(parse_kdl(content).find_all("window-rule", top_level=True))
+
+    if key in ("corner-radius", "clip-to-geometry"):
+        prop = "geometry-corner-radius" if key == "corner-radius" else key
+        # The first rule that sets it, else the first rule
+        target = next(
+            (
+                rule
+                for rule in rules
+                if _child_node(content[rule.inner_start : rule.inner_end], prop)
+            ),
+            rules[0] if rules else None,
+        )
+        if target is not None:
+            content = _edit_inner(
+                content, target, lambda block: _set_child_node(block, prop, value)
             )
         else:
-            # Insert in first window-rule block
-            content = re.sub(
-                r"(window-rule\s*\{)\s*\n",
-                rf"\g<1>\n    geometry-corner-radius {value}\n",
-                content,
-                count=1,
-            )
+            content = content.rstrip() + f"\n\nwindow-rule {{\n    {prop} {value}\n}}\n"
 
     elif key == "inactive-opacity":
-        # Find the inactive rule block (has match is-active=false)
-        inactive_pattern = r"(window-rule\s*\{[^}]*match\s+is-active\s*=\s*false[^}]*)(opacity\s+[\d.]+)"
-        if re.search(inactive_pattern, content, re.DOTALL):
-            content = re.sub(
-                r"(match\s+is-active\s*=\s*false\s*\n\s*)(opacity\s+)[\d.]+",
-                rf"\g<1>\g<2>{value}",
-                content,
-                count=1,
+        # The rule matching inactive windows (match is-active=false)
+        target = None
+        for rule in rules:
+            block = content[rule.inner_start : rule.inner_end]
+            match = _child_node(block, "match")
+            if match and "is-active=false" in block[match.start : match.end].split():
+                target = rule
+                break
+        if target is not None:
+            content = _edit_inner(
+                content, target, lambda block: _set_child_node(block, "opacity", value)
             )
         else:
             # No inactive rule exists — append one
@@ -1737,22 +1821,6 @@ def _set_window_rules(config_dir, key, value):
                 + f"\n\nwindow-rule {{\n    match is-active=false\n    opacity {value}\n}}\n"
             )
 
-    elif key == "clip-to-geometry":
-        if re.search(r"clip-to-geometry\s+(true|false)", content):
-            content = re.sub(
-                r"(clip-to-geometry\s+)(true|false)",
-                rf"\g<1>{value}",
-                content,
-                count=1,
-            )
-        else:
-            content = re.sub(
-                r"(window-rule\s*\{)\s*\n",
-                rf"\g<1>\n    clip-to-geometry {value}\n",
-                content,
-                count=1,
-            )
-
     else:
         print(json.dumps({"error": f"Unknown window-rules key: {key}"}))
         return 1
@@ -1763,17 +1831,113 @@ def _set_window_rules(config_dir, key, value):
 # ─── Surgical helpers ─────────────────────────────────────────────────
 
 
-def _write_validated(filepath, content):
-    """Write content to file, then validate. If invalid, restore original and report error."""
-    backup = filepath.read_text() if filepath.exists() else None
-    filepath.write_text(content)
+class ConfigTransaction:
+    """In-memory staging area for edits to one or more Niri config files.
+
+    Edits are staged with ``stage()`` and read back through ``read()`` so
+    several edits to the same file compose. ``commit()`` writes every
+    staged file, runs ``niri validate`` once, and restores all originals
+    if validation fails. Callbacks in ``after_commit`` (side effects
+    outside the KDL files) run only after a successful validation.
+    """
+
+    def __init__(self):
+        self.staged = {}
+        self.after_commit = []
+
+    def read(self, filepath):
+        filepath = Path(filepath)
+        if filepath in self.staged:
+            return self.staged[filepath]
+        return _read_file_text(filepath)
+
+    def stage(self, filepath, content):
+        self.staged[Path(filepath)] = content
+
+    def commit(self):
+        """Write, validate once, roll back on failure. Returns (valid, error)."""
+        backups = {}
+        try:
+            for filepath, content in self.staged.items():
+                backups[filepath] = (
+                    filepath.read_text() if filepath.exists() else None
+                )
+                _atomic_write(filepath, content)
+        except OSError as e:
+            self._restore(backups)
+            return False, str(e)
+
+        valid, err = _validate_config()
+        if not valid:
+            self._restore(backups)
+            return False, err
+        for callback in self.after_commit:
+            callback()
+        return True, ""
+
+    @staticmethod
+    def _restore(backups):
+        for filepath, backup in backups.items():
+            if backup is not None:
+                _atomic_write(filepath, backup)
+            else:
+                filepath.unlink(missing_ok=True)
+
+
+# Set while cmd_set_many runs so the per-key setters stage instead of write.
+_active_transaction = None
+
+
+def _read_config_text(filepath):
+    """Read a config file, seeing edits staged by an active batch. None if missing."""
+    if _active_transaction is not None:
+        return _active_transaction.read(filepath)
+    return _read_file_text(filepath)
+
+
+def _read_file_text(filepath):
+    if _config_cache is not None:
+        return _config_cache.read(filepath)
+    return filepath.read_text() if filepath.exists() else None
+
+
+def _atomic_write(filepath, content):
+    """Replace filepath's content via rename, following symlinked dotfiles."""
+    target = Path(filepath).resolve()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.niri-config.tmp")
+    tmp.write_text(content)
+    if target.exists():
+        shutil.copymode(target, tmp)
+    os.replace(tmp, target)
+    if _config_cache is not None:
+        _config_cache.forget(filepath)
+
+
+def _write_validated(filepath, content, after_commit=()):
+    """Write content to file, then validate. If invalid, restore original and report error.
+
+    Inside a set-many batch the content is only staged; the batch writes
+    and validates all files together. Under `serve` the write happens now
+    and validation is left to the debouncing ValidationScheduler.
+    ``after_commit`` callbacks run only once the content validated.
+    """
+    if _active_transaction is not None:
+        _active_transaction.stage(filepath, content)
+        _active_transaction.after_commit.extend(after_commit)
+        print(json.dumps({"success": True, "file": str(filepath), "staged": True}))
+        return 0
+
+    if _validation_scheduler is not None:
+        _validation_scheduler.submit(filepath, content, after_commit)
+        print(json.dumps({"success": True, "file": str(filepath), "pending": True}))
+        return 0
 
-    valid, err = _validate_config()
+    transaction = ConfigTransaction()
+    transaction.stage(filepath, content)
+    transaction.after_commit.extend(after_commit)
+    valid, err = transaction.commit()
     if not valid:
-        if backup is not None:
-            filepath.write_text(backup)
-        else:
-            filepath.unlink(missing_ok=True)
         print(json.dumps({"success": False, "error": f"Validation failed: {err}"}))
         return 1
 
@@ -1781,54 +1945,33 @@ def _write_validated(filepath, content):
     return 0
 
 
-def _toggle_flag(content, parent_section, flag_name, enable, top_level=False):
-    """Toggle a standalone flag (like `tap`, `natural-scroll`, `numlock`)
-    inside a KDL subsection. Enable=True adds/uncomments, Enable=False
-    removes/comments the flag line."""
-    escaped_flag = re.escape(flag_name)
-
-    bounds = _find_block_bounds(content, parent_section, top_level=top_level)
-    if bounds is None:
+def _edit_block(content, section, edit, top_level=False):
+    """Apply edit(inner_text) to the first bare ``section { ... }`` block."""
+    node = parse_kdl(content).find(section, top_level=top_level)
+    if node is None:
         return content
+    return _edit_inner(content, node, edit)
 
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
 
-    # Check if flag exists (uncommented)
-    has_flag = bool(re.search(rf"^\s*{escaped_flag}\s*$", block_content, re.MULTILINE))
-    # Check if flag exists commented out
-    has_commented = bool(
-        re.search(rf"^\s*//\s*{escaped_flag}\s*$", block_content, re.MULTILINE)
-    )
+def _toggle_child_flag(block_content, flag_name, enable):
+    has_flag = _child_node(block_content, flag_name) is not None
+    if enable and not has_flag:
+        return _set_child_node(block_content, flag_name, "")
+    if not enable and has_flag:
+        return _remove_child_node(block_content, flag_name)
+    return block_content
 
-    if enable and has_flag:
-        return content  # Already enabled
-    elif enable and has_commented:
-        # Uncomment
-        new_block = re.sub(
-            rf"^(\s*)//\s*{escaped_flag}\s*$",
-            rf"\g<1>{flag_name}",
-            block_content,
-            flags=re.MULTILINE,
-            count=1,
-        )
-    elif enable:
-        # Add flag — find good insertion point (before closing brace)
-        new_block = block_content.rstrip() + f"\n        {flag_name}\n    "
-    elif not enable and has_flag:
-        new_block = re.sub(
-            rf"^[ \t]*{escaped_flag}[ \t]*\n",
-            "",
-            block_content,
-            flags=re.MULTILINE,
-            count=1,
-        )
-    elif not enable and has_commented:
-        return content  # Already disabled
-    else:
-        return content  # Flag doesn't exist and we want it off — nothing to do
 
-    return content[:inner_start] + new_block + content[inner_end:]
+def _toggle_flag(content, parent_section, flag_name, enable, top_level=False):
+    """Toggle a standalone flag (like `tap`, `natural-scroll`, `numlock`)
+    among the direct children of a KDL section. Enable=True appends the flag
+    node, Enable=False removes it; commented-out lines are left alone."""
+    return _edit_block(
+        content,
+        parent_section,
+        lambda block: _toggle_child_flag(block, flag_name, enable),
+        top_level=top_level,
+    )
 
 
 def _set_value_in_subsection(content, section, prop, value):
@@ -1837,94 +1980,48 @@ def _set_value_in_subsection(content, section, prop, value):
 
 
 def _remove_key_from_section(content, section, prop, top_level=False):
-    bounds = _find_block_bounds(content, section, top_level=top_level)
-    if not bounds:
-        return content
-
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-    new_block = _remove_key_from_block_content(block_content, prop)
-    return content[:inner_start] + new_block + content[inner_end:]
+    return _edit_block(
+        content, section, lambda block: _remove_child_node(block, prop), top_level=top_level
+    )
 
 
 def _ensure_subsection(content, parent_section, subsection):
-    parent_bounds = _find_block_bounds(content, parent_section, top_level=True)
-    if not parent_bounds:
+    parent = parse_kdl(content).find(parent_section, top_level=True)
+    if parent is None:
         return content
 
-    if _find_block_bounds(content, subsection):
+    if parse_kdl(content).find(subsection) is not None:
         return content
 
-    _, inner_start, inner_end, _ = parent_bounds
-    parent_content = content[inner_start:inner_end]
-    new_parent_content = parent_content.rstrip() + f"\n    {subsection} {{\n    }}\n"
-    return content[:inner_start] + new_parent_content + content[inner_end:]
+    return _edit_inner(
+        content, parent, lambda block: _append_child(block, f"{subsection} {{\n}}")
+    )
 
 
 def _set_value_in_block(content, section, prop, value, top_level=False):
-    bounds = _find_block_bounds(content, section, top_level=top_level)
-    if not bounds:
-        return content
-
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-    new_block = _set_in_block(block_content, prop, value)
-    return content[:inner_start] + new_block + content[inner_end:]
+    return _edit_block(
+        content, section, lambda block: _set_child_node(block, prop, value), top_level=top_level
+    )
 
 
 def _toggle_subsection_enabled(content, section, enable):
     """Toggle the `off` flag inside a subsection block (border, focus-ring, shadow)."""
-    bounds = _find_block_bounds(content, section)
-    if not bounds:
-        return content
-
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-    has_off = bool(re.search(r"^\s*off\s*$", block_content, re.MULTILINE))
-
-    if enable and has_off:
-        new_block = re.sub(
-            r"^[ \t]*off\s*\n", "", block_content, flags=re.MULTILINE, count=1
-        )
-    elif not enable and not has_off:
-        new_block = "\n        off\n" + block_content.lstrip("\n")
-    else:
-        return content  # Already in desired state
-
-    return content[:inner_start] + new_block + content[inner_end:]
-
-
-def _remove_key_from_block_content(block_content, key):
-    return re.sub(
-        rf"\n?\s*{re.escape(key)}\b[^\n]*",
-        "",
-        block_content,
-        count=1,
-    )
+    return _toggle_flag(content, section, "off", not enable)
 
 
 def _set_xkb_value(content, prop, value):
-    kb_bounds = _find_block_bounds(content, "keyboard")
-    if not kb_bounds:
-        return content
+    def edit_xkb(xkb_content):
+        if value:
+            return _set_child_node(xkb_content, prop, f'"{value}"')
+        return _remove_child_node(xkb_content, prop)
 
-    kb_start, kb_inner_start, kb_inner_end, kb_end = kb_bounds
-    kb_content = content[kb_inner_start:kb_inner_end]
-    xkb_bounds = _find_block_bounds(kb_content, "xkb")
-    if not xkb_bounds:
-        return content
+    def edit_keyboard(kb_content):
+        xkb = _child_block(kb_content, "xkb")
+        if xkb is None:
+            return kb_content
+        return _edit_inner(kb_content, xkb, edit_xkb)
 
-    _, xkb_inner_start, xkb_inner_end, _ = xkb_bounds
-    xkb_content = kb_content[xkb_inner_start:xkb_inner_end]
-    if value:
-        new_xkb_content = _set_in_block(xkb_content, prop, f'"{value}"')
-    else:
-        new_xkb_content = _remove_key_from_block_content(xkb_content, prop)
-
-    new_kb_content = (
-        kb_content[:xkb_inner_start] + new_xkb_content + kb_content[xkb_inner_end:]
-    )
-    return content[:kb_inner_start] + new_kb_content + content[kb_inner_end:]
+    return _edit_block(content, "keyboard", edit_keyboard)
 
 
 def _set_shadow_offset(content, value):
@@ -1936,501 +2033,57 @@ def _set_shadow_offset(content, value):
     )
 
 
-# ─── Keybinds ──────────────────────────────────────────────────────────
-#
-# Inlined from parse_niri_keybinds.py to avoid import-path fragility when
-# niri-config.py is called with a full path from the inir launcher.
-
-_KB_ACTION_MAP = {
-    "toggle-overview": "Niri Overview",
-    "quit": "Quit Niri",
-    "toggle-keyboard-shortcuts-inhibit": "Toggle shortcuts inhibit",
-    "power-off-monitors": "Power off monitors",
-    "show-hotkey-overlay": "Niri hotkey overlay",
-    "close-window": "Close window",
-    "maximize-column": "Maximize column",
-    "maximize-window-to-edges": "Maximize to edges",
-    "fullscreen-window": "Fullscreen",
-    "toggle-window-floating": "Toggle floating",
-    "switch-focus-between-floating-and-tiling": "Switch float/tile focus",
-    "center-column": "Center column",
-    "center-visible-columns": "Center visible columns",
-    "expand-column-to-available-width": "Expand to available width",
-    "consume-or-expel-window-left": "Consume/expel left",
-    "consume-or-expel-window-right": "Consume/expel right",
-    "expel-window-from-column": "Expel from column",
-    "consume-window-into-column": "Consume into column",
-    "switch-preset-column-width": "Cycle column width",
-    "switch-preset-window-height": "Cycle window height",
-    "reset-window-height": "Reset window height",
-    "toggle-column-tabbed-display": "Toggle tabbed display",
-    "focus-column-left": "Focus left",
-    "focus-column-right": "Focus right",
-    "focus-window-up": "Focus up",
-    "focus-window-down": "Focus down",
-    "focus-column-first": "Focus first column",
-    "focus-column-last": "Focus last column",
-    "focus-monitor-left": "Focus monitor left",
-    "focus-monitor-right": "Focus monitor right",
-    "focus-monitor-up": "Focus monitor up",
-    "focus-monitor-down": "Focus monitor down",
-    "move-column-left": "Move left",
-    "move-column-right": "Move right",
-    "move-window-up": "Move up",
-    "move-window-down": "Move down",
-    "move-column-to-first": "Move to first",
-    "move-column-to-last": "Move to last",
-    "move-column-to-monitor-left": "Move to monitor left",
-    "move-column-to-monitor-right": "Move to monitor right",
-    "move-column-to-monitor-up": "Move to monitor up",
-    "move-column-to-monitor-down": "Move to monitor down",
-    "focus-workspace-up": "Previous workspace",
-    "focus-workspace-down": "Next workspace",
-    "move-column-to-workspace-up": "Move to prev workspace",
-    "move-column-to-workspace-down": "Move to next workspace",
-    "move-workspace-up": "Move workspace up",
-    "move-workspace-down": "Move workspace down",
-    "screenshot": "Screenshot",
-    "screenshot-screen": "Screenshot screen",
-    "screenshot-window": "Screenshot window",
-}
-
-_KB_IPC_MAP = {
-    ("altSwitcher", "next"): "Next window",
-    ("altSwitcher", "previous"): "Previous window",
-    ("overlay", "toggle"): "iNiR Overlay",
-    ("overview", "toggle"): "iNiR Overview",
-    ("clipboard", "toggle"): "Clipboard",
-    ("lock", "activate"): "Lock screen",
-    ("region", "screenshot"): "Screenshot region",
-    ("region", "ocr"): "OCR region",
-    ("region", "search"): "Reverse image search",
-    ("wallpaperSelector", "toggle"): "Wallpaper selector",
-    ("settings", "open"): "Settings",
-    ("cheatsheet", "toggle"): "Cheatsheet",
-    ("panelFamily", "cycle"): "Cycle panel style",
-    ("session", "toggle"): "Session dialog",
-    ("browser", "open"): "Browser",
-    ("audio", "volumeUp"): "Volume up",
-    ("audio", "volumeDown"): "Volume down",
-    ("audio", "mute"): "Mute audio",
-    ("audio", "micMute"): "Mute microphone",
-    ("brightness", "increment"): "Brightness up",
-    ("brightness", "decrement"): "Brightness down",
-    ("mpris", "playPause"): "Play/Pause",
-    ("mpris", "next"): "Next track",
-    ("mpris", "previous"): "Previous track",
-    ("notifications", "clearAll"): "Clear notifications",
-    ("gamemode", "toggle"): "Toggle game mode",
-    ("launcher", "terminal"): "Terminal",
-    ("launcher", "close-window"): "Close window",
-}
-
-_KB_TERMINALS = [
-    "foot",
-    "kitty",
-    "alacritty",
-    "wezterm",
-    "ghostty",
-    "konsole",
-    "gnome-terminal",
-]
-_KB_FILE_MANAGERS = ["dolphin", "nautilus", "thunar", "nemo", "pcmanfm", "ranger"]
-_KB_BROWSERS = ["firefox", "zen-browser", "chromium", "brave", "vivaldi"]
-
-
-def _kb_parse_inir_action(action: str):
-    """Detect inir IPC calls and return (target, function) or None."""
-    m = re.search(
-        r'spawn\s+"(?:[^"]*/)?inir"\s+"ipc"\s+"call"\s+"([\w-]+)"\s+"([\w-]+)"', action
-    )
-    if m:
-        return m.group(1), m.group(2)
-    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"settings"(?:\s|;|$)', action):
-        return "settings", "open"
-    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"terminal"(?:\s|;|$)', action):
-        return "launcher", "terminal"
-    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"close-window"(?:\s|;|$)', action):
-        return "launcher", "close-window"
-    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"browser"(?:\s|;|$)', action):
-        return "browser", "open"
-    m = re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"([\w-]+)"\s+"([\w-]+)"', action)
-    if m:
-        return m.group(1), m.group(2)
-    return None
-
-
-def _kb_generate_comment(action: str) -> str:
-    """Return a human-readable description for a niri action string."""
-    action = action.strip()
-    if action in _KB_ACTION_MAP:
-        return _KB_ACTION_MAP[action]
-    m = re.match(r"(focus-workspace|move-column-to-workspace)\s+(\d+)", action)
-    if m:
-        verb = "Focus" if "focus" in m.group(1) else "Move to"
-        return f"{verb} workspace {m.group(2)}"
-    m = re.match(r'set-(column-width|window-height)\s+"([+-]\d+%?)"', action)
-    if m:
-        target = "column" if "column" in m.group(1) else "window"
-        val = m.group(2)
-        direction = "Shrink" if val.startswith("-") else "Grow"
-        return f"{direction} {target} {val.lstrip('+-')}"
-    if action.startswith("spawn"):
-        inir = _kb_parse_inir_action(action)
-        if inir:
-            return _KB_IPC_MAP.get(inir, f"{inir[0]} {inir[1]}")
-        m = re.search(r'ipc.*call.*"(\w+)".*"(\w+)"', action)
-        if m:
-            return _KB_IPC_MAP.get(
-                (m.group(1), m.group(2)), f"{m.group(1)} {m.group(2)}"
-            )
-        if "launch-terminal.sh" in action or any(t in action for t in _KB_TERMINALS):
-            return "Terminal"
-        if any(fm in action for fm in _KB_FILE_MANAGERS):
-            return "File manager"
-        if any(br in action for br in _KB_BROWSERS):
-            return "Browser"
-        if "wpctl" in action:
-            return (
-                ("Volume up" if "+" in action else "Volume down")
-                if "set-volume" in action
-                else "Mute toggle"
-            )
-        if "brightnessctl" in action or "light" in action:
-            return (
-                "Brightness up"
-                if ("+" in action or "inc" in action)
-                else "Brightness down"
-            )
-        if "close-window" in action:
-            return "Close window"
-        m = re.search(r'spawn\s+"([^"]+)"', action)
-        if m:
-            app = m.group(1)
-            return app.split("/")[-1] if "/" in app else app
-    return action[:30] + "..." if len(action) > 30 else action
-
-
-def _kb_categorize(description: str, action: str) -> str:
-    """Return the category name for a keybind given its description and action."""
-    desc = description.lower()
-    act = action.lower()
-
-    if any(
-        x in desc
-        for x in [
-            "niri overview",
-            "quit niri",
-            "inhibit",
-            "power off",
-            "hotkey overlay",
-        ]
-    ):
-        return "System"
-    if any(
-        x in desc
-        for x in [
-            "inir ",
-            "clipboard",
-            "lock screen",
-            "wallpaper",
-            "settings",
-            "cheatsheet",
-            "panel style",
-        ]
-    ):
-        return "iNiR Shell"
-    inir = _kb_parse_inir_action(action)
-    if inir:
-        target, _fn = inir
-        if target in (
-            "overlay",
-            "overview",
-            "clipboard",
-            "lock",
-            "wallpaperSelector",
-            "settings",
-            "cheatsheet",
-            "panelFamily",
-            "session",
-        ):
-            return "iNiR Shell"
-        if target == "altSwitcher":
-            return "Window Switcher"
-        if target in ("audio", "mpris"):
-            return "Media"
-        if target == "brightness":
-            return "Brightness"
-    if re.search(
-        r"ipc.*call.*(overlay|overview|clipboard|lock|wallpaper|settings|cheatsheet|panelfamily)",
-        act,
-    ):
-        return "iNiR Shell"
-    if "window" in desc and ("next" in desc or "previous" in desc):
-        return "Window Switcher"
-    if "altswitcher" in act:
-        return "Window Switcher"
-    if any(x in desc for x in ["screenshot", "ocr", "image search"]):
-        return "Screenshots"
-    if any(x in desc for x in ["terminal", "file manager", "browser"]):
-        return "Applications"
-    if any(x in act for x in _KB_TERMINALS + _KB_FILE_MANAGERS + _KB_BROWSERS):
-        return "Applications"
-    if any(
-        x in desc
-        for x in [
-            "close",
-            "maximize",
-            "fullscreen",
-            "floating",
-            "consume",
-            "expel",
-            "float/tile",
-        ]
-    ):
-        return "Window Management"
-    if "close-window" in act:
-        return "Window Management"
-    if any(
-        x in desc
-        for x in [
-            "cycle column",
-            "cycle window",
-            "reset window",
-            "center column",
-            "center visible",
-            "expand to available",
-            "tabbed",
-        ]
-    ):
-        return "Layout"
-    if any(
-        x in act
-        for x in [
-            "switch-preset-column",
-            "switch-preset-window",
-            "reset-window-height",
-            "center-column",
-            "center-visible",
-            "expand-column",
-            "toggle-column-tabbed",
-        ]
-    ):
-        return "Layout"
-    if any(
-        x in desc
-        for x in ["shrink column", "grow column", "shrink window", "grow window"]
-    ):
-        return "Resize"
-    if any(x in act for x in ["set-column-width", "set-window-height"]):
-        return "Resize"
-    if "monitor" in desc:
-        return "Monitors"
-    if any(
-        x in act
-        for x in [
-            "focus-monitor",
-            "move-column-to-monitor",
-            "move-window-to-monitor",
-            "move-workspace-to-monitor",
-        ]
-    ):
-        return "Monitors"
-    if "focus" in desc and "workspace" not in desc:
-        return "Focus"
-    if "move" in desc and "workspace" not in desc and "track" not in desc:
-        return "Move Windows"
-    if "workspace" in desc:
-        return "Workspaces"
-    if any(
-        x in desc
-        for x in ["volume", "mute", "play", "pause", "track", "audio", "microphone"]
-    ):
-        return "Media"
-    if "mpris" in act or "audio" in act:
-        return "Media"
-    if "brightness" in desc:
-        return "Brightness"
-    return "Other"
-
-
-def _kb_find_in_block(block_lines: list, key_combo: str, check_commented: bool = False):
-    """Locate a keybind in block_lines.
-
-    Returns (start_idx, end_idx_exclusive) covering all lines of the bind
-    (including any multi-line body), or None if not found.
-    """
-    escaped = re.escape(key_combo)
-    for i, raw_line in enumerate(block_lines):
-        stripped = raw_line.strip()
-        if check_commented:
-            if not stripped.startswith("//"):
-                continue
-            candidate = stripped[2:].lstrip()
-        else:
-            if stripped.startswith("//"):
-                continue
-            candidate = stripped
-
-        if not re.match(rf"^{escaped}(?:\s|$|\{{)", candidate):
-            continue
-
-        # Single-line: { action; } on the same line
-        if re.search(r"\{[^}]*\}", candidate):
-            return (i, i + 1)
-        # Multi-line block: opening { without matching } on same line
-        if "{" in candidate:
-            depth = candidate.count("{") - candidate.count("}")
-            j = i + 1
-            while j < len(block_lines) and depth > 0:
-                inner = block_lines[j].strip()
-                depth += inner.count("{") - inner.count("}")
-                j += 1
-            return (i, j)
-        # Line with no brace at all — treat as single line
-        return (i, i + 1)
-
-    return None
-
-
 # ─── Keybind commands ──────────────────────────────────────────────────
 
 
 def cmd_get_binds():
     """Return structured JSON of all keybinds from 70-binds.kdl.
 
-    Output: { binds: [...], categories: [...], config_file: "..." }
-    Each bind entry includes key_combo, options, action, action_raw,
-    category, description, line_number (1-based, in the file), commented.
+    Output: { binds: [...], categories: [...], conflicts: [...], config_file: "..." }
+    Each bind entry includes key_combo, normalized, options, action,
+    action_raw, category, description, line_number and end_line (1-based,
+    in the file), commented. conflicts lists normalized key combos bound
+    more than once, with indices into binds.
     """
     binds_file = resolve_niri_section_file("config.d/70-binds.kdl")
     if not binds_file.exists():
         print(json.dumps({"error": f"Binds file not found: {binds_file}"}))
         return 1
 
-    content = binds_file.read_text()
-    bounds = _find_block_bounds(content, "binds", top_level=True)
-    if not bounds:
+    index = load_keybind_index(get_niri_config_path())
+    path = os.path.normpath(str(binds_file))
+    if path in index.files:
+        binds = [bind for bind in index.binds if bind["file"] == path]
+    else:
+        # Not reachable from config.kdl's includes; parse it on its own.
+        binds = file_binds(_read_config_text(binds_file) or "", path)
+
+    if not binds and not _find_block_bounds(
+        _read_config_text(binds_file) or "", "binds", top_level=True
+    ):
         print(json.dumps({"error": "No binds { } block found in file"}))
         return 1
 
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-
-    # Line number of the first character inside the block (1-based in the full file)
-    base_line = content[:inner_start].count("\n") + 1
-
-    all_binds = []
-    block_lines = block_content.split("\n")
-    i = 0
-    while i < len(block_lines):
-        raw_line = block_lines[i]
-        stripped = raw_line.strip()
-
-        # Determine whether this is a commented-out bind
-        commented = False
-        candidate = stripped
-        if stripped.startswith("//"):
-            inner = stripped[2:].lstrip()
-            # Only promote to "commented bind" if it matches the keybind pattern
-            if re.match(r"^[A-Za-z0-9_][A-Za-z0-9+_]*\s*(?:[^{]*?)\{", inner):
-                commented = True
-                candidate = inner
-
-        if not candidate or (stripped.startswith("//") and not commented):
-            i += 1
-            continue
-
-        match = re.match(r"^([A-Za-z0-9_][A-Za-z0-9+_]*)\s*(.*?)(\{.*)$", candidate)
-        if not match:
-            i += 1
-            continue
-
-        key_combo = match.group(1)
-        # Strip hotkey-overlay-title from the options string — it's KDL metadata, not a bind option
-        options_raw = match.group(2).strip()
-        options_clean = re.sub(
-            r'\s*hotkey-overlay-title="[^"]*"', "", options_raw
-        ).strip()
-        rest = match.group(3)
-
-        line_number = base_line + i
-
-        action_raw = ""
-        action = ""
-        if re.search(r"\{[^}]*\}", rest):
-            # Single-line: extract the content between { and }
-            m = re.search(r"\{\s*(.*?)\s*\}", rest)
-            if m:
-                action_raw = m.group(1).strip()
-                action = action_raw.rstrip(";")
-        elif "{" in rest:
-            # Multi-line: collect lines until the closing }
-            action_lines = []
-            i += 1
-            while i < len(block_lines):
-                inner_line = block_lines[i].strip()
-                if inner_line == "}":
-                    break
-                if inner_line and not inner_line.startswith("//"):
-                    action_lines.append(inner_line)
-                i += 1
-            action_raw = " ".join(action_lines)
-            action = " ".join(ln.rstrip(";") for ln in action_lines)
-
-        description = _kb_generate_comment(action)
-        category = _kb_categorize(description, action)
-
-        all_binds.append(
-            {
-                "key_combo": key_combo,
-                "options": options_clean,
-                "action": action,
-                "action_raw": action_raw,
-                "category": category,
-                "description": description,
-                "line_number": line_number,
-                "commented": commented,
-            }
-        )
-        i += 1
-
-    _KB_CATEGORY_ORDER = [
-        "System",
-        "iNiR Shell",
-        "Window Switcher",
-        "Screenshots",
-        "Applications",
-        "Window Management",
-        "Layout",
-        "Resize",
-        "Focus",
-        "Move Windows",
-        "Monitors",
-        "Workspaces",
-        "Media",
-        "Brightness",
-        "Other",
-    ]
-    cat_map: dict = {}
-    for idx, bind in enumerate(all_binds):
-        cat_map.setdefault(bind["category"], []).append(idx)
-
-    categories = []
-    seen: set = set()
-    for cat in _KB_CATEGORY_ORDER:
-        if cat in cat_map:
-            categories.append({"name": cat, "binds": cat_map[cat]})
-            seen.add(cat)
-    for cat, indices in cat_map.items():
-        if cat not in seen:
-            categories.append({"name": cat, "binds": indices})
+    fields = (
+        "key_combo",
+        "normalized",
+        "options",
+        "action",
+        "action_raw",
+        "category",
+        "description",
+        "line_number",
+        "end_line",
+        "commented",
+    )
+    all_binds = [{field: bind[field] for field in fields} for bind in binds]
 
     print(
         json.dumps(
             {
                 "binds": all_binds,
-                "categories": categories,
+                "categories": group_binds_by_category(all_binds),
+                "conflicts": index.conflicts(binds),
                 "config_file": str(binds_file),
             }
         )
@@ -2438,6 +2091,14 @@ def cmd_get_binds():
     return 0
 
 
+def _bind_line_span(bind):
+    """(start, end) indices of a bind entry within its block's lines."""
+    return (
+        bind["line_number"] - bind["block_line"],
+        bind["end_line"] - bind["block_line"],
+    )
+
+
 def cmd_set_bind(args):
     """Add or update a keybind in 70-binds.kdl (surgical edit).
 
@@ -2469,27 +2130,26 @@ def cmd_set_bind(args):
 
     binds_file = resolve_niri_section_file("config.d/70-binds.kdl")
     binds_file.parent.mkdir(parents=True, exist_ok=True)
-    if not binds_file.exists():
+    content = _read_config_text(binds_file)
+    if content is None:
         print(json.dumps({"error": f"Binds file not found: {binds_file}"}))
         return 1
-
-    content = binds_file.read_text()
     bounds = _find_block_bounds(content, "binds", top_level=True)
     if not bounds:
         print(json.dumps({"error": "No binds { } block found in file"}))
         return 1
 
     _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-    block_lines = block_content.split("\n")
 
     # Prefer active bind match; fall back to commented
-    span = _kb_find_in_block(block_lines, key_combo, check_commented=False)
-    if span is None:
-        span = _kb_find_in_block(block_lines, key_combo, check_commented=True)
-
-    if span is not None:
-        start_idx, end_idx = span
+    index = KeybindIndex(file_binds(content, binds_file))
+    bind = index.lookup(key_combo) or index.lookup(key_combo, commented=True)
+    if bind is not None:
+        inner_start, inner_end = bind["block_start"], bind["block_end"]
+    block_lines = content[inner_start:inner_end].split("\n")
+
+    if bind is not None:
+        start_idx, end_idx = _bind_line_span(bind)
         # Preserve the indentation of the original first line
         original_indent = re.match(r"^([ \t]*)", block_lines[start_idx]).group(1)
         if options:
@@ -2532,26 +2192,23 @@ def cmd_remove_bind(args):
     key_combo = args[0]
 
     binds_file = resolve_niri_section_file("config.d/70-binds.kdl")
-    if not binds_file.exists():
+    content = _read_config_text(binds_file)
+    if content is None:
         print(json.dumps({"error": f"Binds file not found: {binds_file}"}))
         return 1
-
-    content = binds_file.read_text()
     bounds = _find_block_bounds(content, "binds", top_level=True)
     if not bounds:
         print(json.dumps({"error": "No binds { } block found in file"}))
         return 1
 
-    _, inner_start, inner_end, _ = bounds
-    block_content = content[inner_start:inner_end]
-    block_lines = block_content.split("\n")
-
-    span = _kb_find_in_block(block_lines, key_combo, check_commented=False)
-    if span is None:
+    bind = KeybindIndex(file_binds(content, binds_file)).lookup(key_combo)
+    if bind is None:
         print(json.dumps({"error": f"Active bind not found: {key_combo}"}))
         return 1
 
-    start_idx, end_idx = span
+    inner_start, inner_end = bind["block_start"], bind["block_end"]
+    block_lines = content[inner_start:inner_end].split("\n")
+    start_idx, end_idx = _bind_line_span(bind)
 
     # Comment out every line in the bind span
     commented_lines = []
@@ -2602,24 +2259,488 @@ def cmd_remove_bind(args):
     return _write_validated(binds_file, new_content)
 
 
-# ─── Main ─────────────────────────────────────────────────────────────
+# ─── Server ───────────────────────────────────────────────────────────
+#
+# `serve` keeps one interpreter alive for the settings UI. Config texts
+# (and, through parse_kdl, their parsed documents) stay cached until
+# inotify reports a change in the niri config directories. Requests are
+# newline-delimited JSON-RPC 2.0 whose method is any command above and
+# whose params are its CLI arguments; the result is the JSON the command
+# would have printed.
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_INOTIFY_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class ConfigFileCache:
+    """Cache of config file texts, invalidated by inotify.
+
+    Without inotify (or for symlinked files, whose targets live outside
+    the watched directories) entries are revalidated with a stat() on
+    every read instead, which is still far cheaper than re-reading and
+    re-parsing.
+    """
 
+    def __init__(self):
+        self._entries = {}
+        self._watches = {}
+        self._libc = None
+        self.fd = None
+
+    def read(self, filepath):
+        filepath = Path(filepath)
+        entry = self._entries.get(filepath)
+        if entry is not None:
+            text, signature, needs_stat = entry
+            if not needs_stat or _file_signature(filepath) == signature:
+                return text
+
+        signature = _file_signature(filepath)
+        text = filepath.read_text() if signature is not None else None
+        needs_stat = self.fd is None or filepath.is_symlink()
+        self._entries[filepath] = (text, signature, needs_stat)
+        return text
+
+    def forget(self, filepath):
+        self._entries.pop(Path(filepath), None)
+
+    def clear(self):
+        self._entries.clear()
+        parse_kdl.cache_clear()
+
+    def watch(self, directories):
+        """Start inotify watches on directories. Returns the fd, or None."""
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+
+        self._libc = libc
+        self.fd = fd
+        for directory in directories:
+            self._add_watch(directory)
+        # Entries cached before the watch started still need stat checks.
+        self._entries.clear()
+        return fd
+
+    def _add_watch(self, directory):
+        directory = Path(directory)
+        if not directory.is_dir():
+            return
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(str(directory)), _INOTIFY_MASK
+        )
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def handle_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            name = name.decode(errors="replace")
+            offset += length
+
+            directory = self._watches.get(wd)
+            if mask & _IN_Q_OVERFLOW or directory is None:
+                self.clear()
+                continue
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                self._watches.pop(wd, None)
+                self.clear()
+                continue
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # config.d created after the server started
+                    self._add_watch(directory / name)
+                self.clear()
+                continue
+            self.forget(directory / name)
 
-def main():
-    if len(sys.argv) < 2:
-        print(
-            json.dumps(
-                {
-                    "error": "No command. Use: outputs, apply-output, persist-output, get-input, get-layout, get-animations, get-window-rules, list-cursor-themes, validate, detect-customizations, set, get-binds, set-bind, remove-bind"
-                }
-            )
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+# Set by cmd_serve; makes _read_file_text go through the cache.
+_config_cache = None
+
+
+class ValidationScheduler:
+    """Debounces `niri validate` for rapid edits made through `serve`.
+
+    Each write lands on disk immediately, but validation waits until a
+    file has been quiet for ``window`` seconds, so dragging a slider
+    validates only the final value. The content from before the first
+    write of a burst is kept, so if the final state is invalid every
+    superseded write of that burst is rolled back together. Each request
+    is answered once the files it touched have been validated.
+    Because validation covers the whole config, files still inside their
+    window are settled with the first one that comes due.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._pending = {}
+        self._touched = []
+
+    def submit(self, filepath, content, after_commit=()):
+        filepath = Path(filepath)
+        entry = self._pending.get(filepath)
+        if entry is None:
+            backup = filepath.read_text() if filepath.exists() else None
+            entry = self._pending[filepath] = {
+                "backup": backup,
+                "tickets": [],
+                "after_commit": [],
+            }
+        _atomic_write(filepath, content)
+        entry["after_commit"].extend(after_commit)
+        entry["deadline"] = time.monotonic() + self.window
+        self._touched.append(filepath)
+
+    def claim(self, conn, request_id, result):
+        """Defer the response of the request that just ran, if it wrote.
+
+        Returns True when the response will be produced by flush().
+        """
+        touched, self._touched = set(self._touched), []
+        if not touched:
+            return False
+        ticket = {"conn": conn, "id": request_id, "result": result}
+        ticket["files"] = touched
+        ticket["error"] = None
+        for filepath in touched:
+            self._pending[filepath]["tickets"].append(ticket)
+        return True
+
+    def release(self):
+        """Forget writes of the last request without deferring its response."""
+        self._touched = []
+
+    def timeout(self):
+        if not self._pending:
+            return None
+        deadline = min(entry["deadline"] for entry in self._pending.values())
+        return max(0.0, deadline - time.monotonic())
+
+    def flush(self, force=False):
+        """Validate once any file's window has passed. Returns (conn, response) pairs.
+
+        `niri validate` checks the whole config, so its verdict cannot be
+        pinned on one file: every pending file is settled together, and
+        rolled back together if the config is invalid.
+        """
+        now = time.monotonic()
+        if not force and all(
+            entry["deadline"] > now for entry in self._pending.values()
+        ):
+            return []
+        due = list(self._pending)
+        if not due:
+            return []
+
+        valid, err = _validate_config()
+        responses = []
+        for filepath in due:
+            entry = self._pending.pop(filepath)
+            if not valid:
+                if entry["backup"] is not None:
+                    _atomic_write(filepath, entry["backup"])
+                else:
+                    filepath.unlink(missing_ok=True)
+            else:
+                for callback in entry["after_commit"]:
+                    callback()
+            for ticket in entry["tickets"]:
+                ticket["files"].discard(filepath)
+                if not valid:
+                    ticket["error"] = f"Validation failed: {err}"
+                if ticket["files"]:
+                    continue
+                if ticket["error"]:
+                    response = _rpc_error(
+                        ticket["id"],
+                        1,
+                        ticket["error"],
+                        {"success": False, "error": ticket["error"]},
+                    )
+                else:
+                    result = dict(ticket["result"] or {})
+                    result.pop("pending", None)
+                    response = {"jsonrpc": "2.0", "id": ticket["id"], "result": result}
+                responses.append((ticket["conn"], response))
+        return responses
+
+
+# Set by cmd_serve; makes _write_validated defer validation.
+_validation_scheduler = None
+
+
+def _file_signature(filepath):
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/inir-{os.getuid()}"
+    return Path(runtime_dir) / "inir" / "niri-config.sock"
+
+
+def _rpc_error(request_id, code, message, data=None):
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def _handle_rpc(line, conn=None):
+    """Run one JSON-RPC request line and return the response object.
+
+    Returns None when the response is deferred to the ValidationScheduler.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return _rpc_error(None, -32700, f"Parse error: {e}")
+    if not isinstance(request, dict):
+        return _rpc_error(None, -32600, "Invalid request")
+
+    request_id = request.get("id")
+    method = request.get("method")
+    params = request.get("params") or []
+    if not isinstance(params, list):
+        return _rpc_error(request_id, -32602, "params must be a list of arguments")
+    if method == "serve" or method not in _command_table([]):
+        return _rpc_error(request_id, -32601, f"Unknown method: {method}")
+
+    args = [p if isinstance(p, str) else json.dumps(p) for p in params]
+    if method == "set-many" and args[:1] == ["-"]:
+        # stdin belongs to the server, not to this request
+        return _rpc_error(
+            request_id, -32602, "set-many - is not supported over RPC; pass the JSON"
         )
-        return 1
+    captured = io.StringIO()
+    try:
+        with redirect_stdout(captured):
+            rc = run_command(method, args) or 0
+    except Exception as e:
+        if _validation_scheduler is not None:
+            _validation_scheduler.release()
+        return _rpc_error(request_id, -32603, f"{type(e).__name__}: {e}")
+
+    output = captured.getvalue().strip()
+    try:
+        result = json.loads(output.splitlines()[-1]) if output else None
+    except ValueError:
+        result = output
+    if _validation_scheduler is not None:
+        if rc == 0 and _validation_scheduler.claim(conn, request_id, result):
+            return None
+        _validation_scheduler.release()
+    if rc != 0:
+        message = result.get("error") if isinstance(result, dict) else None
+        return _rpc_error(request_id, rc, message or f"{method} failed", result)
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
 
-    cmd = sys.argv[1]
-    args = sys.argv[2:]
+def cmd_serve(args):
+    """Serve commands over a Unix socket with a cached config.
 
-    commands = {
+    Usage: serve [--socket PATH] [--idle-timeout SECONDS]
+                 [--validate-debounce-ms MS]
+
+    With --idle-timeout the server exits once it has had no clients for
+    that long, so callers can start it on demand. Writes are validated
+    once per file after MS milliseconds without further edits (default
+    250; 0 validates every write immediately, like the CLI).
+    """
+    global _config_cache, _validation_scheduler
+
+    socket_path = _default_socket_path()
+    idle_timeout = None
+    debounce_ms = 250.0
+    idx = 0
+    while idx < len(args):
+        if args[idx] == "--socket" and idx + 1 < len(args):
+            socket_path = Path(args[idx + 1])
+            idx += 2
+        elif args[idx] == "--idle-timeout" and idx + 1 < len(args):
+            idle_timeout = float(args[idx + 1])
+            idx += 2
+        elif args[idx] == "--validate-debounce-ms" and idx + 1 < len(args):
+            debounce_ms = float(args[idx + 1])
+            idx += 2
+        else:
+            print(json.dumps({"error": f"Unknown serve argument: {args[idx]}"}))
+            return 1
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if socket_path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink(missing_ok=True)  # stale socket
+        else:
+            print(json.dumps({"error": f"Server already running on {socket_path}"}))
+            return 1
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    os.chmod(socket_path, 0o600)
+    server.listen(8)
+    server.setblocking(False)
+
+    cache = ConfigFileCache()
+    config_dir = get_niri_config_dir()
+    watch_fd = cache.watch([config_dir, config_dir / "config.d"])
+    _config_cache = cache
+    scheduler = ValidationScheduler(debounce_ms / 1000) if debounce_ms > 0 else None
+    _validation_scheduler = scheduler
+
+    def send(conn, response):
+        try:
+            conn.setblocking(True)
+            conn.sendall(json.dumps(response).encode() + b"\n")
+            conn.setblocking(False)
+        except OSError:
+            pass
+
+    def flush_validations(force=False):
+        for conn, response in scheduler.flush(force=force):
+            if conn in buffers:
+                send(conn, response)
+
+    sel = selectors.DefaultSelector()
+    sel.register(server, selectors.EVENT_READ, "accept")
+    if watch_fd is not None:
+        sel.register(watch_fd, selectors.EVENT_READ, "inotify")
+
+    def stop(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(
+        json.dumps(
+            {
+                "listening": str(socket_path),
+                "inotify": watch_fd is not None,
+            }
+        ),
+        flush=True,
+    )
+
+    buffers = {}
+    idle_since = time.monotonic()
+    try:
+        while True:
+            timeout = 1.0 if idle_timeout else None
+            if scheduler is not None and scheduler.timeout() is not None:
+                timeout = min(timeout or 1.0, scheduler.timeout())
+            events = sel.select(timeout=timeout)
+            if scheduler is not None:
+                flush_validations()
+            idle = not buffers and (scheduler is None or scheduler.timeout() is None)
+            if idle_timeout and idle:
+                if time.monotonic() - idle_since >= idle_timeout:
+                    break
+            for key, _mask in events:
+                if key.data == "accept":
+                    conn, _ = server.accept()
+                    conn.setblocking(False)
+                    buffers[conn] = b""
+                    sel.register(conn, selectors.EVENT_READ, "client")
+                    continue
+                if key.data == "inotify":
+                    cache.handle_events()
+                    continue
+
+                conn = key.fileobj
+                try:
+                    chunk = conn.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    sel.unregister(conn)
+                    conn.close()
+                    buffers.pop(conn, None)
+                    idle_since = time.monotonic()
+                    continue
+
+                buffers[conn] += chunk
+                while b"\n" in buffers[conn]:
+                    line, buffers[conn] = buffers[conn].split(b"\n", 1)
+                    if not line.strip():
+                        continue
+                    # Pick up edits made by other tools before answering.
+                    if watch_fd is not None:
+                        cache.handle_events()
+                    response = _handle_rpc(line.decode(errors="replace"), conn)
+                    if response is not None:
+                        send(conn, response)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            # Never leave unvalidated edits behind on shutdown.
+            flush_validations(force=True)
+            _validation_scheduler = None
+        for conn in list(buffers):
+            conn.close()
+        sel.close()
+        server.close()
+        cache.close()
+        _config_cache = None
+        socket_path.unlink(missing_ok=True)
+    return 0
+
+
+# ─── Main ─────────────────────────────────────────────────────────────
+
+
+def _command_table(args):
+    return {
         "outputs": lambda: cmd_outputs(),
         "apply-output": lambda: cmd_apply_output(args),
         "persist-output": lambda: cmd_persist_output(args),
@@ -2631,12 +2752,16 @@ def main():
         "validate": lambda: cmd_validate(),
         "detect-customizations": lambda: cmd_detect_customizations(),
         "set": lambda: cmd_set(args),
+        "set-many": lambda: cmd_set_many(args),
         "get-binds": lambda: cmd_get_binds(),
         "set-bind": lambda: cmd_set_bind(args),
         "remove-bind": lambda: cmd_remove_bind(args),
+        "serve": lambda: cmd_serve(args),
     }
 
-    fn = commands.get(cmd)
+
+def run_command(cmd, args):
+    fn = _command_table(args).get(cmd)
     if not fn:
         print(json.dumps({"error": f"Unknown command: {cmd}"}))
         return 1
@@ -2644,5 +2769,19 @@ def main():
     return fn()
 
 
+def main():
+    if len(sys.argv) < 2:
+        print(
+            json.dumps(
+                {
+                    "error": "No command. Use: outputs, apply-output, persist-output, get-input, get-layout, get-animations, get-window-rules, list-cursor-themes, validate, detect-customizations, set, set-many, get-binds, set-bind, remove-bind, serve"
+                }
+            )
+        )
+        return 1
+
+    return run_command(sys.argv[1], sys.argv[2:])
+
+
 if __name__ == "__main__":
     sys.exit(main() or 0)
@@ -0,0 +1,208 @@
+"""
+niri_kdl.py — Comment-preserving KDL scanner shared by the Niri helper scripts.
+
+Each text is tokenized once into a tree of nodes carrying byte-offset
+spans into the original string; edits are then plain span replacements,
+so formatting and comments outside the touched span are never rewritten.
+"""
+
+from functools import lru_cache
+import re
+
+
+_KDL_TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>[ \t\r\ufeff]+)
+    | (?P<newline>\n)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*)
+    | (?P<slashdash>/-)
+    | (?P<raw_string>r(?P<hashes>\#*)")
+    | (?P<string>"(?:\\.|[^"\\])*"?)
+    | (?P<open>\{)
+    | (?P<close>\})
+    | (?P<semicolon>;)
+    | (?P<continuation>\\[ \t]*(?://[^\n]*)?\n?)
+    | (?P<word>[^\s{};"\\/]+(?:/(?![/*-])[^\s{};"\\/]*)*|/)
+    """,
+    re.VERBOSE,
+)
+
+
+class KdlNode:
+    """One KDL node with offsets into the source text.
+
+    ``start`` is the first character of the node name, ``end`` is one past
+    the last character of the node. For nodes with a children block,
+    ``inner_start``/``inner_end`` delimit the text between the braces;
+    otherwise both are ``None``.
+    """
+
+    __slots__ = (
+        "name",
+        "start",
+        "end",
+        "inner_start",
+        "inner_end",
+        "has_args",
+        "disabled",
+        "depth",
+        "children",
+    )
+
+    def __init__(self, name, start, depth, disabled=False):
+        self.name = name
+        self.start = start
+        self.end = start + len(name)
+        self.inner_start = None
+        self.inner_end = None
+        self.has_args = False
+        self.disabled = disabled
+        self.depth = depth
+        self.children = []
+
+    @property
+    def has_block(self):
+        return self.inner_start is not None and self.inner_end is not None
+
+    def bounds(self):
+        return self.start, self.inner_start, self.inner_end, self.end
+
+
+class KdlDocument:
+    """Parsed view of a KDL text. Never mutates the text itself."""
+
+    def __init__(self, text):
+        self.text = text
+        self.nodes = []
+        # Every enabled node in document (pre-)order, for name lookups.
+        self._ordered = []
+        self._parse()
+
+    def _parse(self):
+        text = self.text
+        length = len(text)
+        # Open children blocks: (node, enclosing siblings, node to resume).
+        stack = []
+        siblings = self.nodes
+        current = None  # node whose arguments are being read
+        slashdash = False
+        pos = 0
+
+        while pos < length:
+            m = _KDL_TOKEN_RE.match(text, pos)
+            if m is None:
+                pos += 1
+                continue
+            kind = m.lastgroup
+            end = m.end()
+
+            if kind in ("ws", "line_comment", "continuation"):
+                pos = end
+                continue
+            if kind == "block_comment":
+                pos = _kdl_skip_block_comment(text, end)
+                continue
+            if kind in ("raw_string", "hashes"):
+                closing = '"' + m.group("hashes")
+                found = text.find(closing, end)
+                end = length if found < 0 else found + len(closing)
+                kind = "string"
+
+            if kind in ("newline", "semicolon"):
+                current = None
+                slashdash = False
+            elif kind == "slashdash":
+                slashdash = True
+            elif kind == "open":
+                if current is None or slashdash:
+                    # Commented-out ("/-") or stray block: track nesting only.
+                    block = KdlNode("", m.start(), len(stack), disabled=True)
+                    block.inner_start = end
+                    stack.append((block, siblings, current))
+                    siblings = block.children
+                else:
+                    current.inner_start = end
+                    stack.append((current, siblings, None))
+                    siblings = current.children
+                current = None
+                slashdash = False
+            elif kind == "close":
+                if stack:
+                    node, siblings, current = stack.pop()
+                    node.inner_end = m.start()
+                    node.end = end
+                    if current is not None:
+                        current.end = end
+                else:
+                    current = None
+                slashdash = False
+            elif current is None:
+                name = m.group(0)
+                if kind == "string":
+                    name = name[1:-1] if name.endswith('"') else name[1:]
+                parent_disabled = bool(stack) and stack[-1][0].disabled
+                current = KdlNode(
+                    name, m.start(), len(stack), disabled=slashdash or parent_disabled
+                )
+                current.end = end
+                slashdash = False
+                if not current.disabled:
+                    siblings.append(current)
+                    self._ordered.append(current)
+            else:
+                if not slashdash:
+                    current.has_args = True
+                current.end = end
+                slashdash = False
+
+            pos = end
+
+    def find(self, name, top_level=False, bare=True):
+        """Return the first node called ``name`` with a children block.
+
+        ``bare`` restricts the match to nodes without arguments
+        (``layout {`` but not ``output "eDP-1" {``), which is what every
+        section lookup in this script wants.
+        """
+        for node in self.find_all(name, top_level=top_level, bare=bare):
+            return node
+        return None
+
+    def find_all(self, name, top_level=False, bare=False):
+        for node in self._ordered:
+            if node.name != name or not node.has_block:
+                continue
+            if top_level and node.depth != 0:
+                continue
+            if bare and node.has_args:
+                continue
+            yield node
+
+    def replace(self, start, end, replacement):
+        """Return the text with ``[start, end)`` swapped for ``replacement``."""
+        return self.text[:start] + replacement + self.text[end:]
+
+
+def _kdl_skip_block_comment(text, pos):
+    """Skip a (possibly nested) /* */ comment whose opener ends at pos."""
+    depth = 1
+    length = len(text)
+    while depth and pos < length:
+        opener = text.find("/*", pos)
+        closer = text.find("*/", pos)
+        if closer < 0:
+            return length
+        if 0 <= opener < closer:
+            depth += 1
+            pos = opener + 2
+        else:
+            depth -= 1
+            pos = closer + 2
+    return pos
+
+
+@lru_cache(maxsize=32)
+def parse_kdl(text):
+    """Parse ``text`` once; repeated lookups on the same text are free."""
+    return KdlDocument(text)
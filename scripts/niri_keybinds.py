@@ -0,0 +1,648 @@
+"""
+niri_keybinds.py — Keybind index shared by parse_niri_keybinds.py (cheatsheet)
+and niri-config.py (get-binds / set-bind / remove-bind).
+
+Binds are parsed once per file into plain dicts with line spans, a
+normalized key combo, a description and a category. The index covering
+config.kdl and everything it includes is cached on disk against the
+mtime/size of every file involved, so later loads skip parsing entirely.
+"""
+
+from functools import lru_cache
+import json
+import os
+import re
+from pathlib import Path
+
+from niri_kdl import parse_kdl
+
+
+INDEX_VERSION = 1
+
+CATEGORY_ORDER = [
+    "System",
+    "iNiR Shell",
+    "Window Switcher",
+    "Screenshots",
+    "Applications",
+    "Window Management",
+    "Layout",
+    "Resize",
+    "Focus",
+    "Move Windows",
+    "Monitors",
+    "Workspaces",
+    "Media",
+    "Brightness",
+    "Other",
+]
+
+
+# ─── Descriptions and categories ──────────────────────────────────────
+
+ACTION_MAP = {
+    "toggle-overview": "Niri Overview",
+    "quit": "Quit Niri",
+    "toggle-keyboard-shortcuts-inhibit": "Toggle shortcuts inhibit",
+    "power-off-monitors": "Power off monitors",
+    "show-hotkey-overlay": "Niri hotkey overlay",
+    "close-window": "Close window",
+    "maximize-column": "Maximize column",
+    "maximize-window-to-edges": "Maximize to edges",
+    "fullscreen-window": "Fullscreen",
+    "toggle-window-floating": "Toggle floating",
+    "switch-focus-between-floating-and-tiling": "Switch float/tile focus",
+    "center-column": "Center column",
+    "center-visible-columns": "Center visible columns",
+    "expand-column-to-available-width": "Expand to available width",
+    "consume-or-expel-window-left": "Consume/expel left",
+    "consume-or-expel-window-right": "Consume/expel right",
+    "expel-window-from-column": "Expel from column",
+    "consume-window-into-column": "Consume into column",
+    "switch-preset-column-width": "Cycle column width",
+    "switch-preset-window-height": "Cycle window height",
+    "reset-window-height": "Reset window height",
+    "toggle-column-tabbed-display": "Toggle tabbed display",
+    "focus-column-left": "Focus left",
+    "focus-column-right": "Focus right",
+    "focus-window-up": "Focus up",
+    "focus-window-down": "Focus down",
+    "focus-column-first": "Focus first column",
+    "focus-column-last": "Focus last column",
+    "focus-monitor-left": "Focus monitor left",
+    "focus-monitor-right": "Focus monitor right",
+    "focus-monitor-up": "Focus monitor up",
+    "focus-monitor-down": "Focus monitor down",
+    "move-column-left": "Move left",
+    "move-column-right": "Move right",
+    "move-window-up": "Move up",
+    "move-window-down": "Move down",
+    "move-column-to-first": "Move to first",
+    "move-column-to-last": "Move to last",
+    "move-column-to-monitor-left": "Move to monitor left",
+    "move-column-to-monitor-right": "Move to monitor right",
+    "move-column-to-monitor-up": "Move to monitor up",
+    "move-column-to-monitor-down": "Move to monitor down",
+    "focus-workspace-up": "Previous workspace",
+    "focus-workspace-down": "Next workspace",
+    "move-column-to-workspace-up": "Move to prev workspace",
+    "move-column-to-workspace-down": "Move to next workspace",
+    "move-workspace-up": "Move workspace up",
+    "move-workspace-down": "Move workspace down",
+    "screenshot": "Screenshot",
+    "screenshot-screen": "Screenshot screen",
+    "screenshot-window": "Screenshot window",
+}
+
+IPC_MAP = {
+    ("altSwitcher", "next"): "Next window",
+    ("altSwitcher", "previous"): "Previous window",
+    ("overlay", "toggle"): "iNiR Overlay",
+    ("overview", "toggle"): "iNiR Overview",
+    ("clipboard", "toggle"): "Clipboard",
+    ("lock", "activate"): "Lock screen",
+    ("region", "screenshot"): "Screenshot region",
+    ("region", "ocr"): "OCR region",
+    ("region", "search"): "Reverse image search",
+    ("wallpaperSelector", "toggle"): "Wallpaper selector",
+    ("settings", "open"): "Settings",
+    ("cheatsheet", "toggle"): "Cheatsheet",
+    ("panelFamily", "cycle"): "Cycle panel style",
+    ("session", "toggle"): "Session dialog",
+    ("browser", "open"): "Browser",
+    ("audio", "volumeUp"): "Volume up",
+    ("audio", "volumeDown"): "Volume down",
+    ("audio", "mute"): "Mute audio",
+    ("audio", "micMute"): "Mute microphone",
+    ("brightness", "increment"): "Brightness up",
+    ("brightness", "decrement"): "Brightness down",
+    ("mpris", "playPause"): "Play/Pause",
+    ("mpris", "next"): "Next track",
+    ("mpris", "previous"): "Previous track",
+    ("notifications", "clearAll"): "Clear notifications",
+    ("gamemode", "toggle"): "Toggle game mode",
+    ("launcher", "terminal"): "Terminal",
+    ("launcher", "close-window"): "Close window",
+}
+
+TERMINALS = [
+    "foot",
+    "kitty",
+    "alacritty",
+    "wezterm",
+    "ghostty",
+    "konsole",
+    "gnome-terminal",
+]
+FILE_MANAGERS = ["dolphin", "nautilus", "thunar", "nemo", "pcmanfm", "ranger"]
+BROWSERS = ["firefox", "zen-browser", "chromium", "brave", "vivaldi"]
+
+
+def parse_inir_action(action: str):
+    """Detect inir IPC calls and return (target, function) or None."""
+    m = re.search(
+        r'spawn\s+"(?:[^"]*/)?inir"\s+"ipc"\s+"call"\s+"([\w-]+)"\s+"([\w-]+)"', action
+    )
+    if m:
+        return m.group(1), m.group(2)
+    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"settings"(?:\s|;|$)', action):
+        return "settings", "open"
+    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"terminal"(?:\s|;|$)', action):
+        return "launcher", "terminal"
+    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"close-window"(?:\s|;|$)', action):
+        return "launcher", "close-window"
+    if re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"browser"(?:\s|;|$)', action):
+        return "browser", "open"
+    m = re.search(r'spawn\s+"(?:[^"]*/)?inir"\s+"([\w-]+)"\s+"([\w-]+)"', action)
+    if m:
+        return m.group(1), m.group(2)
+    return None
+
+
+def generate_comment(action: str) -> str:
+    """Return a human-readable description for a niri action string."""
+    action = action.strip()
+    if action in ACTION_MAP:
+        return ACTION_MAP[action]
+    m = re.match(r"(focus-workspace|move-column-to-workspace)\s+(\d+)", action)
+    if m:
+        verb = "Focus" if "focus" in m.group(1) else "Move to"
+        return f"{verb} workspace {m.group(2)}"
+    m = re.match(r'set-(column-width|window-height)\s+"([+-]\d+%?)"', action)
+    if m:
+        target = "column" if "column" in m.group(1) else "window"
+        val = m.group(2)
+        direction = "Shrink" if val.startswith("-") else "Grow"
+        return f"{direction} {target} {val.lstrip('+-')}"
+    if action.startswith("spawn"):
+        inir = parse_inir_action(action)
+        if inir:
+            return IPC_MAP.get(inir, f"{inir[0]} {inir[1]}")
+        m = re.search(r'ipc.*call.*"(\w+)".*"(\w+)"', action)
+        if m:
+            return IPC_MAP.get(
+                (m.group(1), m.group(2)), f"{m.group(1)} {m.group(2)}"
+            )
+        if "launch-terminal.sh" in action or any(t in action for t in TERMINALS):
+            return "Terminal"
+        if any(fm in action for fm in FILE_MANAGERS):
+            return "File manager"
+        if any(br in action for br in BROWSERS):
+            return "Browser"
+        if "wpctl" in action:
+            return (
+                ("Volume up" if "+" in action else "Volume down")
+                if "set-volume" in action
+                else "Mute toggle"
+            )
+        if "brightnessctl" in action or "light" in action:
+            return (
+                "Brightness up"
+                if ("+" in action or "inc" in action)
+                else "Brightness down"
+            )
+        if "close-window" in action:
+            return "Close window"
+        m = re.search(r'spawn\s+"([^"]+)"', action)
+        if m:
+            app = m.group(1)
+            return app.split("/")[-1] if "/" in app else app
+    return action[:30] + "..." if len(action) > 30 else action
+
+
+def categorize(description: str, action: str) -> str:
+    """Return the category name for a keybind given its description and action."""
+    desc = description.lower()
+    act = action.lower()
+
+    if any(
+        x in desc
+        for x in [
+            "niri overview",
+            "quit niri",
+            "inhibit",
+            "power off",
+            "hotkey overlay",
+        ]
+    ):
+        return "System"
+    if any(
+        x in desc
+        for x in [
+            "inir ",
+            "clipboard",
+            "lock screen",
+            "wallpaper",
+            "settings",
+            "cheatsheet",
+            "panel style",
+        ]
+    ):
+        return "iNiR Shell"
+    inir = parse_inir_action(action)
+    if inir:
+        target, _fn = inir
+        if target in (
+            "overlay",
+            "overview",
+            "clipboard",
+            "lock",
+            "wallpaperSelector",
+            "settings",
+            "cheatsheet",
+            "panelFamily",
+            "session",
+        ):
+            return "iNiR Shell"
+        if target == "altSwitcher":
+            return "Window Switcher"
+        if target in ("audio", "mpris"):
+            return "Media"
+        if target == "brightness":
+            return "Brightness"
+    if re.search(
+        r"ipc.*call.*(overlay|overview|clipboard|lock|wallpaper|settings|cheatsheet|panelfamily)",
+        act,
+    ):
+        return "iNiR Shell"
+    if "window" in desc and ("next" in desc or "previous" in desc):
+        return "Window Switcher"
+    if "altswitcher" in act:
+        return "Window Switcher"
+    if any(x in desc for x in ["screenshot", "ocr", "image search"]):
+        return "Screenshots"
+    if any(x in desc for x in ["terminal", "file manager", "browser"]):
+        return "Applications"
+    if any(x in act for x in TERMINALS + FILE_MANAGERS + BROWSERS):
+        return "Applications"
+    if any(
+        x in desc
+        for x in [
+            "close",
+            "maximize",
+            "fullscreen",
+            "floating",
+            "consume",
+            "expel",
+            "float/tile",
+        ]
+    ):
+        return "Window Management"
+    if "close-window" in act:
+        return "Window Management"
+    if any(
+        x in desc
+        for x in [
+            "cycle column",
+            "cycle window",
+            "reset window",
+            "center column",
+            "center visible",
+            "expand to available",
+            "tabbed",
+        ]
+    ):
+        return "Layout"
+    if any(
+        x in act
+        for x in [
+            "switch-preset-column",
+            "switch-preset-window",
+            "reset-window-height",
+            "center-column",
+            "center-visible",
+            "expand-column",
+            "toggle-column-tabbed",
+        ]
+    ):
+        return "Layout"
+    if any(
+        x in desc
+        for x in ["shrink column", "grow column", "shrink window", "grow window"]
+    ):
+        return "Resize"
+    if any(x in act for x in ["set-column-width", "set-window-height"]):
+        return "Resize"
+    if "monitor" in desc:
+        return "Monitors"
+    if any(
+        x in act
+        for x in [
+            "focus-monitor",
+            "move-column-to-monitor",
+            "move-window-to-monitor",
+            "move-workspace-to-monitor",
+        ]
+    ):
+        return "Monitors"
+    if "focus" in desc and "workspace" not in desc:
+        return "Focus"
+    if "move" in desc and "workspace" not in desc and "track" not in desc:
+        return "Move Windows"
+    if "workspace" in desc:
+        return "Workspaces"
+    if any(
+        x in desc
+        for x in ["volume", "mute", "play", "pause", "track", "audio", "microphone"]
+    ):
+        return "Media"
+    if "mpris" in act or "audio" in act:
+        return "Media"
+    if "brightness" in desc:
+        return "Brightness"
+    return "Other"
+
+
+# ─── Key combos ───────────────────────────────────────────────────────
+
+_MODIFIER_ALIASES = {
+    "mod": "Mod",
+    "super": "Super",
+    "win": "Super",
+    "ctrl": "Ctrl",
+    "control": "Ctrl",
+    "alt": "Alt",
+    "shift": "Shift",
+    "mod3": "Mod3",
+    "iso_level5_shift": "Mod3",
+    "mod5": "Mod5",
+    "iso_level3_shift": "Mod5",
+}
+_MODIFIER_ORDER = ["Mod", "Super", "Ctrl", "Alt", "Shift", "Mod3", "Mod5"]
+
+
+def normalize_key_combo(key_combo: str) -> str:
+    """Canonical form of a key combo: known modifiers deduplicated and
+    sorted, key name lower-cased. "Shift+Mod+t" and "Mod+Shift+T" match."""
+    parts = key_combo.split("+")
+    mods = set()
+    for part in parts[:-1]:
+        mods.add(_MODIFIER_ALIASES.get(part.lower(), part))
+    ordered = sorted(
+        mods,
+        key=lambda m: (
+            _MODIFIER_ORDER.index(m) if m in _MODIFIER_ORDER else len(_MODIFIER_ORDER),
+            m,
+        ),
+    )
+    return "+".join(ordered + [parts[-1].lower()])
+
+
+# ─── Parsing ──────────────────────────────────────────────────────────
+
+_BIND_RE = re.compile(r"^([A-Za-z0-9_][A-Za-z0-9+_]*)\s*(.*?)(\{.*)$")
+_COMMENTED_BIND_RE = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9+_]*\s*(?:[^{]*?)\{")
+_OVERLAY_TITLE_RE = re.compile(r'\s*hotkey-overlay-title="([^"]*)"')
+_INCLUDE_RE = re.compile(r'^include\s+(?:\S+=\S+\s+)*"([^"]+)"')
+
+
+def _scan_binds_block(content: str, inner_start: int, inner_end: int, path: str):
+    """Yield bind entries for one binds { } block, active and commented."""
+    # Line number of the first character inside the block (1-based in the file)
+    base_line = content.count("\n", 0, inner_start) + 1
+    block_lines = content[inner_start:inner_end].split("\n")
+
+    i = 0
+    while i < len(block_lines):
+        stripped = block_lines[i].strip()
+
+        commented = False
+        candidate = stripped
+        if stripped.startswith("//"):
+            inner = stripped[2:].lstrip()
+            # Only promote to "commented bind" if it matches the keybind pattern
+            if _COMMENTED_BIND_RE.match(inner):
+                commented = True
+                candidate = inner
+
+        if not candidate or (stripped.startswith("//") and not commented):
+            i += 1
+            continue
+
+        match = _BIND_RE.match(candidate)
+        if not match:
+            i += 1
+            continue
+
+        start = i
+        key_combo = match.group(1)
+        options_raw = match.group(2).strip()
+        title = _OVERLAY_TITLE_RE.search(options_raw)
+        # hotkey-overlay-title is KDL metadata, not a bind option
+        options = _OVERLAY_TITLE_RE.sub("", options_raw).strip()
+        rest = match.group(3)
+
+        action_raw = ""
+        action = ""
+        if re.search(r"\{[^}]*\}", rest):
+            m = re.search(r"\{\s*(.*?)\s*\}", rest)
+            if m:
+                action_raw = m.group(1).strip()
+                action = action_raw.rstrip(";")
+        else:
+            # Multi-line: collect lines until the closing }
+            action_lines = []
+            i += 1
+            while i < len(block_lines):
+                inner_line = block_lines[i].strip()
+                if commented:
+                    if not inner_line.startswith("//"):
+                        i -= 1
+                        break
+                    inner_line = inner_line[2:].strip()
+                if inner_line == "}":
+                    break
+                if inner_line and not inner_line.startswith("//"):
+                    action_lines.append(inner_line)
+                i += 1
+            action_raw = " ".join(action_lines)
+            action = " ".join(ln.rstrip(";") for ln in action_lines)
+
+        description = generate_comment(action)
+        yield {
+            "key_combo": key_combo,
+            "normalized": normalize_key_combo(key_combo),
+            "options": options,
+            "overlay_title": title.group(1) if title else "",
+            "action": action,
+            "action_raw": action_raw,
+            "category": categorize(description, action),
+            "description": description,
+            "commented": commented,
+            "file": path,
+            "line_number": base_line + start,
+            "end_line": base_line + min(i, len(block_lines) - 1) + 1,
+            "block_line": base_line,
+            "block_start": inner_start,
+            "block_end": inner_end,
+        }
+        i += 1
+
+
+@lru_cache(maxsize=16)
+def scan_file(content: str, path: str):
+    """Parse one file into its binds and includes, in document order.
+
+    Returns a tuple of bind dicts and include paths (str, as written).
+    """
+    items = []
+    doc = parse_kdl(content)
+    for node in doc.nodes:
+        if node.name == "binds" and node.has_block:
+            items.extend(
+                _scan_binds_block(content, node.inner_start, node.inner_end, path)
+            )
+        elif node.name == "include":
+            m = _INCLUDE_RE.match(content[node.start : node.end])
+            if m:
+                items.append(m.group(1))
+    return tuple(items)
+
+
+def file_binds(content: str, path) -> list:
+    """Bind entries of a single file's text (no includes followed)."""
+    return [item for item in scan_file(content, str(path)) if isinstance(item, dict)]
+
+
+# ─── Index ────────────────────────────────────────────────────────────
+
+
+class KeybindIndex:
+    """Binds keyed by normalized key combo, with conflict detection."""
+
+    def __init__(self, binds, files=None, config_path=""):
+        self.binds = list(binds)
+        self.files = dict(files or {})
+        self.config_path = str(config_path)
+        self._by_key = {}
+        for idx, bind in enumerate(self.binds):
+            self._by_key.setdefault(bind["normalized"], []).append(idx)
+
+    def lookup(self, key_combo: str, commented: bool = False, path=None):
+        """First bind for key_combo (active unless commented=True), or None."""
+        for idx in self._by_key.get(normalize_key_combo(key_combo), ()):
+            bind = self.binds[idx]
+            if bind["commented"] != commented:
+                continue
+            if path is not None and bind["file"] != str(path):
+                continue
+            return bind
+        return None
+
+    def effective(self) -> list:
+        """Active binds as niri applies them: a later definition of the same
+        key combo replaces the earlier one."""
+        last = {}
+        for idx, bind in enumerate(self.binds):
+            if not bind["commented"]:
+                last[bind["normalized"]] = idx
+        return [self.binds[idx] for idx in sorted(last.values())]
+
+    def conflicts(self, binds=None) -> list:
+        """Key combos bound more than once among active binds."""
+        binds = self.binds if binds is None else binds
+        seen = {}
+        for idx, bind in enumerate(binds):
+            if not bind["commented"]:
+                seen.setdefault(bind["normalized"], []).append(idx)
+        return [
+            {"key": key, "binds": indices}
+            for key, indices in seen.items()
+            if len(indices) > 1
+        ]
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "config_path": self.config_path,
+            "files": self.files,
+            "binds": self.binds,
+        }
+
+
+def group_by_category(binds: list, category_of=None) -> list:
+    """[{name, binds: [indices]}] in CATEGORY_ORDER, unknown categories last."""
+    category_of = category_of or (lambda bind: bind["category"])
+    cat_map = {}
+    for idx, bind in enumerate(binds):
+        cat_map.setdefault(category_of(bind), []).append(idx)
+
+    categories = []
+    for cat in CATEGORY_ORDER:
+        if cat in cat_map:
+            categories.append({"name": cat, "binds": cat_map.pop(cat)})
+    for cat, indices in cat_map.items():
+        categories.append({"name": cat, "binds": indices})
+    return categories
+
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def default_cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return Path(cache_home) / "inir" / "niri-keybinds.json"
+
+
+def build_index(config_path) -> KeybindIndex:
+    """Parse config_path and every file it includes, in niri's order."""
+    binds = []
+    files = {}
+
+    def visit(path: str):
+        if path in files:
+            return
+        files[path] = _file_signature(path)
+        if files[path] is None:
+            return
+        try:
+            content = Path(path).read_text()
+        except OSError:
+            return
+        for item in scan_file(content, path):
+            if isinstance(item, dict):
+                binds.append(item)
+            else:
+                visit(os.path.normpath(os.path.join(os.path.dirname(path), item)))
+
+    visit(os.path.normpath(str(config_path)))
+    return KeybindIndex(binds, files, config_path)
+
+
+def load_index(config_path, cache_path=None, use_cache=True) -> KeybindIndex:
+    """Return the keybind index, reusing the on-disk cache when no file in
+    the include tree changed since it was written."""
+    cache_path = Path(cache_path) if cache_path else default_cache_path()
+    config_path = os.path.normpath(str(config_path))
+
+    if use_cache:
+        try:
+            cached = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            cached = None
+        if (
+            isinstance(cached, dict)
+            and cached.get("version") == INDEX_VERSION
+            and cached.get("config_path") == config_path
+            and all(
+                _file_signature(path) == signature
+                for path, signature in cached.get("files", {}).items()
+            )
+        ):
+            return KeybindIndex(cached["binds"], cached["files"], config_path)
+
+    index = build_index(config_path)
+    if use_cache:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(f".{cache_path.name}.tmp")
+            tmp.write_text(json.dumps(index.to_json()))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return index
@@ -3,8 +3,20 @@
 
 On first run (empty plugins dir), copies built-in plugins from defaults/plugins/
 so existing users get Discord + YouTube Music out of the box after updating.
+
+Parsed manifests are cached in $XDG_CACHE_HOME/inir/plugin-index.json, keyed
+by the plugin directory and manifest mtimes, so an unchanged plugin costs a
+few stats. Userscripts are not embedded in the output: each one is listed in
+userscriptPaths with its sha256 in userscriptHashes, and WebAppView reads the
+source itself when it opens.
+
+Userscripts of installed defaults follow updates to defaults/plugins/ only
+while they still match the version that was installed; the installed hashes
+are kept in <plugins dir>/.defaults.json, so a script the user edited is
+never overwritten.
 """
 
+import hashlib
 import json
 import os
 import shutil
@@ -32,35 +44,184 @@ plugins_dir = os.path.join(resolve_shell_config_dir(), "plugins")
 script_dir = os.path.dirname(os.path.abspath(__file__))
 defaults_dir = os.path.join(script_dir, "..", "defaults", "plugins")
 
+cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+index_path = os.path.join(cache_home, "inir", "plugin-index.json")
+# Bump when the output for an unchanged plugin can change
+INDEX_VERSION = 1
+# sha256 of each default userscript as last installed, by "<plugin>/scripts/<file>"
+installed_path = os.path.join(plugins_dir, ".defaults.json")
+
+
+def load_index() -> dict:
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != INDEX_VERSION or index.get("pluginsDir") != plugins_dir:
+        return {}
+    return index
+
+
+def save_index(plugins: dict, scripts: dict):
+    payload = {"version": INDEX_VERSION, "pluginsDir": plugins_dir, "plugins": plugins, "scripts": scripts}
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, index_path)
+    except OSError:
+        pass  # The index is only an accelerator
 
-def bootstrap_defaults():
-    """Copy built-in plugins from defaults/ if user has no plugins yet."""
+
+def stat_key(path: str):
+    """[mtime_ns, size] of path, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def file_hash(path: str, cached: dict, seen: dict):
+    """sha256 of path, reusing a known entry while its mtime and size match."""
+    key = stat_key(path)
+    if key is None:
+        return None
+    entry = seen.get(path) or cached.get(path)
+    if entry is not None and entry[:2] == key:
+        seen[path] = entry
+        return entry[2]
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    seen[path] = key + [digest.hexdigest()]
+    return seen[path][2]
+
+
+def load_installed() -> dict:
+    try:
+        with open(installed_path, "r") as f:
+            installed = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return installed if isinstance(installed, dict) else {}
+
+
+def save_installed(installed: dict):
+    try:
+        tmp = f"{installed_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(installed, f, indent=2, sort_keys=True)
+        os.replace(tmp, installed_path)
+    except OSError:
+        pass  # Without the record, existing scripts are just left alone
+
+
+def bootstrap_defaults(install_new: bool, cached: dict, seen: dict):
+    """Copy built-in plugins from defaults/.
+
+    New plugins are only installed when the user has no plugins yet, so a
+    removed default stays removed. A userscript of an installed default is
+    refreshed only while its content is still the default that was last
+    installed; edited or deleted scripts are left as they are.
+    """
     if not os.path.isdir(defaults_dir):
         return
-    os.makedirs(plugins_dir, exist_ok=True)
+    if install_new:
+        os.makedirs(plugins_dir, exist_ok=True)
+    installed = load_installed()
+    recorded = dict(installed)
     for entry in os.listdir(defaults_dir):
         src = os.path.join(defaults_dir, entry)
         dest = os.path.join(plugins_dir, entry)
         if not os.path.isdir(src):
             continue
         if not os.path.isdir(dest):
-            # New plugin — copy entirely
-            shutil.copytree(src, dest)
-            print(f"[Plugins] Installed default plugin: {entry}", file=sys.stderr)
-        else:
-            # Existing plugin — update userscripts only (don't overwrite user manifest/icon)
-            src_scripts = os.path.join(src, "scripts")
-            if os.path.isdir(src_scripts):
-                dest_scripts = os.path.join(dest, "scripts")
-                os.makedirs(dest_scripts, exist_ok=True)
-                for sf in os.listdir(src_scripts):
-                    shutil.copy2(
-                        os.path.join(src_scripts, sf), os.path.join(dest_scripts, sf)
-                    )
-
-
-if not os.path.isdir(plugins_dir) or not os.listdir(plugins_dir):
-    bootstrap_defaults()
+            if install_new:
+                # New plugin — copy entirely
+                shutil.copytree(src, dest)
+                print(f"[Plugins] Installed default plugin: {entry}", file=sys.stderr)
+                src_scripts = os.path.join(src, "scripts")
+                if os.path.isdir(src_scripts):
+                    for sf in os.listdir(src_scripts):
+                        src_hash = file_hash(os.path.join(src_scripts, sf), cached, seen)
+                        if src_hash is not None:
+                            installed[f"{entry}/scripts/{sf}"] = src_hash
+            continue
+        # Existing plugin — update userscripts only (don't overwrite user manifest/icon)
+        src_scripts = os.path.join(src, "scripts")
+        if os.path.isdir(src_scripts):
+            dest_scripts = os.path.join(dest, "scripts")
+            os.makedirs(dest_scripts, exist_ok=True)
+            for sf in os.listdir(src_scripts):
+                src_file = os.path.join(src_scripts, sf)
+                dest_file = os.path.join(dest_scripts, sf)
+                name = f"{entry}/scripts/{sf}"
+                src_hash = file_hash(src_file, cached, seen)
+                if src_hash is None:
+                    continue
+                dest_hash = file_hash(dest_file, cached, seen)
+                if dest_hash == src_hash:
+                    # Already current; from now on it counts as the installed default
+                    installed[name] = src_hash
+                    continue
+                if dest_hash is None:
+                    if name in installed:
+                        continue  # Deleted by the user
+                elif installed.get(name) != dest_hash:
+                    continue  # Edited by the user, or installed before hashes were recorded
+                shutil.copy2(src_file, dest_file)
+                # copy2 keeps the mtime, so record the new content explicitly
+                seen[dest_file] = stat_key(dest_file) + [src_hash]
+                installed[name] = src_hash
+                print(f"[Plugins] Updated userscript: {name}", file=sys.stderr)
+    if installed != recorded and os.path.isdir(plugins_dir):
+        save_installed(installed)
+
+
+def read_manifest(plugin_dir: str):
+    """Normalized manifest of plugin_dir without userscript hashes, or None."""
+    manifest_path = os.path.join(plugin_dir, "manifest.json")
+    try:
+        with open(manifest_path, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(data, dict) or "id" not in data or "url" not in data:
+        return None
+    # Ensure required fields have defaults
+    data.setdefault("name", data["id"])
+    data.setdefault("icon", "language")
+    data.setdefault("display", "tab")
+    data.setdefault("version", "1.0")
+    # Resolve iconPath to an absolute faviconPath
+    icon_path = data.get("iconPath")
+    if icon_path:
+        full_path = os.path.join(plugin_dir, icon_path)
+        if os.path.isfile(full_path):
+            data["faviconPath"] = full_path
+    # Resolve userscripts to absolute paths; missing ones are dropped per scan
+    scripts = data.get("userscripts", [])
+    if scripts:
+        data["userscriptPaths"] = [os.path.join(plugin_dir, s) for s in scripts]
+    return data
+
+
+index = load_index()
+cached_plugins = index.get("plugins", {})
+cached_scripts = index.get("scripts", {})
+seen_plugins = {}
+seen_scripts = {}
+
+# .defaults.json alone does not count as having plugins
+has_plugins = os.path.isdir(plugins_dir) and any(not e.startswith(".") for e in os.listdir(plugins_dir))
+bootstrap_defaults(not has_plugins, cached_scripts, seen_scripts)
 
 if not os.path.isdir(plugins_dir):
     print("[]")
@@ -68,43 +229,29 @@ if not os.path.isdir(plugins_dir):
 
 plugins = []
 for entry in sorted(os.listdir(plugins_dir)):
-    manifest_path = os.path.join(plugins_dir, entry, "manifest.json")
-    if not os.path.isfile(manifest_path):
+    plugin_dir = os.path.join(plugins_dir, entry)
+    manifest_key = stat_key(os.path.join(plugin_dir, "manifest.json"))
+    if manifest_key is None:
         continue
-    try:
-        with open(manifest_path, "r") as f:
-            data = json.load(f)
-        if "id" in data and "url" in data:
-            # Ensure required fields have defaults
-            data.setdefault("name", data["id"])
-            data.setdefault("icon", "language")
-            data.setdefault("display", "tab")
-            data.setdefault("version", "1.0")
-            plugin_dir = os.path.join(plugins_dir, entry)
-            # Resolve iconPath to an absolute faviconPath
-            icon_path = data.get("iconPath")
-            if icon_path:
-                full_path = os.path.join(plugin_dir, icon_path)
-                if os.path.isfile(full_path):
-                    data["faviconPath"] = full_path
-            # Resolve userscripts to absolute paths and read their source code
-            scripts = data.get("userscripts", [])
-            if scripts:
-                resolved = []
-                sources = []
-                for s in scripts:
-                    full = os.path.join(plugin_dir, s)
-                    if os.path.isfile(full):
-                        resolved.append(full)
-                        try:
-                            with open(full, "r") as sf:
-                                sources.append(sf.read())
-                        except OSError:
-                            sources.append("")
-                data["userscriptPaths"] = resolved
-                data["userscriptSources"] = sources
-            plugins.append(data)
-    except (json.JSONDecodeError, OSError):
+    # Adding or removing files (an icon, a script) changes the directory mtime
+    key = [stat_key(plugin_dir), manifest_key]
+    cached = cached_plugins.get(entry)
+    if cached is not None and cached["key"] == key:
+        data = cached["data"]
+    else:
+        data = read_manifest(plugin_dir)
+    seen_plugins[entry] = {"key": key, "data": data}
+    if data is None:
         continue
+    data = dict(data)
+    if "userscriptPaths" in data:
+        # Sources are read lazily by WebAppView; the hash tells it when they change
+        hashed = [(path, file_hash(path, cached_scripts, seen_scripts)) for path in data["userscriptPaths"]]
+        data["userscriptPaths"] = [path for path, digest in hashed if digest]
+        data["userscriptHashes"] = [digest for path, digest in hashed if digest]
+    plugins.append(data)
+
+if seen_plugins != cached_plugins or seen_scripts != cached_scripts:
+    save_index(seen_plugins, seen_scripts)
 
 print(json.dumps(plugins))
@@ -5,20 +5,36 @@ Reads generated colors from iNiR's generated palette and updates
 the ii-pixel theme.conf with matching colors.
 Reads wallpaper path from iNiR state and updates background image.
 
+Every run records fingerprints of what it wrote (palette, wallpaper file,
+greeter resolution, avatar, and the resulting theme files) in the theme
+directory, so a run where nothing changed touches nothing. The background
+is downscaled to cover the greeter resolution instead of copying the
+full-size wallpaper.
+
 Note: install-pixel-sddm.sh transfers ownership of the theme directory to
 the current user at install time, so no sudo/polkit is required here.
 """
 
+import fcntl
+import hashlib
+import io
 import json
 import os
 import shutil
 import subprocess
 import sys
+import tempfile
 
 THEME_NAME = "ii-pixel"
 THEME_DIR = f"/usr/share/sddm/themes/{THEME_NAME}"
 THEME_CONF = os.path.join(THEME_DIR, "theme.conf")
 ASSETS_DIR = os.path.join(THEME_DIR, "assets")
+SYNC_STATE = os.path.join(THEME_DIR, ".inir-sync.json")
+SYNC_LOCK = os.path.join(THEME_DIR, ".inir-sync.lock")
+
+# Greeter size used when niri cannot be asked (e.g. run via sudo) and no
+# earlier run recorded one. INIR_SDDM_RESOLUTION=WxH overrides detection.
+DEFAULT_RESOLUTION = (3840, 2160)
 
 # Canonical template structure — restored when theme.conf is corrupted.
 # Only the structural/metadata lines; color keys are appended by update_theme_conf().
@@ -59,6 +75,14 @@ APP_PALETTE_JSON = os.path.join(STATE_DIR, "user", "generated", "app-palette.jso
 PALETTE_JSON = os.path.join(STATE_DIR, "user", "generated", "palette.json")
 COLORS_JSON = os.path.join(STATE_DIR, "user", "generated", "colors.json")
 
+# First frames of video wallpapers, filled by scripts/thumbnails/video_frames.py
+# (named by the md5 of the video path)
+VIDEO_FRAME_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(_real_home, ".cache"),
+    "quickshell",
+    "video_thumbnails",
+)
+
 CONFIG_JSON = os.path.join(
     os.environ.get("XDG_CONFIG_HOME") or os.path.join(_real_home, ".config"),
     "inir",
@@ -111,50 +135,137 @@ def read_colors():
     }
 
 
-def read_wallpaper():
-    """Read current wallpaper path from iNiR config.json."""
+def read_config():
+    """Parse iNiR config.json once; every setting below is read from the result."""
     if not os.path.isfile(CONFIG_JSON):
-        return None
+        return {}
     try:
         with open(CONFIG_JSON) as f:
             config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except Exception:
+        return {}
 
-        panel_family = config.get("panelFamily", "ii")
-        background = config.get("background", {}) or {}
-        waffles = config.get("waffles", {}) or {}
-        waffles_background = waffles.get("background", {}) or {}
 
-        main_path = background.get("wallpaperPath", "")
-        if panel_family == "waffle":
-            use_main = waffles_background.get("useMainWallpaper", True)
-            waffle_path = waffles_background.get("wallpaperPath", "")
-            path = main_path if use_main else (waffle_path or main_path)
-        else:
-            path = main_path
+def read_wallpaper(config):
+    """Current wallpaper path from the parsed config.json."""
+    panel_family = config.get("panelFamily", "ii")
+    background = config.get("background", {}) or {}
+    waffles = config.get("waffles", {}) or {}
+    waffles_background = waffles.get("background", {}) or {}
 
-        if path and path.startswith("file://"):
-            path = path[7:]
-        return path if path and os.path.isfile(path) else None
-    except Exception:
-        return None
+    main_path = background.get("wallpaperPath", "")
+    if panel_family == "waffle":
+        use_main = waffles_background.get("useMainWallpaper", True)
+        waffle_path = waffles_background.get("wallpaperPath", "")
+        path = main_path if use_main else (waffle_path or main_path)
+    else:
+        path = main_path
+
+    if path and path.startswith("file://"):
+        path = path[7:]
+    return path if path and os.path.isfile(path) else None
 
 
-def read_material_shape_chars():
+def read_material_shape_chars(config):
     """Mirror lockscreen password behavior flag into SDDM theme config."""
-    if not os.path.isfile(CONFIG_JSON):
-        return "false"
+    val = (config.get("lock", {}) or {}).get("materialShapeChars", False)
+    return "true" if bool(val) else "false"
+
+
+def _write_atomic(path, data):
+    """Replace path with data in one rename, world-readable for the sddm user."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".sync-", suffix=".tmp")
     try:
-        with open(CONFIG_JSON) as f:
-            config = json.load(f)
-        val = (config.get("lock", {}) or {}).get("materialShapeChars", False)
-        return "true" if bool(val) else "false"
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _fingerprint(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def _file_id(path):
+    """(mtime_ns, size) of path, or None when missing — detects outside edits."""
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def load_sync_state():
+    try:
+        with open(SYNC_STATE) as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(state):
+    try:
+        _write_atomic(SYNC_STATE, json.dumps(state, indent=2).encode())
+    except OSError as e:
+        print(f"[sddm-pixel] Could not record sync state: {e}")
+
+
+def is_current(state, key, fingerprint, output):
+    """True when the last sync of key used this fingerprint and its output is untouched."""
+    entry = state.get(key) or {}
+    return (
+        entry.get("fingerprint") == fingerprint
+        and entry.get("output") is not None
+        and entry.get("output") == _file_id(output)
+    )
+
+
+def record(state, key, fingerprint, output):
+    state[key] = {"fingerprint": fingerprint, "output": _file_id(output)}
+
+
+def greeter_resolution(state):
+    """Size the greeter background has to cover: the largest connected output."""
+    override = os.environ.get("INIR_SDDM_RESOLUTION", "")
+    if override:
+        try:
+            width, height = (int(v) for v in override.lower().split("x"))
+            return width, height
+        except ValueError:
+            print(f"[sddm-pixel] Ignoring invalid INIR_SDDM_RESOLUTION={override!r}")
+    try:
+        proc = subprocess.run(
+            ["niri", "msg", "-j", "outputs"], capture_output=True, text=True, timeout=2
+        )
+        width = height = 0
+        if proc.returncode == 0:
+            for out in json.loads(proc.stdout).values():
+                modes = out.get("modes") or []
+                idx = out.get("current_mode")
+                if idx is not None and idx < len(modes):
+                    width = max(width, modes[idx]["width"])
+                    height = max(height, modes[idx]["height"])
+        if width and height:
+            return width, height
     except Exception:
-        return "false"
+        pass
+    remembered = state.get("resolution")
+    if remembered and len(remembered) == 2:
+        return tuple(remembered)
+    return DEFAULT_RESOLUTION
 
 
 def update_theme_conf(colors):
     """Update ii-pixel theme.conf [General] section with new colors.
 
+    ``colors`` holds every key to set, materialShapeChars included.
+
     Self-heals corrupted files: if the [General] section or
     ``background=`` key are missing, the canonical template structure
     is restored before applying color values.
@@ -176,7 +287,6 @@ def update_theme_conf(colors):
         lines = THEME_CONF_TEMPLATE.split("\n")
 
     remaining = dict(colors)
-    remaining["materialShapeChars"] = read_material_shape_chars()
     new_lines = []
     for line in lines:
         stripped = line.strip()
@@ -192,10 +302,11 @@ def update_theme_conf(colors):
     for key, value in remaining.items():
         new_lines.append(f"{key}={value}")
     content = "\n".join(new_lines)
+    if content == "\n".join(lines):
+        return True
 
     try:
-        with open(THEME_CONF, "w") as f:
-            f.write(content)
+        _write_atomic(THEME_CONF, content.encode())
         return True
     except PermissionError:
         print(f"[sddm-pixel] Permission denied writing {THEME_CONF}.")
@@ -206,7 +317,7 @@ def update_theme_conf(colors):
         return False
 
 
-def update_avatar():
+def update_avatar(state):
     """Copy user avatar to a world-readable theme asset for SDDM.
 
     This avoids permission issues when reading ~/.face from the sddm user.
@@ -234,9 +345,13 @@ def update_avatar():
         return False
 
     dst = os.path.join(ASSETS_DIR, "user-face.png")
+    fingerprint = _fingerprint([os.path.realpath(src), _file_id(src)])
+    if is_current(state, "avatar", fingerprint, dst):
+        return True
     try:
         shutil.copy2(src, dst)
         os.chmod(dst, 0o644)
+        record(state, "avatar", fingerprint, dst)
         print(f"[sddm-pixel] Avatar updated: {os.path.basename(src)}")
         return True
     except Exception as e:
@@ -247,12 +362,19 @@ def update_avatar():
 VIDEO_EXTENSIONS = {".mp4", ".mkv", ".webm", ".avi", ".mov", ".gif", ".webp"}
 
 
-def extract_video_frame(video_path, dest_png):
+def cached_video_frame(video_path):
+    """First frame the shell already extracted for video_path, if any."""
+    frame = os.path.join(VIDEO_FRAME_DIR, hashlib.md5(video_path.encode()).hexdigest() + ".jpg")
+    return frame if os.path.isfile(frame) and os.path.getsize(frame) > 0 else None
+
+
+def extract_video_frame(video_path):
     """Use ffmpeg to extract the first frame of a video as PNG. Returns tmp path on success, None on failure."""
     if not shutil.which("ffmpeg"):
         print("[sddm-pixel] ffmpeg not found — cannot extract video frame")
         return None
-    tmp = os.path.join("/tmp", "sddm-pixel-frame.tmp.png")
+    fd, tmp = tempfile.mkstemp(prefix="sddm-pixel-frame-", suffix=".png")
+    os.close(fd)
     try:
         proc = subprocess.run(
             [
@@ -272,19 +394,47 @@ def extract_video_frame(video_path, dest_png):
             stderr=subprocess.DEVNULL,
             timeout=15,
         )
-        if proc.returncode == 0 and os.path.isfile(tmp):
+        if proc.returncode == 0 and os.path.getsize(tmp) > 0:
             return tmp
         print(
             f"[sddm-pixel] ffmpeg frame extraction failed for {os.path.basename(video_path)}"
         )
-        return None
     except Exception as e:
         print(f"[sddm-pixel] ffmpeg error: {e}")
-        return None
+    os.unlink(tmp)
+    return None
 
 
-def update_background(wallpaper_path):
-    """Copy current wallpaper (or its first video frame) to theme assets/background.png."""
+def scaled_background(src, resolution):
+    """Image bytes for src scaled down to just cover resolution.
+
+    Sources that are already small enough — or any source when Pillow is not
+    installed — are used as-is, as before (Qt sniffs the format, not the
+    extension). The greeter blurs and crop-fills the image, so nothing is
+    lost by dropping pixels it never shows.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+    if Image is not None:
+        with Image.open(src) as image:
+            width, height = image.size
+            scale = max(resolution[0] / width, resolution[1] / height)
+            if scale < 1:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                # JPEG draft mode lets libjpeg decode straight at (about) the target size
+                image.draft("RGB", size)
+                image = image.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+                buf = io.BytesIO()
+                image.save(buf, "PNG", compress_level=4)
+                return buf.getvalue()
+    with open(src, "rb") as f:
+        return f.read()
+
+
+def update_background(wallpaper_path, resolution, state):
+    """Write current wallpaper (or its first video frame) to theme assets/background.png."""
     if not wallpaper_path:
         return False
     if not os.path.isdir(ASSETS_DIR):
@@ -296,58 +446,92 @@ def update_background(wallpaper_path):
             return False
 
     bg_dest = os.path.join(ASSETS_DIR, "background.png")
+    fingerprint = _fingerprint(
+        [os.path.realpath(wallpaper_path), _file_id(wallpaper_path), list(resolution)]
+    )
+    if is_current(state, "background", fingerprint, bg_dest):
+        print("[sddm-pixel] Background unchanged")
+        return True
+
     ext = os.path.splitext(wallpaper_path)[1].lower()
     src = wallpaper_path
-
+    cached_frame = None
     if ext in VIDEO_EXTENSIONS:
-        tmp_frame = extract_video_frame(wallpaper_path, bg_dest)
-        if tmp_frame is None:
+        cached_frame = cached_video_frame(wallpaper_path)
+        src = cached_frame or extract_video_frame(wallpaper_path)
+        if src is None:
             print("[sddm-pixel] Keeping existing background (video, no ffmpeg)")
             return False
-        src = tmp_frame
 
     try:
-        shutil.copy2(src, bg_dest)
-        if ext in VIDEO_EXTENSIONS and os.path.isfile(src):
-            os.unlink(src)
+        _write_atomic(bg_dest, scaled_background(src, resolution))
+        record(state, "background", fingerprint, bg_dest)
         print(f"[sddm-pixel] Background updated: {os.path.basename(wallpaper_path)}")
         return True
     except PermissionError:
         print(f"[sddm-pixel] Permission denied writing to {ASSETS_DIR}.")
         print(f"[sddm-pixel] Re-run install-pixel-sddm.sh to fix ownership.")
-        if ext in VIDEO_EXTENSIONS and os.path.isfile(src):
-            os.unlink(src)
         return False
     except Exception as e:
         print(f"[sddm-pixel] Error updating background: {e}")
-        if ext in VIDEO_EXTENSIONS and os.path.isfile(src):
-            os.unlink(src)
         return False
+    finally:
+        if src not in (wallpaper_path, cached_frame) and os.path.isfile(src):
+            os.unlink(src)
 
 
-def main():
-    if not os.path.isdir(THEME_DIR):
-        print(
-            f"[sddm-pixel] Theme not installed at {THEME_DIR}. Run install-pixel-sddm.sh first."
-        )
-        return
+def sync(state):
+    config = read_config()
 
     colors = read_colors()
     if colors:
-        if update_theme_conf(colors):
+        colors["materialShapeChars"] = read_material_shape_chars(config)
+        fingerprint = _fingerprint(colors)
+        if is_current(state, "theme", fingerprint, THEME_CONF):
+            print("[sddm-pixel] Colors unchanged")
+        elif update_theme_conf(colors):
+            record(state, "theme", fingerprint, THEME_CONF)
             print(f"[sddm-pixel] Colors synced (primary: {colors['primaryColor']})")
         else:
             print("[sddm-pixel] Color sync failed")
     else:
         print("[sddm-pixel] No colors available, skipping color sync")
 
-    wallpaper = read_wallpaper()
+    wallpaper = read_wallpaper(config)
     if wallpaper:
-        update_background(wallpaper)
+        resolution = greeter_resolution(state)
+        state["resolution"] = list(resolution)
+        update_background(wallpaper, resolution, state)
     else:
         print("[sddm-pixel] No wallpaper path found, keeping existing background")
 
-    update_avatar()
+    update_avatar(state)
+
+
+def main():
+    if not os.path.isdir(THEME_DIR):
+        print(
+            f"[sddm-pixel] Theme not installed at {THEME_DIR}. Run install-pixel-sddm.sh first."
+        )
+        return
+
+    # Overlapping runs (the theming module and the render post-hook) queue up
+    # here; the later one then finds everything current and writes nothing.
+    try:
+        lock = open(SYNC_LOCK, "a")
+    except OSError:
+        lock = None
+    try:
+        if lock is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        state = load_sync_state()
+        before = json.dumps(state, sort_keys=True)
+        sync(state)
+        if json.dumps(state, sort_keys=True) != before:
+            save_sync_state(state)
+    finally:
+        if lock is not None:
+            lock.close()
 
 
 if __name__ == "__main__":
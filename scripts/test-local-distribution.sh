@@ -65,6 +65,12 @@ if command -v python3 &>/dev/null && [[ -f "$runtime_root/scripts/lib/generate-i
     python3 "$runtime_root/scripts/lib/generate-ipc-registry.py" --check
 fi
 
+if command -v python3 &>/dev/null && [[ -f "$runtime_root/translations/tools/translation-manager.py" ]]; then
+    step "translation catalog freshness"
+    python3 "$runtime_root/translations/tools/translation-manager.py" \
+        --translations-dir "$runtime_root/translations" --compile --check >/dev/null
+fi
+
 if [[ "$run_runtime" == true ]]; then
     step "runtime restart"
     bash scripts/inir kill >/dev/null 2>&1 || true
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Batch first-frame extractor for video wallpapers.
+
+Wallpapers.qml, switchwall.sh and sync-pixel-sddm.py all use the first
+frame of a video wallpaper, cached as
+$XDG_CACHE_HOME/quickshell/video_thumbnails/<md5 of the path>.jpg.
+This tool fills that cache for many videos at once: existing frames are
+found with a single directory listing, missing ones are extracted by
+ffmpeg on a bounded worker pool, and one JSON line per video is printed
+as soon as its result is known:
+
+  {"video": "/path/a.mp4", "frame": "/.../<md5>.jpg", "status": "cached"}
+
+status is "cached", "generated" or "failed". Frames are written under a
+temporary name and renamed into place, so concurrent callers never see a
+partial JPEG.
+
+Usage: video_frames.py [--workers N] [--output-dir DIR] [--stdin] [VIDEO ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+FFMPEG_TIMEOUT = 30
+
+
+def default_output_dir():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "quickshell", "video_thumbnails")
+
+
+def frame_name(video_path):
+    """Cache file name for a video: md5 of the path, as `md5sum` and MD5.hash() produce."""
+    return hashlib.md5(video_path.encode()).hexdigest() + ".jpg"
+
+
+def extract_frame(ffmpeg, video_path, frame_path):
+    """Write the first frame of video_path to frame_path; True on success."""
+    directory, name = os.path.split(frame_path)
+    tmp = os.path.join(directory, f".{name[:-4]}.tmp-{os.getpid()}.jpg")
+    try:
+        proc = subprocess.run(
+            [ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", video_path,
+             "-vframes", "1", "-q:v", "2", tmp],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=FFMPEG_TIMEOUT,
+        )
+        if proc.returncode == 0 and os.path.getsize(tmp) > 0:
+            os.replace(tmp, frame_path)
+            return True
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        os.unlink(tmp)
+    except OSError:
+        pass
+    return False
+
+
+def ensure_frames(videos, output_dir=None, workers=DEFAULT_WORKERS):
+    """Yield (video, frame_path, status) for each video, extracting missing frames.
+
+    Cached frames come first; generated and failed ones follow in completion
+    order.
+    """
+    output_dir = output_dir or default_output_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    present = {
+        entry.name for entry in os.scandir(output_dir)
+        if entry.is_file() and entry.stat().st_size > 0
+    }
+
+    missing = []
+    seen = set()
+    for video in videos:
+        if not video or video in seen:
+            continue
+        seen.add(video)
+        name = frame_name(video)
+        frame = os.path.join(output_dir, name)
+        if name in present:
+            yield video, frame, "cached"
+        else:
+            missing.append((video, frame))
+    if not missing:
+        return
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        for video, frame in missing:
+            yield video, frame, "failed"
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(extract_frame, ffmpeg, video, frame): (video, frame)
+            for video, frame in missing
+            if os.path.isfile(video)
+        }
+        for video, frame in missing:
+            if not os.path.isfile(video):
+                yield video, frame, "failed"
+        for future in as_completed(futures):
+            video, frame = futures[future]
+            yield video, frame, "generated" if future.result() else "failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and cache first frames of video wallpapers")
+    parser.add_argument("videos", nargs="*", help="Video paths")
+    parser.add_argument("--stdin", action="store_true", help="Also read video paths from stdin, one per line")
+    parser.add_argument("--output-dir", help="Frame cache directory (default: ~/.cache/quickshell/video_thumbnails)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel ffmpeg processes")
+    args = parser.parse_args()
+
+    videos = list(args.videos)
+    if args.stdin:
+        videos += [line.rstrip("\n") for line in sys.stdin if line.strip()]
+
+    failed = False
+    for video, frame, status in ensure_frames(videos, args.output_dir, args.workers):
+        failed |= status == "failed"
+        print(json.dumps({"video": video, "frame": frame, "status": status}), flush=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
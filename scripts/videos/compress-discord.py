@@ -5,16 +5,48 @@ import argparse
 import json
 import math
 import os
+import platform
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
 
 PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow")
 
+# Retry budgets come from the previous attempt's actual/target size ratio,
+# aimed this far under the budget and always at least RETRY_MIN_STEP smaller.
+SIZE_MODEL_MARGIN = 0.97
+RETRY_MIN_STEP = 0.95
+RETRY_MAX_STEP = 0.5
+# Budget decay when an attempt failed without producing a size to learn from
+RETRY_FALLBACK_STEP = 0.88
+
+MAX_AUTO_SEGMENTS = 8
+
+# --benchmark: synthetic clips per output size (16:9, by long edge), encoded
+# with every preset at BENCH_BPP bits per pixel; the resulting throughput and
+# PSNR profile lets --preset auto trade quality for a wall-time budget.
+BENCH_LONG_EDGES = (640, 1280, 1920)
+BENCH_SOURCES = {
+    "testsrc": "testsrc2=s={w}x{h}:r=30,noise=alls=12:allf=t",
+    # mandelbrot is slow to render, so draw it small and let the scaler fill in
+    "mandelbrot": "mandelbrot=s={qw}x{qh}:r=30,scale={w}:{h}:flags=bicubic",
+}
+BENCH_BPP = 0.05
+PROFILE_VERSION = 1
+# A slower preset has to beat a faster one by this much PSNR to be picked
+MIN_PSNR_GAIN = 0.02
+# Preset used by --preset auto when no profile matches this machine
+AUTO_FALLBACK_PRESET = "slow"
+# Long-edge steps tried when no preset meets the time budget at full size
+MIN_AUTO_DIMENSION = 480
+
 
 @dataclass(frozen=True)
 class MediaInfo:
@@ -23,6 +55,7 @@ class MediaInfo:
     width: int
     height: int
     has_audio: bool
+    fps: float = 30.0
 
 
 @dataclass(frozen=True)
@@ -32,6 +65,7 @@ class EncodePlan:
     audio_kbps: int
     width: int
     height: int
+    preset: str = "slow"
 
 
 def fail(message: str) -> None:
@@ -61,7 +95,7 @@ def probe_media(ffprobe: str, input_path: Path) -> MediaInfo:
     payload = run_json([
         ffprobe,
         "-v", "error",
-        "-show_entries", "format=duration:stream=codec_type,width,height",
+        "-show_entries", "format=duration:stream=codec_type,width,height,avg_frame_rate",
         "-of", "json",
         str(input_path),
     ])
@@ -69,18 +103,24 @@ def probe_media(ffprobe: str, input_path: Path) -> MediaInfo:
     width = 0
     height = 0
     has_audio = False
+    fps = 30.0
     for stream in payload.get("streams", []):
         codec_type = stream.get("codec_type")
         if codec_type == "video" and width <= 0:
             width = int(stream.get("width") or 0)
             height = int(stream.get("height") or 0)
+            num, _, den = str(stream.get("avg_frame_rate") or "").partition("/")
+            try:
+                fps = float(num) / float(den or 1) or fps
+            except (ValueError, ZeroDivisionError):
+                pass
         elif codec_type == "audio":
             has_audio = True
     if duration <= 0:
         fail("Could not detect video duration")
     if width <= 0 or height <= 0:
         fail("Could not detect video dimensions")
-    return MediaInfo(duration, input_path.stat().st_size, width, height, has_audio)
+    return MediaInfo(duration, input_path.stat().st_size, width, height, has_audio, fps)
 
 
 def even(value: float) -> int:
@@ -106,7 +146,44 @@ def scaled_size(info: MediaInfo, video_kbps: int, requested_max_dimension: int)
     return even(info.width * ratio), even(info.height * ratio)
 
 
-def build_plan(info: MediaInfo, budget_bytes: int, audio_kbps: int, max_dimension: int) -> EncodePlan:
+def profile_estimate(profile: dict, preset: str, long_edge: int, key: str) -> float | None:
+    """Benchmark value for preset, interpolated linearly between measured long edges."""
+    points = sorted(
+        (entry["longEdge"], entry[key]) for entry in profile.get("entries", [])
+        if entry.get("preset") == preset and entry.get(key)
+    )
+    if not points:
+        return None
+    if long_edge <= points[0][0]:
+        return points[0][1]
+    for (edge_a, value_a), (edge_b, value_b) in zip(points, points[1:]):
+        if long_edge <= edge_b:
+            return value_a + (value_b - value_a) * (long_edge - edge_a) / (edge_b - edge_a)
+    return points[-1][1]
+
+
+def tune_preset(info: MediaInfo, width: int, height: int, profile: dict, time_budget: float, segments: int = 1) -> str | None:
+    """Best-quality benchmarked preset predicted to encode width x height within time_budget.
+
+    With segments > 1 the pieces encode in parallel, so the prediction for a
+    single encoder is divided by the number that can actually run at once.
+    """
+    pixels = info.duration * info.fps * width * height
+    parallel = max(1, min(segments, os.cpu_count() or 1))
+    long_edge = max(width, height)
+    best = None
+    for preset in PRESETS:
+        throughput = profile_estimate(profile, preset, long_edge, "pixelsPerSecond")
+        quality = profile_estimate(profile, preset, long_edge, "psnr")
+        if throughput is None or quality is None or pixels / throughput / parallel > time_budget:
+            continue
+        # PRESETS runs fastest to slowest: a slower preset has to actually be better
+        if best is None or quality > best[1] + MIN_PSNR_GAIN:
+            best = (preset, quality)
+    return best[0] if best else None
+
+
+def build_plan(info: MediaInfo, budget_bytes: int, audio_kbps: int, max_dimension: int, preset: str = "slow", profile: dict | None = None, time_budget: float | None = None, segments: int = 1) -> EncodePlan:
     total_bps = max(1000, budget_bytes * 8 / info.duration)
     audio_bps = 0
     if info.has_audio and audio_kbps > 0:
@@ -124,7 +201,21 @@ def build_plan(info: MediaInfo, budget_bytes: int, audio_kbps: int, max_dimensio
     video_kbps = max(1, math.floor(video_bps / 1000))
     final_audio_kbps = max(0, math.floor(audio_bps / 1000))
     width, height = scaled_size(info, video_kbps, max_dimension)
-    return EncodePlan(budget_bytes, video_kbps, final_audio_kbps, width, height)
+    if preset == "auto":
+        preset = AUTO_FALLBACK_PRESET
+        if profile and time_budget:
+            # Shrink until some preset keeps up; at the floor take the fastest one
+            while True:
+                tuned = tune_preset(info, width, height, profile, time_budget, segments)
+                if tuned:
+                    preset = tuned
+                    break
+                long_edge = max(width, height)
+                if long_edge <= MIN_AUTO_DIMENSION:
+                    preset = PRESETS[0]
+                    break
+                width, height = scaled_size(info, video_kbps, max(MIN_AUTO_DIMENSION, int(long_edge * 0.75)))
+    return EncodePlan(budget_bytes, video_kbps, final_audio_kbps, width, height, preset)
 
 
 def ffmpeg_error(stderr: str, fallback: str) -> RuntimeError:
@@ -160,33 +251,129 @@ def video_args(plan: EncodePlan, preset: str, info: MediaInfo) -> list[str]:
     return args
 
 
-def encode_attempt(ffmpeg: str, input_path: Path, output_path: Path, temp_output: Path, info: MediaInfo, plan: EncodePlan, preset: str, passlog: Path, quiet: bool) -> None:
+def first_pass_done(passlog: Path) -> bool:
+    return Path(f"{passlog}-0.log").is_file()
+
+
+def encode_video(ffmpeg: str, input_path: Path, info: MediaInfo, plan: EncodePlan, preset: str, passlog: Path, quiet: bool, output_args: list[str], extra_args: list[str] = ()) -> None:
+    """Two-pass x264 encode, skipping pass 1 when passlog already holds its stats.
+
+    x264 only needs the first pass to describe the frames (same size, same
+    filters); the second pass rescales it to whatever bitrate it is given,
+    so a retry at a lower bitrate can reuse the stats.
+    """
     common = [ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", str(input_path)]
-    first_pass = common + video_args(plan, preset, info) + [
-        "-pass", "1",
-        "-passlogfile", str(passlog),
-        "-an",
-        "-f", "null",
-        os.devnull,
-    ]
-    second_pass = common + video_args(plan, preset, info) + [
-        "-pass", "2",
-        "-passlogfile", str(passlog),
-    ]
+    vargs = video_args(plan, preset, info) + list(extra_args)
+    if not first_pass_done(passlog):
+        run_ffmpeg(common + vargs + [
+            "-pass", "1",
+            "-passlogfile", str(passlog),
+            "-an",
+            "-f", "null",
+            os.devnull,
+        ], quiet)
+    run_ffmpeg(common + vargs + ["-pass", "2", "-passlogfile", str(passlog)] + output_args, quiet)
+
+
+def audio_args(info: MediaInfo, plan: EncodePlan, stream: str = "0:a:0?") -> list[str]:
     if info.has_audio and plan.audio_kbps > 0:
-        second_pass += ["-map", "0:a:0?", "-c:a", "aac", "-b:a", f"{plan.audio_kbps}k", "-ac", "2"]
-    else:
-        second_pass += ["-an"]
-    second_pass += ["-map_metadata", "0", "-movflags", "+faststart", str(temp_output)]
+        return ["-map", stream, "-c:a", "aac", "-b:a", f"{plan.audio_kbps}k", "-ac", "2"]
+    return ["-an"]
 
-    temp_output.unlink(missing_ok=True)
-    run_ffmpeg(first_pass, quiet)
-    run_ffmpeg(second_pass, quiet)
+
+def finish_output(temp_output: Path, output_path: Path) -> None:
     if not temp_output.exists() or temp_output.stat().st_size <= 0:
         raise RuntimeError("ffmpeg did not create an output file")
     os.replace(temp_output, output_path)
 
 
+def encode_attempt(ffmpeg: str, input_path: Path, output_path: Path, temp_output: Path, info: MediaInfo, plan: EncodePlan, preset: str, passlog: Path, quiet: bool) -> None:
+    output_args = audio_args(info, plan) + ["-map_metadata", "0", "-movflags", "+faststart", str(temp_output)]
+    temp_output.unlink(missing_ok=True)
+    encode_video(ffmpeg, input_path, info, plan, preset, passlog, quiet, output_args)
+    finish_output(temp_output, output_path)
+
+
+def split_segments(ffmpeg: str, input_path: Path, info: MediaInfo, count: int, work_dir: Path, quiet: bool) -> list[Path]:
+    """Stream-copy the video track into about count pieces, cut at keyframes."""
+    listing = work_dir / "segments.csv"
+    if not listing.is_file():
+        partial = work_dir / "segments.csv.part"
+        run_ffmpeg([
+            ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", str(input_path),
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "segment",
+            "-segment_time", f"{info.duration / count:.3f}",
+            "-reset_timestamps", "1",
+            "-segment_list", str(partial),
+            "-segment_list_type", "csv",
+            str(work_dir / "segment-%03d.mkv"),
+        ], quiet)
+        os.replace(partial, listing)
+    lines = [line.split(",")[0] for line in listing.read_text().splitlines() if line.strip()]
+    return [work_dir / name for name in lines]
+
+
+def encode_segmented_attempt(ffmpeg: str, input_path: Path, output_path: Path, temp_output: Path, info: MediaInfo, plan: EncodePlan, preset: str, work_dir: Path, segments: int, quiet: bool) -> None:
+    """Encode keyframe-aligned pieces in parallel, then join them and add the audio.
+
+    Every piece gets the plan's bitrate, so the joined file lands on the same
+    budget; each keeps its own pass-1 stats for retries. Audio is encoded
+    once from the source while joining.
+    """
+    parts = split_segments(ffmpeg, input_path, info, segments, work_dir, quiet)
+    threads = ["-threads", str(max(1, (os.cpu_count() or 1) // len(parts)))]
+    tag = f"{plan.width}x{plan.height}"
+    encoded = [part.with_name(f"{part.stem}-{tag}.mp4") for part in parts]
+
+    def encode(index: int) -> None:
+        encode_video(
+            ffmpeg, parts[index], info, plan, preset, work_dir / f"{parts[index].stem}-pass-{tag}", quiet,
+            ["-an", str(encoded[index])], threads,
+        )
+
+    with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+        for future in [pool.submit(encode, index) for index in range(len(parts))]:
+            future.result()
+
+    concat_list = work_dir / f"concat-{tag}.txt"
+    concat_list.write_text("".join(f"file '{path}'\n" for path in encoded))
+    temp_output.unlink(missing_ok=True)
+    run_ffmpeg([
+        ffmpeg, "-hide_banner", "-nostdin", "-y",
+        "-f", "concat", "-safe", "0", "-i", str(concat_list),
+        "-i", str(input_path),
+        "-map", "0:v:0", "-c:v", "copy",
+    ] + audio_args(info, plan, "1:a:0?") + [
+        "-map_metadata", "1", "-movflags", "+faststart", str(temp_output),
+    ], quiet)
+    finish_output(temp_output, output_path)
+
+
+def segment_count(requested: str, info: MediaInfo, min_seconds: float) -> int:
+    """Pieces to encode in parallel; 1 means a single whole-file encode."""
+    if requested == "auto":
+        wanted = min(os.cpu_count() or 1, MAX_AUTO_SEGMENTS)
+    else:
+        wanted = int(requested)
+    by_length = int(info.duration // max(1.0, min_seconds))
+    return max(1, min(wanted, by_length))
+
+
+def next_budget(attempt_budget: int, size_bytes: int | None, budget_bytes: int) -> int:
+    """Budget for the next attempt, from how far the last one missed.
+
+    Output size tracks the requested bitrate closely but not exactly, so the
+    last attempt's actual/requested ratio predicts the next one; without a
+    size (the encode failed) fall back to a fixed step.
+    """
+    if not size_bytes:
+        return max(1, int(attempt_budget * RETRY_FALLBACK_STEP))
+    predicted = budget_bytes * attempt_budget / size_bytes * SIZE_MODEL_MARGIN
+    return max(1, int(min(max(predicted, attempt_budget * RETRY_MAX_STEP), attempt_budget * RETRY_MIN_STEP)))
+
+
 def default_output_path(input_path: Path) -> Path:
     return input_path.with_name(f"{input_path.stem}.discord.mp4")
 
@@ -223,14 +410,28 @@ def compress(args: argparse.Namespace) -> dict:
         }
 
     temp_output = output_path.with_name(f".{output_path.stem}.tmp-{os.getpid()}{output_path.suffix or '.mp4'}")
+    segments = segment_count(args.segments, info, args.segment_min_seconds)
+    profile = None
+    time_budget = None
+    if args.preset == "auto":
+        profile = load_profile(Path(args.profile).expanduser() if args.profile else default_profile_path(), ffmpeg)
+        if profile is None and not args.quiet:
+            print(f"No encode profile for this machine; using {AUTO_FALLBACK_PRESET}. Run with --benchmark to create one.", file=sys.stderr)
+        time_budget = args.max_encode_seconds or info.duration * args.realtime_factor
     last_error = None
+    attempt_budget = budget_bytes
     with tempfile.TemporaryDirectory(prefix="inir-discord-compress-") as temp_dir:
+        work_dir = Path(temp_dir)
         for attempt in range(max(0, args.retries) + 1):
-            attempt_budget = max(1, int(budget_bytes * (0.88 ** attempt)))
-            plan = build_plan(info, attempt_budget, args.audio_kbps, args.max_dimension)
-            passlog = Path(temp_dir) / f"pass-{attempt}"
+            plan = build_plan(info, attempt_budget, args.audio_kbps, args.max_dimension, args.preset, profile, time_budget, segments)
+            # Pass-1 stats depend only on the frames, so they are keyed by size
+            passlog = work_dir / f"pass-{plan.width}x{plan.height}"
+            size_bytes = None
             try:
-                encode_attempt(ffmpeg, input_path, output_path, temp_output, info, plan, args.preset, passlog, args.quiet)
+                if segments > 1:
+                    encode_segmented_attempt(ffmpeg, input_path, output_path, temp_output, info, plan, plan.preset, work_dir, segments, args.quiet)
+                else:
+                    encode_attempt(ffmpeg, input_path, output_path, temp_output, info, plan, plan.preset, passlog, args.quiet)
                 size_bytes = output_path.stat().st_size
                 if size_bytes <= target_bytes:
                     return {
@@ -243,36 +444,153 @@ def compress(args: argparse.Namespace) -> dict:
                         "audioKbps": plan.audio_kbps,
                         "width": plan.width,
                         "height": plan.height,
+                        "preset": plan.preset,
                         "attempt": attempt + 1,
+                        "segments": segments,
                     }
                 last_error = RuntimeError(f"output exceeded target ({size_bytes} > {target_bytes})")
                 output_path.unlink(missing_ok=True)
             except RuntimeError as error:
                 last_error = error
                 temp_output.unlink(missing_ok=True)
-            finally:
-                for file in Path(temp_dir).glob(f"{passlog.name}*"):
+                # Stats from an interrupted pass would poison every retry
+                for file in work_dir.glob("*pass-*"):
                     file.unlink(missing_ok=True)
+            attempt_budget = next_budget(attempt_budget, size_bytes, budget_bytes)
 
     fail(str(last_error or "compression failed"))
 
 
+def default_profile_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(cache_home) / "inir" / "compress-discord-profile.json"
+
+
+def machine_id(ffmpeg: str) -> dict:
+    """What a profile was measured on; a profile from anything else is ignored."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    proc = subprocess.run([ffmpeg, "-hide_banner", "-version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=False)
+    return {
+        "cpu": cpu,
+        "cores": os.cpu_count() or 1,
+        "ffmpeg": (proc.stdout.splitlines() or [""])[0],
+    }
+
+
+def load_profile(path: Path, ffmpeg: str) -> dict | None:
+    try:
+        profile = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != PROFILE_VERSION or profile.get("machine") != machine_id(ffmpeg):
+        return None
+    return profile
+
+
+def measure_psnr(ffmpeg: str, encoded: Path, reference: Path) -> float:
+    proc = subprocess.run(
+        [ffmpeg, "-hide_banner", "-nostdin", "-i", str(encoded), "-i", str(reference), "-lavfi", "psnr", "-f", "null", os.devnull],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False,
+    )
+    match = re.search(r"average:([0-9.]+|inf)", proc.stderr or "")
+    if proc.returncode != 0 or not match:
+        raise ffmpeg_error(proc.stderr or "", "psnr measurement failed")
+    return 99.0 if match.group(1) == "inf" else float(match.group(1))
+
+
+def benchmark(args: argparse.Namespace) -> dict:
+    """Encode synthetic clips with every preset and size, and save the profile."""
+    ffmpeg = require_binary("ffmpeg")
+    seconds = max(1.0, args.benchmark_seconds)
+    entries = []
+    with tempfile.TemporaryDirectory(prefix="inir-discord-bench-") as temp_dir:
+        work_dir = Path(temp_dir)
+        for long_edge in BENCH_LONG_EDGES:
+            width, height = even(long_edge), even(long_edge * 9 / 16)
+            info = MediaInfo(seconds, 0, width, height, False)
+            plan = EncodePlan(0, max(1, int(width * height * 30 * BENCH_BPP / 1000)), 0, width, height)
+            clips = []
+            for name, source in BENCH_SOURCES.items():
+                clip = work_dir / f"{name}-{width}x{height}.mkv"
+                # Lossless intermediate so the clip is rendered once, not per preset
+                run_ffmpeg([
+                    ffmpeg, "-hide_banner", "-nostdin", "-y",
+                    "-f", "lavfi", "-i", source.format(w=width, h=height, qw=even(width / 4), qh=even(height / 4)),
+                    "-t", f"{seconds}", "-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", str(clip),
+                ], True)
+                clips.append(clip)
+            for preset in PRESETS:
+                elapsed = 0.0
+                psnr = []
+                for clip in clips:
+                    encoded = work_dir / f"{clip.stem}-{preset}.mp4"
+                    passlog = work_dir / f"{clip.stem}-{preset}-pass"
+                    started = time.monotonic()
+                    encode_video(ffmpeg, clip, info, plan, preset, passlog, True, ["-an", str(encoded)])
+                    elapsed += time.monotonic() - started
+                    psnr.append(measure_psnr(ffmpeg, encoded, clip))
+                    encoded.unlink(missing_ok=True)
+                entry = {
+                    "preset": preset,
+                    "longEdge": long_edge,
+                    "pixelsPerSecond": round(len(clips) * seconds * 30 * width * height / max(elapsed, 1e-6)),
+                    "psnr": round(sum(psnr) / len(psnr), 3),
+                }
+                entries.append(entry)
+                if not args.quiet:
+                    print(f"{preset:>9} {width}x{height}: {entry['pixelsPerSecond'] / (width * height):6.1f} fps, {entry['psnr']:.2f} dB", file=sys.stderr)
+
+    profile = {"version": PROFILE_VERSION, "machine": machine_id(ffmpeg), "bpp": BENCH_BPP, "entries": entries}
+    path = Path(args.profile).expanduser() if args.profile else default_profile_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    temp_path.write_text(json.dumps(profile, indent=2))
+    os.replace(temp_path, path)
+    return {"status": "benchmarked", "output": str(path), "entries": len(entries)}
+
+
+def segments_arg(value: str) -> str:
+    if value == "auto" or (value.isdigit() and int(value) >= 0):
+        return value
+    raise argparse.ArgumentTypeError("expected a non-negative integer or 'auto'")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Compress a video into a Discord-friendly size budget.")
-    parser.add_argument("--input", required=True)
+    parser.add_argument("--input")
     parser.add_argument("--output")
     parser.add_argument("--target-mb", type=float, default=10.0)
     parser.add_argument("--safety-margin-mb", type=float, default=0.5)
     parser.add_argument("--audio-kbps", type=int, default=96)
-    parser.add_argument("--preset", choices=PRESETS, default="slow")
+    parser.add_argument("--preset", choices=PRESETS + ("auto",), default="slow",
+                        help="x264 preset; 'auto' picks preset and size from the --benchmark profile")
     parser.add_argument("--max-dimension", type=int, default=1280)
     parser.add_argument("--retries", type=int, default=3)
     parser.add_argument("--nice", type=int, default=5)
+    parser.add_argument("--segments", type=segments_arg, default="0",
+                        help="encode this many keyframe-aligned pieces in parallel ('auto': one per core, 0: off)")
+    parser.add_argument("--segment-min-seconds", type=float, default=60.0,
+                        help="never cut pieces shorter than this")
+    parser.add_argument("--realtime-factor", type=float, default=1.0,
+                        help="--preset auto: allowed encode time as a multiple of the clip length")
+    parser.add_argument("--max-encode-seconds", type=float,
+                        help="--preset auto: allowed encode time in seconds (overrides --realtime-factor)")
+    parser.add_argument("--profile", help="encode profile path (default: ~/.cache/inir/compress-discord-profile.json)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure every preset on synthetic clips and write the profile")
+    parser.add_argument("--benchmark-seconds", type=float, default=3.0)
     parser.add_argument("--force", action="store_true")
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("--json", action="store_true")
     args = parser.parse_args()
-    result = compress(args)
+    if not args.benchmark and not args.input:
+        parser.error("--input is required unless --benchmark is given")
+    result = benchmark(args) if args.benchmark else compress(args)
     print(json.dumps(result, separators=(",", ":")) if args.json else result["output"])
 
 
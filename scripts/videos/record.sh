@@ -236,6 +236,10 @@ maybe_compress_recording() {
         if ! is_truthy "$DISCORD_COMPRESS_ONLY_IF_NEEDED"; then
             compress_cmd+=(--force)
         fi
+        # Long recordings are split at keyframes and encoded across cores
+        if is_truthy "$DISCORD_COMPRESS_PARALLEL"; then
+            compress_cmd+=(--segments auto)
+        fi
 
         local result=""
         if result="$("${compress_cmd[@]}" 2>&1)"; then
@@ -432,6 +436,7 @@ DISCORD_COMPRESS_ONLY_IF_NEEDED="true"
 DISCORD_COMPRESS_AUDIO_BITRATE_KBPS="96"
 DISCORD_COMPRESS_PRESET="slow"
 DISCORD_COMPRESS_MAX_DIMENSION="1280"
+DISCORD_COMPRESS_PARALLEL="true"
 if [[ -f "$CONFIG_FILE" ]] && command -v jq >/dev/null 2>&1; then
     SAVE_PATH=$(config_value '.screenRecord.savePath // empty')
     QUALITY_PRESET=$(config_value '.screenRecord.qualityPreset // "balanced"' "balanced")
@@ -459,6 +464,7 @@ if [[ -f "$CONFIG_FILE" ]] && command -v jq >/dev/null 2>&1; then
     DISCORD_COMPRESS_AUDIO_BITRATE_KBPS=$(config_value '.screenRecord.discordCompress.audioBitrateKbps // 96' "96")
     DISCORD_COMPRESS_PRESET=$(config_value '.screenRecord.discordCompress.preset // "slow"' "slow")
     DISCORD_COMPRESS_MAX_DIMENSION=$(config_value '.screenRecord.discordCompress.maxDimension // 1280' "1280")
+    DISCORD_COMPRESS_PARALLEL=$(config_value 'if .screenRecord.discordCompress.parallelEncode == null then "true" else .screenRecord.discordCompress.parallelEncode end' "true")
 fi
 
 HARDWARE_DEVICE="$(resolve_hardware_device "$HARDWARE_DEVICE")"
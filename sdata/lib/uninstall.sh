@@ -22,7 +22,9 @@ declare -A INIR_ONLY_PATHS=(
     ["${XDG_STATE_HOME}/quickshell/user"]="iNiR state (notifications, todo)"
     ["${XDG_CACHE_HOME}/quickshell/inir"]="iNiR cache"
     ["${XDG_BIN_HOME}/inir"]="iNiR launcher"
-    ["${HOME}/.local/bin/inir_super_overview_daemon.py"]="iNiR super daemon"
+    ["${HOME}/.local/bin/inir_input_daemon.py"]="iNiR input daemon"
+    ["${HOME}/.local/bin/inir_input_devices.py"]="iNiR input daemon device registry"
+    ["${HOME}/.local/bin/inir_super_overview_daemon.py"]="iNiR super daemon (legacy)"
     ["${XDG_CONFIG_HOME}/systemd/user/inir.service"]="iNiR user service"
     ["${XDG_CONFIG_HOME}/systemd/user/inir-super-overview.service"]="iNiR daemon service"
     ["${XDG_CONFIG_HOME}/vesktop/themes/system24.theme.css"]="iNiR Vesktop theme"
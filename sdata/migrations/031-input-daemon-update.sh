@@ -0,0 +1,55 @@
+#!/usr/bin/env bash
+
+MIGRATION_ID="031-input-daemon-update"
+MIGRATION_TITLE="Update the Super-tap input daemon"
+MIGRATION_DESCRIPTION="Installs inir_input_daemon.py and its device registry (inir_input_devices.py) to ~/.local/bin, refreshes inir-super-overview.service to run them, removes the replaced inir_super_overview_daemon.py and restarts the service. Only the installer copied these files, so './setup update' left existing installs on the old daemon."
+MIGRATION_TARGET_FILE="~/.local/bin/inir_input_daemon.py + ~/.config/systemd/user/inir-super-overview.service"
+MIGRATION_REQUIRED=true
+
+_input_daemon_bin_dir="${HOME}/.local/bin"
+_input_daemon_service="${XDG_CONFIG_HOME:-$HOME/.config}/systemd/user/inir-super-overview.service"
+_input_daemon_legacy="${_input_daemon_bin_dir}/inir_super_overview_daemon.py"
+
+migration_check() {
+  local daemon_src="${REPO_ROOT}/scripts/daemon/inir_input_daemon.py"
+  local registry_src="${REPO_ROOT}/scripts/daemon/inir_input_devices.py"
+  local service_src="${REPO_ROOT}/scripts/systemd/inir-super-overview.service"
+
+  # Only installs that have the Super-tap daemon set up
+  [[ -f "$_input_daemon_service" || -f "$_input_daemon_legacy" ]] || return 1
+  [[ -f "$daemon_src" && -f "$registry_src" && -f "$service_src" ]] || return 1
+
+  [[ -f "$_input_daemon_legacy" ]] && return 0
+  cmp -s "$daemon_src" "${_input_daemon_bin_dir}/inir_input_daemon.py" || return 0
+  cmp -s "$registry_src" "${_input_daemon_bin_dir}/inir_input_devices.py" || return 0
+  cmp -s "$service_src" "$_input_daemon_service" || return 0
+  return 1
+}
+
+migration_preview() {
+  if [[ -f "$_input_daemon_legacy" ]]; then
+    echo -e "${STY_RED}- ~/.local/bin/inir_super_overview_daemon.py${STY_RST}"
+  fi
+  echo -e "${STY_GREEN}+ ~/.local/bin/inir_input_daemon.py${STY_RST}"
+  echo -e "${STY_GREEN}+ ~/.local/bin/inir_input_devices.py${STY_RST}"
+  echo -e "${STY_GREEN}+ inir-super-overview.service runs inir_input_daemon.py (restarted)${STY_RST}"
+}
+
+migration_apply() {
+  migration_check || return 0
+
+  mkdir -p "$_input_daemon_bin_dir" "$(dirname "$_input_daemon_service")"
+  cp -f "${REPO_ROOT}/scripts/daemon/inir_input_daemon.py" "${_input_daemon_bin_dir}/inir_input_daemon.py"
+  chmod +x "${_input_daemon_bin_dir}/inir_input_daemon.py"
+  cp -f "${REPO_ROOT}/scripts/daemon/inir_input_devices.py" "${_input_daemon_bin_dir}/inir_input_devices.py"
+  cp -f "${REPO_ROOT}/scripts/systemd/inir-super-overview.service" "$_input_daemon_service"
+  rm -f "$_input_daemon_legacy"
+
+  if command -v systemctl >/dev/null 2>&1; then
+    systemctl --user daemon-reload >/dev/null 2>&1 || true
+    if systemctl --user is-enabled --quiet inir-super-overview.service >/dev/null 2>&1; then
+      systemctl --user reset-failed inir-super-overview.service >/dev/null 2>&1 || true
+      systemctl --user restart inir-super-overview.service >/dev/null 2>&1 || true
+    fi
+  fi
+}
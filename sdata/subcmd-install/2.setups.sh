@@ -112,13 +112,19 @@ function setup_systemd_services(){
 
 #####################################################################################
 # Super-tap daemon (tap Super key to toggle overview)
+# Runs the input daemon, which also serves lock key state to the shell
 #####################################################################################
 function setup_super_daemon(){
   tui_info "Setting up Super-tap daemon..."
   
-  local daemon_src="${REPO_ROOT}/scripts/daemon/inir_super_overview_daemon.py"
+  local daemon_src="${REPO_ROOT}/scripts/daemon/inir_input_daemon.py"
   local service_src="${REPO_ROOT}/scripts/systemd/inir-super-overview.service"
-  local daemon_dst="${HOME}/.local/bin/inir_super_overview_daemon.py"
+  local daemon_dst="${HOME}/.local/bin/inir_input_daemon.py"
+  # Device registry module imported by the daemon, installed next to it
+  local registry_src="${REPO_ROOT}/scripts/daemon/inir_input_devices.py"
+  local registry_dst="${HOME}/.local/bin/inir_input_devices.py"
+  # Replaced by inir_input_daemon.py
+  local legacy_daemon="${HOME}/.local/bin/inir_super_overview_daemon.py"
   local service_dst="${XDG_CONFIG_HOME}/systemd/user/inir-super-overview.service"
   
   if [[ ! -f "$daemon_src" ]]; then
@@ -130,6 +136,8 @@ function setup_super_daemon(){
   x mkdir -p "$(dirname "$daemon_dst")"
   x cp "$daemon_src" "$daemon_dst"
   x chmod +x "$daemon_dst"
+  x cp "$registry_src" "$registry_dst"
+  rm -f "$legacy_daemon"
   
   # Install systemd service
   x mkdir -p "$(dirname "$service_dst")"
@@ -138,7 +146,9 @@ function setup_super_daemon(){
   # Enable service if in graphical session
   if [[ -n "${DBUS_SESSION_BUS_ADDRESS}" ]]; then
     v systemctl --user daemon-reload
-    v systemctl --user enable inir-super-overview.service --now
+    v systemctl --user enable inir-super-overview.service
+    # Restart so an already running daemon picks up the new script
+    v systemctl --user restart inir-super-overview.service
   else
     log_warning "Not in graphical session. Enable later with:"
     echo "  systemctl --user enable inir-super-overview.service --now"
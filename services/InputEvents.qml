@@ -0,0 +1,65 @@
+pragma Singleton
+pragma ComponentBehavior: Bound
+
+import QtQuick
+import Quickshell
+import Quickshell.Io
+
+/**
+ * Events pushed by the input daemon (scripts/daemon/inir_input_daemon.py)
+ * over $XDG_RUNTIME_DIR/inir/input.sock, one JSON object per line.
+ * While a subscriber is connected the daemon delivers Super taps here
+ * instead of spawning the `inir overview toggle` launcher, and lock key
+ * state without KeyboardIndicators running a helper process.
+ */
+Singleton {
+    id: root
+
+    readonly property string socketPath: {
+        const runtimeDir = Quickshell.env("XDG_RUNTIME_DIR") ?? ""
+        return runtimeDir.length > 0 ? `${runtimeDir}/inir/input.sock` : ""
+    }
+    readonly property bool available: socket.isConnected
+
+    signal superTap()
+    signal lockState(var state)
+
+    function handleEvent(event) {
+        switch (event?.type) {
+        case "super-tap":
+            root.superTap()
+            break
+        case "lock-state":
+            root.lockState(event)
+            break
+        }
+    }
+
+    DankSocket {
+        id: socket
+        path: root.socketPath
+        connected: root.socketPath.length > 0
+
+        parser: SplitParser {
+            onRead: line => {
+                try {
+                    root.handleEvent(JSON.parse(line))
+                } catch (e) {
+                    console.warn("[InputEvents] Failed to parse event:", line, e)
+                }
+            }
+        }
+    }
+
+    // DankSocket only retries after a dropped connection; keep polling until
+    // the daemon is up (it may start after the shell, or not be installed)
+    Timer {
+        interval: 5000
+        repeat: true
+        running: socket.connected && !socket.isConnected
+        onTriggered: {
+            socket.connected = false
+            Qt.callLater(() => socket.connected = root.socketPath.length > 0)
+        }
+    }
+}
@@ -54,6 +54,12 @@ Singleton {
     readonly property string currentLayoutCodeMultiline: root.abbreviateLayoutCode(root.currentLayoutCode, "\n")
     readonly property string currentLayoutCodeInline: root.abbreviateLayoutCode(root.currentLayoutCode, " ").toUpperCase()
     readonly property bool usingEvdev: root._lockSource === "evdev"
+    // The input daemon publishes lock state over its socket; the helper process is only a fallback
+    readonly property bool daemonAvailable: InputEvents.available
+    onDaemonAvailableChanged: {
+        if (!lockSourceTimer.running)
+            root._selectLockSource();
+    }
     readonly property bool layoutVisible: root.showLayoutPanel && root.hasMultipleLayouts && root.currentLayoutCode.length > 0
     readonly property bool capsLockVisible: root.showCapsPanel && root.capsLock
     readonly property bool numLockVisible: root.showNumPanel && root.numLock
@@ -108,15 +114,40 @@ Singleton {
 
         try {
             const payload = JSON.parse(trimmed);
-            if (payload.type !== "state")
+            if (payload.type !== "lock-state")
                 return;
 
-            root._setEvdevState(Boolean(payload.caps), Boolean(payload.num), true);
+            root._applyLockEvent(payload);
         } catch (error) {
             root._log("Failed to parse evdev output", trimmed, error);
         }
     }
 
+    function _applyLockEvent(payload) {
+        if (!payload.devices) {
+            // No keyboard with lock LEDs right now
+            root._lockSource = "unknown";
+            root._enableSysfsFallback();
+            return;
+        }
+
+        root._setEvdevState(Boolean(payload.caps), Boolean(payload.num), true);
+    }
+
+    function _selectLockSource() {
+        if (root._destroying)
+            return;
+
+        if (root.daemonAvailable) {
+            evdevProbeProc.running = false;
+            evdevMonitorProc.running = false;
+            return;
+        }
+
+        if (!evdevProbeProc.running && !evdevMonitorProc.running)
+            evdevProbeProc.running = true;
+    }
+
     function _enableSysfsFallback() {
         if (root.usingEvdev)
             return;
@@ -278,6 +309,9 @@ Singleton {
         }
 
         onExited: (exitCode, exitStatus) => {
+            if (root.daemonAvailable)
+                return;
+
             if (exitCode === 0) {
                 if (!evdevMonitorProc.running)
                     evdevMonitorProc.running = true;
@@ -285,6 +319,7 @@ Singleton {
             }
 
             root._log("evdev probe exited", exitCode, exitStatus);
+            root._lockSource = "unknown";
             root._enableSysfsFallback();
         }
     }
@@ -295,7 +330,7 @@ Singleton {
         running: false
         repeat: false
         onTriggered: {
-            if (!root._destroying && root.usingEvdev && !evdevMonitorProc.running)
+            if (!root._destroying && root.usingEvdev && !root.daemonAvailable && !evdevMonitorProc.running)
                 evdevMonitorProc.running = true;
         }
     }
@@ -314,7 +349,7 @@ Singleton {
         }
 
         onExited: (exitCode, exitStatus) => {
-            if (root._destroying)
+            if (root._destroying || root.daemonAvailable)
                 return;
 
             root._log("evdev monitor exited", exitCode, exitStatus);
@@ -360,6 +395,15 @@ Singleton {
         }
     }
 
+    Timer {
+        id: lockSourceTimer
+        // Give the input daemon socket a moment to connect before spawning the helper
+        interval: 300
+        running: false
+        repeat: false
+        onTriggered: root._selectLockSource()
+    }
+
     Timer {
         id: readyTimer
         interval: 1500
@@ -404,6 +448,14 @@ Singleton {
         }
     }
 
+    Connections {
+        target: InputEvents
+
+        function onLockState(state) {
+            root._applyLockEvent(state);
+        }
+    }
+
     Connections {
         target: HyprlandXkb
 
@@ -424,7 +476,7 @@ Singleton {
 
     Component.onCompleted: {
         root._knownLayoutName = root.currentLayoutName;
-        evdevProbeProc.running = true;
+        lockSourceTimer.running = true;
     }
 
     Component.onDestruction: root._destroying = true
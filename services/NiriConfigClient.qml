@@ -0,0 +1,218 @@
+pragma Singleton
+pragma ComponentBehavior: Bound
+
+import QtQuick
+import Quickshell
+import Quickshell.Io
+
+/**
+ * Client for the resident niri-config.py server (`niri-config.py serve`),
+ * which answers JSON-RPC requests on $XDG_RUNTIME_DIR/inir/niri-config.sock
+ * from a cached, inotify-invalidated view of the Niri config.
+ *
+ * The server is started on demand with --idle-timeout; this client drops its
+ * connection after a quiet spell so the server can exit again. Requests that
+ * cannot reach it (no runtime dir, server failed to start, connection lost
+ * mid-request) run as one-shot `niri-config.py <method>` processes instead,
+ * with the same callback contract:
+ *
+ *   request(method, params, (ok, result, error) => ...)
+ *
+ * result is the command's JSON output (also on failure, when it printed
+ * one); error is a human-readable message when ok is false.
+ */
+Singleton {
+    id: root
+
+    readonly property string scriptPath: Quickshell.shellPath("scripts/niri-config.py")
+    readonly property string socketPath: {
+        const runtimeDir = Quickshell.env("XDG_RUNTIME_DIR") ?? ""
+        return runtimeDir.length > 0 ? `${runtimeDir}/inir/niri-config.sock` : ""
+    }
+    // The server exits after this long without clients
+    property int serverIdleTimeout: 60
+    // Requests wait this long for the server before falling back to the CLI
+    property int connectTimeoutMs: 2000
+    // Disconnect after this long without requests, letting the server idle out
+    property int disconnectAfterMs: 30000
+    readonly property bool connected: socket.connected
+
+    property int _nextId: 1
+    property var _inFlight: ({})
+    property var _waiting: []
+
+    function request(method, params, callback) {
+        const entry = {
+            method: method,
+            params: (params ?? []).map(param => String(param)),
+            callback: callback
+        }
+        if (socket.connected) {
+            root._send(entry)
+            return
+        }
+        if (root.socketPath.length === 0) {
+            root._runCli(entry)
+            return
+        }
+        root._waiting.push(entry)
+        root._connect()
+    }
+
+    function _connect() {
+        if (connectTimeout.running)
+            return
+        connectTimeout.restart()
+        // A server started by an earlier session may still be listening
+        socket.connected = true
+        if (!serverProcess.running)
+            serverProcess.running = true
+    }
+
+    function _send(entry) {
+        const id = root._nextId++
+        root._inFlight[id] = entry
+        idleDisconnect.restart()
+        socket.write(JSON.stringify({ jsonrpc: "2.0", id: id, method: entry.method, params: entry.params }) + "\n")
+        socket.flush()
+    }
+
+    function _finish(entry, ok, result, error) {
+        if (typeof entry.callback === "function")
+            entry.callback(ok, result, error)
+    }
+
+    function _handleResponse(line) {
+        let response
+        try {
+            response = JSON.parse(line)
+        } catch (e) {
+            console.warn("[NiriConfigClient] Unparseable response:", line)
+            return
+        }
+        const entry = root._inFlight[response?.id]
+        if (!entry)
+            return
+        delete root._inFlight[response.id]
+        if (response.error) {
+            root._finish(entry, false, response.error.data ?? null, String(response.error.message ?? `${entry.method} failed`))
+        } else {
+            root._finish(entry, true, response.result ?? null, "")
+        }
+    }
+
+    function _drainWaiting(useSocket) {
+        const waiting = root._waiting
+        root._waiting = []
+        for (const entry of waiting) {
+            if (useSocket)
+                root._send(entry)
+            else
+                root._runCli(entry)
+        }
+    }
+
+    function _runCli(entry) {
+        const proc = cliProcess.createObject(root, { entry: entry })
+        proc.command = ["python3", root.scriptPath, entry.method, ...entry.params]
+        proc.running = true
+    }
+
+    Socket {
+        id: socket
+        path: root.socketPath
+
+        onConnectionStateChanged: {
+            if (connected) {
+                connectTimeout.stop()
+                root._drainWaiting(true)
+                return
+            }
+            // Requests the server never answered are retried as processes
+            const lost = Object.values(root._inFlight)
+            root._inFlight = {}
+            for (const entry of lost)
+                root._runCli(entry)
+        }
+
+        parser: SplitParser {
+            onRead: line => root._handleResponse(line)
+        }
+    }
+
+    Process {
+        id: serverProcess
+        command: ["python3", root.scriptPath, "serve", "--idle-timeout", String(root.serverIdleTimeout)]
+        stdout: SplitParser {
+            onRead: line => {
+                if (line.indexOf("\"listening\"") >= 0 && !socket.connected) {
+                    socket.connected = false
+                    socket.connected = true
+                }
+            }
+        }
+        onExited: (exitCode, exitStatus) => {
+            // "already running" also exits non-zero; connect to that server
+            if (!socket.connected && root._waiting.length > 0) {
+                socket.connected = false
+                socket.connected = true
+            }
+        }
+    }
+
+    Timer {
+        id: connectTimeout
+        interval: root.connectTimeoutMs
+        repeat: false
+        onTriggered: {
+            if (!socket.connected)
+                root._drainWaiting(false)
+        }
+    }
+
+    Timer {
+        id: idleDisconnect
+        interval: root.disconnectAfterMs
+        repeat: false
+        onTriggered: {
+            if (Object.keys(root._inFlight).length > 0) {
+                restart()
+                return
+            }
+            socket.connected = false
+        }
+    }
+
+    Component {
+        id: cliProcess
+
+        Process {
+            id: proc
+            required property var entry
+
+            stdout: StdioCollector { id: cliOut }
+            stderr: StdioCollector { id: cliErr }
+
+            onExited: (exitCode, exitStatus) => {
+                const text = (cliOut.text ?? "").trim()
+                let result = null
+                if (text.length > 0) {
+                    const lines = text.split("\n")
+                    try {
+                        result = JSON.parse(lines[lines.length - 1])
+                    } catch (e) {
+                        result = text
+                    }
+                }
+                let error = ""
+                if (exitCode !== 0) {
+                    error = (result && typeof result === "object" && result.error)
+                        ? String(result.error)
+                        : ((cliErr.text || cliOut.text || "").trim() || `${proc.entry.method} failed`)
+                }
+                root._finish(proc.entry, exitCode === 0, result, error)
+                proc.destroy()
+            }
+        }
+    }
+}
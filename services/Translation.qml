@@ -21,6 +21,8 @@ Singleton {
     property bool isLoading: false
     property string translationKeepSuffix: "/*keep*/"
     property string translationsDir: Quickshell.shellPath("translations")
+    // Minified catalogs built by translations/tools/translation-manager.py
+    property string catalogsDir: Quickshell.shellPath("translations/compiled")
     property string generatedTranslationsDir: Directories.shellConfig + "/translations"
 
     property string languageCode: {
@@ -67,6 +69,7 @@ Singleton {
     TranslationReader {
         id: translationFileView
         translationsDir: root.translationsDir
+        catalogsDir: root.catalogsDir
         languageCode: root.languageCode
         onContentLoaded: (data) => {
             root.translations = data;
@@ -149,8 +152,13 @@ Singleton {
     component TranslationReader: FileView {
         id: translationReader
         required property string translationsDir
+        // When set, <lang>.catalog there is tried before the editable <lang>.json.
+        // Stale catalogs are caught by `translation-manager.py --compile --check`
+        // and rebuilt whenever the manager saves a language.
+        property string catalogsDir: ""
         property string languageCode: root.languageCode
         property bool isGenerated: false
+        property bool readingCatalog: false
         signal contentLoaded(var data)
         printErrors: false
 
@@ -161,7 +169,16 @@ Singleton {
                 translationReader.contentLoaded({});
                 return;
             }
+            translationReader.readingCatalog = translationReader.catalogsDir.length > 0;
             translationReader.path = "";
+            translationReader.path = translationReader.readingCatalog
+                ? `${translationReader.catalogsDir}/${translationReader.languageCode}.catalog`
+                : `${translationReader.translationsDir}/${translationReader.languageCode}.json`;
+            translationReader.reload();
+        }
+
+        function readSource() { // Catalog missing or unusable
+            translationReader.readingCatalog = false;
             translationReader.path = `${translationReader.translationsDir}/${translationReader.languageCode}.json`;
             translationReader.reload();
         }
@@ -172,13 +189,28 @@ Singleton {
             try {
                 textContent = text();
                 var jsonData = JSON.parse(textContent);
+                if (translationReader.readingCatalog) {
+                    if (jsonData?.version !== 2 || jsonData?.language !== translationReader.languageCode) {
+                        translationReader.readSource();
+                        return;
+                    }
+                    jsonData = jsonData.entries ?? {};
+                }
                 translationReader.contentLoaded(jsonData);
             } catch (e) {
+                if (translationReader.readingCatalog) {
+                    translationReader.readSource();
+                    return;
+                }
                 console.log("[Translation] Failed to load translations:", e);
                 translationReader.contentLoaded({});
             }
         }
         onLoadFailed: error => {
+            if (translationReader.readingCatalog) {
+                translationReader.readSource();
+                return;
+            }
             translationReader.contentLoaded({});
         }
     }
@@ -151,13 +151,11 @@ Singleton {
             }
         }
 
-        // Queue async check → generate (with dedup)
+        // Queue for the next batch (with dedup); delegates created in the same
+        // frame all land in one video_frames.py run
         root._ffPending[videoPath] = true
-        // Use md5 hash of full path to match switchwall.sh and avoid basename collisions
-        const hash = MD5.hash(videoPath)
-        const expectedPath = root._videoThumbDir + "/" + hash + ".jpg"
-        root._ffQueue.push({ videoPath: videoPath, outputPath: expectedPath })
-        if (!_ffCheckProc.running && !_ffGenProc.running) _processNextFF()
+        root._ffQueue.push(videoPath)
+        _ffBatchTimer.restart()
     }
 
     function _cacheFirstFrame(videoPath: string, imagePath: string) {
@@ -171,46 +169,40 @@ Singleton {
     }
 
     property var _ffQueue: []
+    // Checks the cache with one directory listing, extracts missing frames on a
+    // small worker pool and streams one JSON line per video
+    property string videoFramesScriptPath: `${FileUtils.trimFileProtocol(Directories.scriptPath)}/thumbnails/video_frames.py`
 
-    function _processNextFF() {
-        if (root._ffQueue.length === 0) return
-        const item = root._ffQueue.shift()
-        _ffCheckProc._videoPath = item.videoPath
-        _ffCheckProc._outputPath = item.outputPath
-        _ffCheckProc.command = ["test", "-f", item.outputPath]
-        _ffCheckProc.running = true
+    Timer {
+        id: _ffBatchTimer
+        interval: 50
+        onTriggered: root._processNextFF()
     }
 
-    Process {
-        id: _ffCheckProc
-        property string _videoPath
-        property string _outputPath
-        onExited: (exitCode) => {
-            if (exitCode === 0) {
-                root._cacheFirstFrame(_ffCheckProc._videoPath, _ffCheckProc._outputPath)
-                root._processNextFF()
-            } else {
-                _ffGenProc._videoPath = _ffCheckProc._videoPath
-                _ffGenProc._outputPath = _ffCheckProc._outputPath
-                _ffGenProc.command = ["bash", "-c",
-                    "mkdir -p " + JSON.stringify(root._videoThumbDir) +
-                    " && ffmpeg -y -i " + JSON.stringify(_ffCheckProc._videoPath) +
-                    " -vframes 1 -q:v 2 " + JSON.stringify(_ffCheckProc._outputPath)]
-                _ffGenProc.running = true
-            }
-        }
+    function _processNextFF() {
+        if (_ffBatchProc.running || root._ffQueue.length === 0) return
+        const batch = root._ffQueue
+        root._ffQueue = []
+        // Frames are named by the md5 of the full path, matching switchwall.sh
+        _ffBatchProc.command = ["python3", root.videoFramesScriptPath, "--output-dir", root._videoThumbDir].concat(batch)
+        _ffBatchProc.running = true
     }
 
     Process {
-        id: _ffGenProc
-        property string _videoPath
-        property string _outputPath
-        onExited: (exitCode) => {
-            if (exitCode === 0) {
-                root._cacheFirstFrame(_ffGenProc._videoPath, _ffGenProc._outputPath)
+        id: _ffBatchProc
+        stdout: SplitParser {
+            onRead: data => {
+                let result = null
+                try {
+                    result = JSON.parse(data)
+                } catch (e) {
+                    return
+                }
+                if (result.status === "cached" || result.status === "generated")
+                    root._cacheFirstFrame(result.video, result.frame)
             }
-            root._processNextFF()
         }
+        onExited: root._processNextFF()
     }
     // ── End video first-frame system ──────────────────────────────────────
 
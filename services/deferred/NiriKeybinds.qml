@@ -13,7 +13,7 @@ import qs.services
  * Falls back to defaults if parsing fails.
  *
  * Read/write support: setBind() and removeBind() write back
- * to the keybinds KDL file via niri-config.py.
+ * to the keybinds KDL file via niri-config.py (through NiriConfigClient).
  */
 Singleton {
     id: root
@@ -38,7 +38,6 @@ Singleton {
 
     // ── Script paths ──────────────────────────────────────────────────────
     readonly property string parserScript: FileUtils.trimFileProtocol(Qt.resolvedUrl("../scripts/parse_niri_keybinds.py"))
-    readonly property string niriConfigScript: FileUtils.trimFileProtocol(Qt.resolvedUrl("../scripts/niri-config.py"))
 
     // Internal: pending key combos tracked for signal emission
     property string _pendingSetCombo: ""
@@ -48,30 +47,75 @@ Singleton {
 
     function reload(): void {
         keybindParser.running = true
-        enrichedBindsLoader.running = true
+        loadEnrichedBinds()
     }
 
     function setBind(keyCombo: string, action: string, options: string): void {
-        if (setBindProcess.running) {
-            console.warn("[NiriKeybinds] setBind: process already running, ignoring")
+        if (root._pendingSetCombo.length > 0) {
+            console.warn("[NiriKeybinds] setBind: request already running, ignoring")
             return
         }
         root._pendingSetCombo = keyCombo
-        const args = ["/usr/bin/python3", root.niriConfigScript, "set-bind", keyCombo, action]
+        const args = [keyCombo, action]
         if (options && options.length > 0)
             args.push("--options", options)
-        setBindProcess.command = args
-        setBindProcess.running = true
+        NiriConfigClient.request("set-bind", args, (ok, result, error) => {
+            const combo = root._pendingSetCombo
+            root._pendingSetCombo = ""
+            if (ok && result?.success !== false) {
+                console.info("[NiriKeybinds] setBind succeeded:", combo)
+                root.reload()
+                root.bindSaved(combo)
+                return
+            }
+            const msg = (ok ? result?.error : error) || "set-bind returned failure"
+            console.warn("[NiriKeybinds] setBind failed:", msg)
+            root.errorMessage = msg
+            root.bindError(msg)
+        })
     }
 
     function removeBind(keyCombo: string): void {
-        if (removeBindProcess.running) {
-            console.warn("[NiriKeybinds] removeBind: process already running, ignoring")
+        if (root._pendingRemoveCombo.length > 0) {
+            console.warn("[NiriKeybinds] removeBind: request already running, ignoring")
             return
         }
         root._pendingRemoveCombo = keyCombo
-        removeBindProcess.command = ["/usr/bin/python3", root.niriConfigScript, "remove-bind", keyCombo]
-        removeBindProcess.running = true
+        NiriConfigClient.request("remove-bind", [keyCombo], (ok, result, error) => {
+            const combo = root._pendingRemoveCombo
+            root._pendingRemoveCombo = ""
+            if (ok && result?.success !== false) {
+                console.info("[NiriKeybinds] removeBind succeeded:", combo)
+                root.reload()
+                root.bindRemoved(combo)
+                return
+            }
+            const msg = (ok ? result?.error : error) || "remove-bind returned failure"
+            console.warn("[NiriKeybinds] removeBind failed:", msg)
+            root.errorMessage = msg
+            root.bindError(msg)
+        })
+    }
+
+    // ── Enriched binds loader (niri-config.py get-binds) ─────────────────
+    function loadEnrichedBinds(): void {
+        NiriConfigClient.request("get-binds", [], (ok, result, error) => {
+            if (!ok) {
+                console.warn("[NiriKeybinds] get-binds failed:", error)
+                return
+            }
+            if (!result || typeof result !== "object") {
+                console.warn("[NiriKeybinds] get-binds: empty result")
+                return
+            }
+            if (result.error) {
+                console.warn("[NiriKeybinds] get-binds error:", result.error)
+                return
+            }
+            root.allBinds = result.binds ?? []
+            root.enrichedCategories = result.categories ?? []
+            console.info("[NiriKeybinds] get-binds loaded", root.allBinds.length, "binds")
+        })
     }
 
     // ── Legacy keybind parser (cheatsheet) ───────────────────────────────
@@ -116,123 +160,6 @@ Singleton {
         }
     }
 
-    // ── Enriched binds loader (niri-config.py get-binds) ─────────────────
-    Process {
-        id: enrichedBindsLoader
-        command: ["/usr/bin/python3", root.niriConfigScript, "get-binds"]
-        running: false
-
-        stdout: StdioCollector {
-            id: enrichedCollector
-        }
-
-        onExited: (exitCode, exitStatus) => {
-            const output = enrichedCollector.text?.trim() ?? ""
-            if (exitCode === 0 && output.length > 0) {
-                try {
-                    const result = JSON.parse(output)
-                    if (!result) {
-                        console.warn("[NiriKeybinds] get-binds: empty result")
-                        return
-                    }
-                    if (result.error) {
-                        console.warn("[NiriKeybinds] get-binds error:", result.error)
-                    } else {
-                        root.allBinds = result.binds ?? []
-                        root.enrichedCategories = result.categories ?? []
-                        console.info("[NiriKeybinds] get-binds loaded", root.allBinds.length, "binds")
-                    }
-                } catch (e) {
-                    console.warn("[NiriKeybinds] get-binds JSON parse error:", e)
-                }
-            } else if (exitCode !== 0) {
-                console.warn("[NiriKeybinds] get-binds failed (exit", exitCode + "), niri-config.py may not support get-binds yet")
-            }
-        }
-    }
-
-    // ── setBind process ───────────────────────────────────────────────────
-    Process {
-        id: setBindProcess
-        running: false
-
-        stdout: StdioCollector {
-            id: setBindCollector
-        }
-
-        onExited: (exitCode, exitStatus) => {
-            const output = setBindCollector.text?.trim() ?? ""
-            const combo = root._pendingSetCombo
-            root._pendingSetCombo = ""
-            if (exitCode === 0) {
-                try {
-                    const result = output.length > 0 ? JSON.parse(output) : {}
-                    if (result.success !== false) {
-                        console.info("[NiriKeybinds] setBind succeeded:", combo)
-                        root.reload()
-                        root.bindSaved(combo)
-                    } else {
-                        const msg = result.error ?? "set-bind returned failure"
-                        console.warn("[NiriKeybinds] setBind failed:", msg)
-                        root.errorMessage = msg
-                        root.bindError(msg)
-                    }
-                } catch (e) {
-                    // Exit 0 but non-JSON output — treat as success
-                    console.info("[NiriKeybinds] setBind succeeded (no JSON):", combo)
-                    root.reload()
-                    root.bindSaved(combo)
-                }
-            } else {
-                const msg = output.length > 0 ? output : ("set-bind exited " + exitCode)
-                console.warn("[NiriKeybinds] setBind failed:", msg)
-                root.errorMessage = msg
-                root.bindError(msg)
-            }
-        }
-    }
-
-    // ── removeBind process ────────────────────────────────────────────────
-    Process {
-        id: removeBindProcess
-        running: false
-
-        stdout: StdioCollector {
-            id: removeBindCollector
-        }
-
-        onExited: (exitCode, exitStatus) => {
-            const output = removeBindCollector.text?.trim() ?? ""
-            const combo = root._pendingRemoveCombo
-            root._pendingRemoveCombo = ""
-            if (exitCode === 0) {
-                try {
-                    const result = output.length > 0 ? JSON.parse(output) : {}
-                    if (result.success !== false) {
-                        console.info("[NiriKeybinds] removeBind succeeded:", combo)
-                        root.reload()
-                        root.bindRemoved(combo)
-                    } else {
-                        const msg = result.error ?? "remove-bind returned failure"
-                        console.warn("[NiriKeybinds] removeBind failed:", msg)
-                        root.errorMessage = msg
-                        root.bindError(msg)
-                    }
-                } catch (e) {
-                    // Exit 0 but non-JSON output — treat as success
-                    console.info("[NiriKeybinds] removeBind succeeded (no JSON):", combo)
-                    root.reload()
-                    root.bindRemoved(combo)
-                }
-            } else {
-                const msg = output.length > 0 ? output : ("remove-bind exited " + exitCode)
-                console.warn("[NiriKeybinds] removeBind failed:", msg)
-                root.errorMessage = msg
-                root.bindError(msg)
-            }
-        }
-    }
-
     // ── File watchers ─────────────────────────────────────────────────────
     FileView {
         id: configWatcher
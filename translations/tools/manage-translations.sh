@@ -17,6 +17,7 @@ show_help() {
     echo "  update       Update translation files (add missing/remove extra keys)"
     echo "  clean        Clean unused translation keys"
     echo "  sync         Sync keys across all language files"
+    echo "  compile      Rebuild the precompiled catalogs loaded by the shell"
     echo "  status       Show translation status"
     echo ""
     echo "Options:"
@@ -88,7 +89,7 @@ while [[ $# -gt 0 ]]; do
             show_help
             exit 0
             ;;
-        extract|update|clean|sync|status)
+        extract|update|clean|sync|compile|status)
             if [ -n "$COMMAND" ]; then
                 echo "Error: Only one command can be specified"
                 exit 1
@@ -144,6 +145,10 @@ case $COMMAND in
         echo "Syncing translation keys..."
         python3 "$SCRIPT_DIR/translation-cleaner.py" $BASE_ARGS $YES_FLAG --sync
         ;;
+    compile)
+        echo "Compiling translation catalogs..."
+        python3 "$SCRIPT_DIR/translation-manager.py" $BASE_ARGS --compile
+        ;;
     status)
         show_status
         ;;
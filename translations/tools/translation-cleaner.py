@@ -20,6 +20,9 @@ spec = importlib.util.spec_from_file_location("translation_manager", manager_pat
 translation_manager = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(translation_manager)
 TranslationManager = translation_manager.TranslationManager
+TranslationIndex = translation_manager.TranslationIndex
+compile_catalog = translation_manager.compile_catalog
+keys_digest = translation_manager.keys_digest
 
 def clean_translation_files(translations_dir: str, source_dir: str, backup: bool = True, yes_mode: bool = False):
     """Clean translation files by removing unused keys"""
@@ -42,10 +45,17 @@ def clean_translation_files(translations_dir: str, source_dir: str, backup: bool
     print(f"Found language files: {', '.join(languages)}")
     
     total_removed = 0
+    digest = keys_digest(current_texts)
     
     for lang in languages:
         print(f"\nProcessing language: {lang}")
         
+        # Skip files unchanged since they were last found clean against the same keys
+        lang_file = Path(translations_dir) / f"{lang}.json"
+        if manager.index.is_checked(lang_file, "clean", digest):
+            print("No unused keys found")
+            continue
+        
         # Load translation file
         translations = manager.load_translation_file(lang)
         original_count = len(translations)
@@ -84,6 +94,7 @@ def clean_translation_files(translations_dir: str, source_dir: str, backup: bool
 
                 # Save cleaned file
                 manager.save_translation_file(lang, translations)
+                manager.index.mark_checked(lang_file, "clean", digest)
                 removed_count = len(unused_keys)
                 total_removed += removed_count
                 print(f"Deleted {removed_count} keys")
@@ -91,10 +102,12 @@ def clean_translation_files(translations_dir: str, source_dir: str, backup: bool
                 print("Skipped deletion")
         else:
             print("No unused keys found")
+            manager.index.mark_checked(lang_file, "clean", digest)
 
         new_count = len(translations)
         print(f"Original key count: {original_count}, after cleanup: {new_count}")
     
+    manager.index.save()
     print(f"\nCleanup completed! Total deleted {total_removed} unused keys.")
 
 def sync_translations(translations_dir: str, source_lang: str = "en_US", target_langs: List[str] = None, yes_mode: bool = False):
@@ -114,6 +127,8 @@ def sync_translations(translations_dir: str, source_lang: str = "en_US", target_
     
     source_keys = set(source_translations.keys())
     print(f"Source language {source_lang} has {len(source_keys)} keys")
+    index = TranslationIndex(translations_path)
+    digest = keys_digest(source_keys)
     
     # Get target language list
     if target_langs is None:
@@ -133,6 +148,11 @@ def sync_translations(translations_dir: str, source_lang: str = "en_US", target_
         print(f"\nSyncing language: {target_lang}")
         
         target_file = translations_path / f"{target_lang}.json"
+        # Unchanged since it last had exactly the source keys
+        if index.is_checked(target_file, "sync", digest):
+            print("  Already in sync")
+            continue
+        
         if target_file.exists():
             with open(target_file, 'r', encoding='utf-8') as f:
                 target_translations = json.load(f)
@@ -156,6 +176,7 @@ def sync_translations(translations_dir: str, source_lang: str = "en_US", target_
             print(f"  Added {len(missing_keys)} missing keys")
         
         # Ask whether to delete extra keys
+        deleted = False
         if extra_keys:
             if yes_mode:
                 response = 'y'
@@ -165,12 +186,20 @@ def sync_translations(translations_dir: str, source_lang: str = "en_US", target_
             if response.lower().strip() in ['y', 'yes']:
                 for key in extra_keys:
                     del target_translations[key]
+                deleted = True
                 print(f"  Deleted {len(extra_keys)} extra keys")
         
-        # Save file (ensure UTF-8, fix for special chars)
-        with open(target_file, 'w', encoding='utf-8', newline='') as f:
-            json.dump(target_translations, f, ensure_ascii=False, indent=2)
-        print(f"  Saved: {target_file}")
+        # Leave files that needed no change untouched
+        if missing_keys or deleted:
+            # Save file (ensure UTF-8, fix for special chars)
+            with open(target_file, 'w', encoding='utf-8', newline='') as f:
+                json.dump(target_translations, f, ensure_ascii=False, indent=2)
+            print(f"  Saved: {target_file}")
+            compile_catalog(translations_path, target_lang)
+        if not extra_keys or deleted:
+            index.mark_checked(target_file, "sync", digest)
+    
+    index.save()
 
 def main():
     parser = argparse.ArgumentParser(description="Translation File Maintenance Helper")
@@ -3,6 +3,12 @@
 """
 Translation File Management Script
 Used to update and extract translatable texts, manage JSON translation file key comparison
+
+Extraction results are cached per source file (by mtime and size) in
+$XDG_CACHE_HOME/inir/, so repeated runs only rescan files that changed.
+
+Every language file saved here is also compiled into compiled/<lang>.catalog,
+the minified form services/Translation.qml loads (see compile_catalog).
 """
 
 import os
@@ -10,80 +16,299 @@ import json
 import re
 import sys
 import argparse
+import hashlib
 from pathlib import Path
 from typing import Dict, Set, List, Tuple
 import tempfile
 import subprocess
 
+# Translation.tr("text"), Translation.tr('text') (with escapes) or Translation.tr(`text`),
+# matched in one pass: group 2 holds quoted text, group 3 backtick text
+TR_PATTERN = re.compile(
+    r'Translation\.tr\s*\(\s*(?:'
+    r'(["\'])((?:(?!\1)[^\\]|\\.)*)\1'
+    r'|`([^`]*(?:\\.[^`]*)*?)`'
+    r')\s*\)',
+    re.DOTALL,
+)
+SOURCE_SUFFIXES = ('.qml', '.js')
+SKIPPED_DIRS = {'.git', 'node_modules', '__pycache__'}
+INDEX_VERSION = 1
+
+# Precompiled catalogs loaded by services/Translation.qml
+CATALOG_DIR = 'compiled'
+CATALOG_SUFFIX = '.catalog'
+CATALOG_VERSION = 2
+REFERENCE_LANGUAGE = 'en_US'
+KEEP_SUFFIX = '/*keep*/'
+# Qt-style %1..%9 arguments; compared as sets, so URL escapes such as %20 cancel out
+PLACEHOLDER_PATTERN = re.compile(r'%[1-9]')
+
+
+def unescape_text(text: str) -> str:
+    """Turn the source literal of a translatable string into its key"""
+    try:
+        if '\\u' in text or '\\x' in text:
+            clean_text = bytes(text, "utf-8").decode("unicode_escape")
+        else:
+            clean_text = (
+                text.replace('\\n', '\n')
+                    .replace('\\t', '\t')
+                    .replace('\\r', '\r')
+                    .replace('\\"', '"')
+                    .replace('\\\'', "'")
+                    .replace('\\f', '\f')
+                    .replace('\\b', '\b')
+                    .replace('\\\\', '\\')
+            )
+    except Exception:
+        clean_text = text
+    # Clean text (remove extra whitespace)
+    return clean_text.strip()
+
+
+def scan_source(content: str) -> Dict[str, List[int]]:
+    """Translatable keys in one source file, with the lines they appear on"""
+    keys: Dict[str, List[int]] = {}
+    if 'Translation.tr' not in content:
+        return keys
+    line = 1
+    last = 0
+    for match in TR_PATTERN.finditer(content):
+        line += content.count('\n', last, match.start())
+        last = match.start()
+        text = match.group(2) if match.group(1) else match.group(3)
+        key = unescape_text(text)
+        if key:
+            keys.setdefault(key, []).append(line)
+    return keys
+
+
+class TranslationIndex:
+    """Persistent cache of per-file key sets and of language files already checked"""
+
+    def __init__(self, translations_dir: Path):
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        digest = hashlib.sha1(str(translations_dir).encode()).hexdigest()[:12]
+        self.path = Path(cache_home) / "inir" / f"translation-index-{digest}.json"
+        self.data = {"version": INDEX_VERSION, "sources": {}, "languages": {}}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    def sources(self, source_dir: Path) -> Dict[str, list]:
+        """Cached {relative path: [mtime_ns, size, {key: [lines]}]} for a source tree"""
+        return self.data["sources"].setdefault(str(source_dir), {})
+
+    def set_sources(self, source_dir: Path, files: Dict[str, list]):
+        if self.data["sources"].get(str(source_dir)) != files:
+            self.data["sources"][str(source_dir)] = files
+            self.dirty = True
+
+    @staticmethod
+    def _file_id(path: Path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def is_checked(self, lang_file: Path, check: str, digest: str) -> bool:
+        """Whether lang_file passed check against digest and is unchanged since"""
+        entry = self.data["languages"].get(f"{check}:{lang_file}")
+        return entry is not None and entry == [self._file_id(lang_file), digest]
+
+    def mark_checked(self, lang_file: Path, check: str, digest: str):
+        self.data["languages"][f"{check}:{lang_file}"] = [self._file_id(lang_file), digest]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Cannot save translation index {self.path}: {e}")
+
+
+def keys_digest(keys) -> str:
+    """Stable digest of a key set, used to tell whether a checked file needs rechecking"""
+    return hashlib.sha1("\0".join(sorted(keys)).encode('utf-8')).hexdigest()
+
+
+def catalog_path(translations_dir: Path, lang_code: str) -> Path:
+    return Path(translations_dir) / CATALOG_DIR / f"{lang_code}{CATALOG_SUFFIX}"
+
+
+def compile_catalog(translations_dir: Path, lang_code: str, reference: Dict[str, str] = None,
+                    check: bool = False) -> bool:
+    """Compile <lang>.json into the catalog the shell loads; False if it is invalid
+
+    Only entries Translation.tr() can return are kept: keys known to the
+    reference language whose value is a non-empty string different from the
+    key, with the /*keep*/ marker already stripped. Untranslated entries
+    fall back to the key in the shell, so en_US compiles to an empty catalog.
+    A shipped identity entry no longer hides a generated translation of the
+    same key, which now applies instead of the untranslated text.
+
+    The shell loads the catalog without looking at the JSON, so it records
+    the md5 of the source file and check mode (run by
+    test-local-distribution.sh) reports any catalog that no longer matches.
+    It is only rewritten when its content changes. With check, nothing is
+    written and a missing or outdated catalog is reported as a failure.
+    """
+    translations_dir = Path(translations_dir)
+    source = translations_dir / f"{lang_code}.json"
+    try:
+        raw = source.read_bytes()
+        translations = json.loads(raw.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+        print(f"Error: Cannot compile {source}: {e}")
+        return False
+    if not isinstance(translations, dict) or not all(isinstance(v, str) for v in translations.values()):
+        print(f"Error: Cannot compile {source}: expected an object of strings")
+        return False
+    
+    if reference is None:
+        reference = translations if lang_code == REFERENCE_LANGUAGE else load_reference(translations_dir)
+    
+    entries = {}
+    unknown = 0
+    for key, value in translations.items():
+        if reference and key not in reference:
+            unknown += 1
+            continue
+        if value.endswith(KEEP_SUFFIX):
+            value = value[:-len(KEEP_SUFFIX)].strip()
+        elif value == key:
+            continue
+        if not value:
+            continue
+        if set(PLACEHOLDER_PATTERN.findall(key)) != set(PLACEHOLDER_PATTERN.findall(value)):
+            print(f"Warning: {lang_code}: placeholders differ for {key!r}")
+        entries[key] = value
+    if unknown:
+        print(f"Warning: {lang_code}: skipped {unknown} keys missing from {REFERENCE_LANGUAGE}")
+    
+    content = json.dumps(
+        {
+            "version": CATALOG_VERSION,
+            "language": lang_code,
+            "source": hashlib.md5(raw).hexdigest(),
+            "entries": dict(sorted(entries.items())),
+        },
+        ensure_ascii=False, separators=(',', ':'),
+    )
+    target = catalog_path(translations_dir, lang_code)
+    try:
+        if target.exists() and target.read_text(encoding='utf-8') == content:
+            return True
+        if check:
+            print(f"Error: Catalog {target} is missing or out of date; run with --compile")
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + '.tmp')
+        tmp.write_text(content, encoding='utf-8')
+        os.replace(tmp, target)
+    except IOError as e:
+        print(f"Error: Cannot write catalog {target}: {e}")
+        return False
+    print(f"Catalog compiled: {target} ({len(entries)} entries)")
+    return True
+
+
+def load_reference(translations_dir: Path) -> Dict[str, str]:
+    """Reference language keys catalogs are validated against; empty if unavailable"""
+    try:
+        with open(Path(translations_dir) / f"{REFERENCE_LANGUAGE}.json", 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    return reference if isinstance(reference, dict) else {}
+
+
+def compile_catalogs(translations_dir: Path, languages: List[str] = None, check: bool = False) -> bool:
+    """Compile (or with check, verify) catalogs for the given languages (default: all); False if any failed"""
+    translations_dir = Path(translations_dir)
+    if languages is None:
+        languages = sorted(p.stem for p in translations_dir.glob("*.json"))
+    reference = load_reference(translations_dir)
+    ok = True
+    for lang_code in languages:
+        ok &= compile_catalog(translations_dir, lang_code, reference, check)
+    return ok
+
+
 class TranslationManager:
     def __init__(self, translations_dir: str, source_dir: str, yes_mode: bool = False):
         self.translations_dir = Path(translations_dir)
         self.source_dir = Path(source_dir)
         self.temp_extracted_file = None
         self.yes_mode = yes_mode
+        self.index = TranslationIndex(self.translations_dir)
+        self.locations: Dict[str, List[str]] = {}
         
         # Ensure translation directory exists
         self.translations_dir.mkdir(parents=True, exist_ok=True)
         
     def extract_translatable_texts(self) -> Set[str]:
         """Extract translatable texts from source code"""
-        translatable_texts = set()
-        
-        # Search patterns: Translation.tr("text") or Translation.tr('text')
-        # Improved regex that handles nested quotes correctly
-        patterns = [
-            r'Translation\.tr\s*\(\s*(["\'])(((?!\1)[^\\]|\\.)*)(\1)\s*\)',  # Double or single quotes with escape support
-            r'Translation\.tr\s*\(\s*`([^`]*(?:\\.[^`]*)*?)`\s*\)',          # Backticks (template strings)
-        ]
+        cached = self.index.sources(self.source_dir)
+        files: Dict[str, list] = {}
         
-        # Search all .qml and .js files
-        file_extensions = ['*.qml', '*.js']
-        
-        for ext in file_extensions:
-            for file_path in self.source_dir.rglob(ext):
+        # One walk for both .qml and .js; unchanged files come from the index
+        for root, dirs, names in os.walk(self.source_dir):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            for name in names:
+                if not name.endswith(SOURCE_SUFFIXES):
+                    continue
+                file_path = os.path.join(root, name)
+                rel = os.path.relpath(file_path, self.source_dir)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                entry = cached.get(rel)
+                if entry is not None and entry[:2] == [st.st_mtime_ns, st.st_size]:
+                    files[rel] = entry
+                    continue
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
-                        
-                    for pattern in patterns:
-                        matches = re.findall(pattern, content, re.MULTILINE | re.DOTALL)
-                        for match in matches:
-                            # Handle different match group structures
-                            if isinstance(match, tuple):
-                                # For improved regex, text is in the second group
-                                if len(match) >= 3:
-                                    text = match[1]  # Second group is the text content
-                                else:
-                                    text = match[0] if match else ""
-                            else:
-                                text = match
-
-                            try:
-                                if '\\u' in text or '\\x' in text:
-                                    clean_text = bytes(text, "utf-8").decode("unicode_escape")
-                                else:
-                                    clean_text = (
-                                        text.replace('\\n', '\n')
-                                            .replace('\\t', '\t')
-                                            .replace('\\r', '\r')
-                                            .replace('\\"', '"')
-                                            .replace('\\\'', "'")
-                                            .replace('\\f', '\f')
-                                            .replace('\\b', '\b')
-                                            .replace('\\\\', '\\')
-                                    )
-                            except Exception:
-                                clean_text = text
-                            
-                            # Clean text (remove extra whitespace)
-                            clean_text = clean_text.strip()
-                            if clean_text:
-                                translatable_texts.add(clean_text)
-                                
                 except (UnicodeDecodeError, IOError) as e:
                     print(f"Warning: Cannot read file {file_path}: {e}")
-                    
-        return translatable_texts
+                    continue
+                files[rel] = [st.st_mtime_ns, st.st_size, scan_source(content)]
+        
+        self.index.set_sources(self.source_dir, files)
+        self.index.save()
+        
+        locations: Dict[str, List[str]] = {}
+        for rel in sorted(files):
+            for key, lines in files[rel][2].items():
+                locations.setdefault(key, []).extend(f"{rel}:{line}" for line in lines)
+        self.locations = locations
+        return set(locations)
+    
+    def write_reverse_index(self, output: str):
+        """Write key -> source locations ("path:line") as JSON; '-' for stdout"""
+        content = json.dumps(dict(sorted(self.locations.items())), ensure_ascii=False, indent=2)
+        if output == '-':
+            print(content)
+            return
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(content + "\n")
+        print(f"Reverse index written: {output}")
     
     def create_temp_translation_file(self, texts: Set[str]) -> str:
         """Create temporary JSON file containing extracted texts"""
@@ -119,6 +344,9 @@ class TranslationManager:
             print(f"Translation file saved: {file_path}")
         except IOError as e:
             print(f"Error: Cannot save translation file {file_path}: {e}")
+            return
+        # Every catalog is validated against the reference keys
+        compile_catalogs(self.translations_dir, None if lang_code == REFERENCE_LANGUAGE else [lang_code])
     
     def get_available_languages(self) -> List[str]:
         """Get list of available languages"""
@@ -224,6 +452,12 @@ def main():
                        help="Only extract translatable texts to temporary file")
     parser.add_argument("--show-temp", action="store_true",
                        help="Show temporary extracted file content")
+    parser.add_argument("--index", metavar="FILE",
+                       help="Write a key -> source locations JSON index to FILE ('-' for stdout)")
+    parser.add_argument("--compile", action="store_true",
+                       help="Only compile the precompiled catalogs loaded by the shell")
+    parser.add_argument("--check", action="store_true",
+                       help="With --compile, fail on missing or stale catalogs instead of writing them")
     parser.add_argument("-y", "--yes", action="store_true",
                        help="Skip all confirmation prompts (auto-confirm)")
     
@@ -233,6 +467,10 @@ def main():
     translations_dir = os.path.abspath(args.translations_dir)
     source_dir = os.path.abspath(args.source_dir)
     
+    if args.compile:
+        languages = [args.language] if args.language else None
+        sys.exit(0 if compile_catalogs(Path(translations_dir), languages, args.check) else 1)
+    
     print(f"Translation directory: {translations_dir}")
     print(f"Source code directory: {source_dir}")
     
@@ -259,6 +497,9 @@ def main():
             with open(temp_file, 'r', encoding='utf-8') as f:
                 print(f.read())
         
+        if args.index:
+            manager.write_reverse_index(args.index)
+        
         if args.extract_only:
             print("Extract-only mode, program finished")
             return
@@ -302,15 +543,23 @@ def main():
                     return
         
         # Process each language
+        digest = keys_digest(extracted_texts)
         for lang in target_languages:
             print(f"\n{'='*50}")
             print(f"Processing language: {lang}")
             print('='*50)
             
+            # Unchanged since it was last found up to date with the same source keys
+            lang_file = manager.translations_dir / f"{lang}.json"
+            if manager.index.is_checked(lang_file, "update", digest):
+                print(f"Translation file for language {lang} is already up to date")
+                continue
+            
             missing_keys, extra_keys = manager.compare_translations(extracted_texts, lang)
             
             if not missing_keys and not extra_keys:
                 print(f"Translation file for language {lang} is already up to date")
+                manager.index.mark_checked(lang_file, "update", digest)
                 continue
             
             print(f"Analysis results:")
@@ -323,11 +572,14 @@ def main():
             if ignored_extra_keys:
                 print(f"  Ignored keys: {len(ignored_extra_keys)} (marked with /*keep*/)")
             
-            if missing_keys or extra_keys:
+            if not missing_keys and not filtered_extra_keys:
+                manager.index.mark_checked(lang_file, "update", digest)
+            elif missing_keys or extra_keys:
                 manager.interactive_update(lang, missing_keys, extra_keys)
         
     finally:
         # Clean up temporary files
+        manager.index.save()
         manager.cleanup()
 
 if __name__ == "__main__":